@@ -3,13 +3,28 @@ from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_compress import Compress
+from dotenv import load_dotenv
+
+# Load environment variables before the project modules below, which read
+# their settings from the environment when they are imported
+load_dotenv()
+
 from models import db
+from models.routing import REPLICA_BIND
+from utils.db_engine import engine_options, init_db_engine
+from utils.rollups import init_rollups
+from utils.response_cache import init_response_cache
+from utils.resume_search import init_resume_search
+from utils.skill_index import init_skill_index
+from utils.resume_history import init_resume_history
+from utils.user_cache import init_user_cache
+from utils.login_buffer import init_login_buffer
+from utils.password_hasher import init_password_hasher
+from utils.analysis_writer import init_analysis_writer
+from utils.retention import init_retention
 from datetime import datetime
 import os
 
-from dotenv import load_dotenv
-load_dotenv()
-
 from routes.auth_routes import auth_bp
 from routes.resume_routes import resume_bp
 from routes.analysis_routes import analysis_bp
@@ -23,9 +38,28 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('JWT_SECRET')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///resume_analyzer.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool sizing per backend; WAL and pragmas for SQLite files (see utils/db_engine.py)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+# Optional read replica for read-only admin views (see models/routing.py)
+if os.getenv('DATABASE_REPLICA_URL'):
+    replica_url = os.getenv('DATABASE_REPLICA_URL')
+    app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: dict(engine_options(replica_url), url=replica_url)}
+# Compressing a streamed response buffers it whole; keep exports and bulk results streaming
+app.config['COMPRESS_STREAMS'] = False
 
 # Initialize extensions
 db.init_app(app)
+init_db_engine(app)
+init_rollups(app)
+init_response_cache(app)
+init_resume_search(app)
+init_skill_index(app)
+init_resume_history(app)
+init_user_cache(app)
+init_login_buffer(app)
+init_password_hasher(app)
+init_analysis_writer(app)
+init_retention(app)
 CORS(app, origins=[os.getenv('CLIENT_URL', 'http://localhost:3000')], supports_credentials=True)
 Compress(app)
 
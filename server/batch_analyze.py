@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Offline batch analysis for the Smart AI Resume Analyzer
+
+Walks a directory of resume files and runs the standard analysis on every
+core, without the Flask app or the database. Progress is checkpointed so an
+interrupted run picks up where it stopped.
+
+Usage:
+    python batch_analyze.py RESUME_DIR --job-role "DevOps Engineer" --job-category DevOps \\
+        --output results.jsonl [--format jsonl|csv] [--workers N] [--chunksize N]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from utils.file_parser import ALLOWED_EXTENSIONS
+
+
+CSV_FIELDS = [
+    'file', 'success', 'error', 'ats_score', 'keyword_match_score', 'format_score',
+    'section_score', 'overall_score', 'matched_skills', 'missing_skills'
+]
+
+def find_resume_files(root):
+    """Yield paths of all supported resume files under root, in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS:
+                yield os.path.join(dirpath, filename)
+
+def load_checkpoint(path):
+    """Return the set of files already processed by a previous run"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+def _init_worker():
+    # Workers ignore Ctrl+C; the parent handles it and leaves the checkpoint consistent
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _analyze_path(task):
+    """Worker: analyze one file, never raising"""
+    file_path, job_role, job_category = task
+    from utils.bulk_analyzer import analyze_resume_file
+    try:
+        file_type = file_path.rsplit('.', 1)[1].lower()
+        analysis = analyze_resume_file(file_path, file_type, job_role, job_category)
+        return {'file': file_path, 'success': True, 'analysis': analysis}
+    except Exception as e:
+        return {'file': file_path, 'success': False, 'error': str(e)}
+
+def to_csv_row(result):
+    """Flatten a result into the CSV columns"""
+    row = {'file': result['file'], 'success': result['success'], 'error': result.get('error', '')}
+    analysis = result.get('analysis')
+    if analysis:
+        keyword_match = analysis.get('keyword_match', {})
+        scores = [
+            analysis.get('ats_score', 0),
+            keyword_match.get('score', 0),
+            analysis.get('format_score', 0),
+            analysis.get('section_score', 0)
+        ]
+        row.update({
+            'ats_score': scores[0],
+            'keyword_match_score': scores[1],
+            'format_score': scores[2],
+            'section_score': scores[3],
+            'overall_score': round(sum(scores) / 4),
+            'matched_skills': ';'.join(keyword_match.get('matched_skills', [])),
+            'missing_skills': ';'.join(keyword_match.get('missing_skills', []))
+        })
+    return row
+
+def format_progress(done, total, failed, started_at):
+    """Single progress line with throughput and ETA"""
+    elapsed = max(time.monotonic() - started_at, 1e-6)
+    rate = done / elapsed
+    remaining = (total - done) / rate if rate > 0 else 0
+    eta = time.strftime('%H:%M:%S', time.gmtime(remaining))
+    return f"\r📊 {done}/{total} files ({failed} failed) | {rate:.1f} files/s | ETA {eta}"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Batch-analyze a directory of resumes offline')
+    parser.add_argument('directory', help='Directory to scan recursively for PDF/DOCX resumes')
+    parser.add_argument('--job-role', required=True, help='Target job role, e.g. "Data Scientist"')
+    parser.add_argument('--job-category', required=True, help='Target job category, e.g. "Data Science"')
+    parser.add_argument('--output', required=True, help='Output file (JSONL or CSV)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help='Output format (default: from extension)')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <output>.checkpoint)')
+    parser.add_argument('--restart', action='store_true', help='Ignore any checkpoint and start over')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--chunksize', type=int, default=16, help='Files handed to a worker at a time')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the batch analysis"""
+    args = parse_args(argv)
+
+    from utils.resume_analyzer import JOB_ROLES
+    if args.job_role not in JOB_ROLES.get(args.job_category, {}):
+        print(f"❌ Invalid job role or category: {args.job_role} / {args.job_category}")
+        sys.exit(1)
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Not a directory: {args.directory}")
+        sys.exit(1)
+
+    output_format = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+
+    if args.restart:
+        for path in (args.output, checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    processed = load_checkpoint(checkpoint_path)
+    files = [path for path in find_resume_files(args.directory) if path not in processed]
+    total = len(files)
+
+    print("🚀 Batch resume analysis")
+    print("=" * 60)
+    print(f"📁 Directory: {args.directory}")
+    print(f"🎯 Role: {args.job_role} ({args.job_category})")
+    print(f"📝 Output: {args.output} ({output_format})")
+    print(f"⏭️  Skipping {len(processed)} files from checkpoint")
+    print(f"🔧 {args.workers} workers, chunksize {args.chunksize}")
+    print("=" * 60)
+
+    if not files:
+        print("✅ Nothing to do")
+        return
+
+    write_header = output_format == 'csv' and not os.path.exists(args.output)
+    done = 0
+    failed = 0
+    started_at = time.monotonic()
+    last_progress = 0.0
+
+    with open(args.output, 'a', encoding='utf-8', newline='') as out, \
+            open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+            Pool(args.workers, initializer=_init_worker) as pool:
+        writer = None
+        if output_format == 'csv':
+            writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+            if write_header:
+                writer.writeheader()
+
+        tasks = ((path, args.job_role, args.job_category) for path in files)
+        try:
+            for result in pool.imap_unordered(_analyze_path, tasks, chunksize=args.chunksize):
+                if writer:
+                    writer.writerow(to_csv_row(result))
+                else:
+                    out.write(json.dumps(result) + '\n')
+                out.flush()
+                # Only checkpoint once the result is safely in the output file
+                checkpoint.write(result['file'] + '\n')
+                checkpoint.flush()
+
+                done += 1
+                if not result['success']:
+                    failed += 1
+                now = time.monotonic()
+                if now - last_progress >= 0.5 or done == total:
+                    last_progress = now
+                    sys.stderr.write(format_progress(done, total, failed, started_at))
+                    sys.stderr.flush()
+        except KeyboardInterrupt:
+            pool.terminate()
+            sys.stderr.write('\n')
+            print(f"🛑 Interrupted after {done} files; rerun the same command to resume")
+            sys.exit(130)
+
+    sys.stderr.write('\n')
+    print(f"✅ Analyzed {done} files ({failed} failed) in {time.monotonic() - started_at:.1f}s")
+
+if __name__ == "__main__":
+    main()
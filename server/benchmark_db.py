@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write benchmark for the SQLite engine profile
+
+Runs the same mixed workload (short reads, single-row insert transactions)
+from several threads against a scratch database file, once with SQLAlchemy's
+defaults (rollback journal, synchronous=FULL) and once with the tuned profile
+from utils/db_engine.py (WAL, synchronous=NORMAL, mmap, busy timeout), and prints
+the throughput of each.
+
+Usage:
+    python benchmark_db.py [--threads N] [--seconds S] [--write-ratio R] [--rows N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.db_engine import engine_options, configure_engine
+
+def make_engine(path, profile):
+    """Engine for the scratch database under the given profile"""
+    url = f'sqlite:///{path}'
+    if profile == 'default':
+        return create_engine(url)
+    return configure_engine(create_engine(url, **engine_options(url)))
+
+def prepare(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE items (id INTEGER PRIMARY KEY, user_id INTEGER, body TEXT)'))
+        connection.execute(text('CREATE INDEX ix_items_user_id ON items (user_id)'))
+        connection.execute(
+            text('INSERT INTO items (user_id, body) VALUES (:user_id, :body)'),
+            [{'user_id': i % 1000, 'body': 'x' * 200} for i in range(rows)]
+        )
+
+def worker(engine, deadline, write_ratio, counts, lock):
+    rng = random.Random()
+    reads = writes = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                with engine.begin() as connection:
+                    connection.execute(text('INSERT INTO items (user_id, body) VALUES (:user_id, :body)'),
+                                       {'user_id': rng.randrange(1000), 'body': 'y' * 200})
+                writes += 1
+            else:
+                with engine.connect() as connection:
+                    connection.execute(text('SELECT count(*), max(id) FROM items WHERE user_id = :user_id'),
+                                       {'user_id': rng.randrange(1000)}).fetchall()
+                reads += 1
+        except Exception:
+            # "database is locked" once a writer outwaits the busy timeout
+            errors += 1
+    with lock:
+        counts['reads'] += reads
+        counts['writes'] += writes
+        counts['errors'] += errors
+
+def run(profile, args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        engine = make_engine(path, profile)
+        prepare(engine, args.rows)
+
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(target=worker, args=(engine, deadline, args.write_ratio, counts, lock))
+            for _ in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    print(f"{profile:<13} reads/s {counts['reads'] / args.seconds:>9.0f}   "
+          f"writes/s {counts['writes'] / args.seconds:>8.0f}   errors {counts['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare SQLite engine profiles under concurrent load')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent worker threads (default: 8)')
+    parser.add_argument('--seconds', type=float, default=5, help='Duration per profile (default: 5)')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='Fraction of writes (default: 0.2)')
+    parser.add_argument('--rows', type=int, default=20000, help='Rows seeded before the run (default: 20000)')
+    args = parser.parse_args()
+
+    print(f'{args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:g}s per profile')
+    for profile in ('default', 'tuned'):
+        run(profile, args)
+
+if __name__ == '__main__':
+    main()
@@ -2,44 +2,60 @@ from functools import wraps
 from flask import request, jsonify, g
 import jwt
 import os
-from models.user import User
+from utils.user_cache import user_cache
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    """A valid token issued before the user's last password change"""
+
+def _bearer_payload():
+    """Decoded JWT from the Authorization header, or None if there is no token"""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return None
+    token = auth_header.split(' ')[1] if len(auth_header.split(' ')) > 1 else None
+    if not token:
+        return None
+    return jwt.decode(token, os.getenv('JWT_SECRET'), algorithms=['HS256'])
+
+def _current_user(payload):
+    """Cached auth fields for the token's user (None if it no longer exists)"""
+    user = user_cache.get(payload['id'])
+    # Tokens issued before a password change carry an older version
+    if user and payload.get('ver', 0) != user['token_version']:
+        raise TokenRevokedError('Token revoked')
+    return user
 
 def authenticate_token(f):
     """Decorator to authenticate JWT token"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
-            auth_header = request.headers.get('Authorization')
-            if not auth_header:
+            payload = _bearer_payload()
+            if payload is None:
                 return jsonify({'error': 'Access token required'}), 401
             
-            token = auth_header.split(' ')[1] if len(auth_header.split(' ')) > 1 else None
-            if not token:
-                return jsonify({'error': 'Access token required'}), 401
-            
-            # Verify token
-            payload = jwt.decode(token, os.getenv('JWT_SECRET'), algorithms=['HS256'])
-            
-            # Check if user still exists
-            user = User.query.get(payload['id'])
+            # Check if user still exists (served from the user cache in the common case)
+            user = _current_user(payload)
             if not user:
                 return jsonify({'error': 'User not found'}), 401
             
             # Check if user is active
-            if not user.is_active:
+            if not user['is_active']:
                 return jsonify({'error': 'Account is deactivated'}), 401
             
             # Add user info to request context
             g.user = {
-                'id': user.id,
-                'email': user.email,
-                'role': user.role
+                'id': user['id'],
+                'email': user['email'],
+                'role': user['role']
             }
             
             return f(*args, **kwargs)
             
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token expired'}), 401
+        except TokenRevokedError:
+            return jsonify({'error': 'Token revoked'}), 401
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Invalid token'}), 401
         except Exception as e:
@@ -62,19 +78,15 @@ def optional_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
-            auth_header = request.headers.get('Authorization')
-            if auth_header:
-                token = auth_header.split(' ')[1] if len(auth_header.split(' ')) > 1 else None
-                if token:
-                    payload = jwt.decode(token, os.getenv('JWT_SECRET', 'your-secret-key'), algorithms=['HS256'])
-                    user = User.query.get(payload['id'])
-                    
-                    if user and user.is_active:
-                        g.user = {
-                            'id': user.id,
-                            'email': user.email,
-                            'role': user.role
-                        }
+            payload = _bearer_payload()
+            user = _current_user(payload) if payload else None
+            
+            if user and user['is_active']:
+                g.user = {
+                    'id': user['id'],
+                    'email': user['email'],
+                    'role': user['role']
+                }
         except:
             # Continue without authentication if token is invalid
             pass
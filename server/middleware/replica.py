@@ -0,0 +1,10 @@
+from functools import wraps
+from flask import g
+
+def read_replica(f):
+    """Decorator to serve a read-only view's queries from the read replica when one is configured"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.db_read_replica = True
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,56 @@
+from logging.config import fileConfig
+from alembic import context
+
+from app import app
+from models import db
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = db.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Skip FTS5 virtual tables and their shadow tables; migrations manage them as raw DDL"""
+    if type_ == 'table' and reflected and compare_to is None and '_fts' in name:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout without a database connection"""
+    context.configure(
+        url=app.config['SQLALCHEMY_DATABASE_URI'],
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+        include_object=include_object,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations against the app's database engine"""
+    with app.app_context():
+        # engine.begin() commits once every pending migration has run (or rolls
+        # them all back); Alembic joins this outer transaction
+        with db.engine.begin() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                include_object=include_object,
+                # SQLite can't ALTER most things in place
+                render_as_batch=True,
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,115 @@
+"""daily rollups
+
+Adds daily_rollups, the per-day counters the admin analytics read, and
+fills them from the existing users, resumes and analyses. Analyses are
+bucketed by their overall score rounded to an integer, the value later
+kept in analyses.overall_score.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 01:53:41.905276
+
+"""
+from typing import Sequence, Union
+from collections import Counter
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def score_bucket(scores):
+    score = scores.get('overallScore') if isinstance(scores, dict) else None
+    score = int(round(score)) if isinstance(score, (int, float)) else 0
+    if score >= 80:
+        return '80-100'
+    elif score >= 60:
+        return '60-79'
+    elif score >= 40:
+        return '40-59'
+    return '0-39'
+
+
+def count_rows(bind, table, columns, key):
+    """Counter of rollup keys over every row of table with a created_at"""
+    counts = Counter()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.created_at, *[table.c[column] for column in columns])
+            .where(table.c.id > last_id, table.c.created_at.isnot(None))
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return counts
+        last_id = rows[-1].id
+        counts.update(key(row) for row in rows)
+
+
+def backfill_rollups():
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('created_at', sa.DateTime))
+    resumes = sa.table(
+        'resumes',
+        sa.column('id', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+        sa.column('target_category', sa.String)
+    )
+    analyses = sa.table(
+        'analyses',
+        sa.column('id', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+        sa.column('analysis_type', sa.String),
+        sa.column('scores', sa.JSON)
+    )
+    rollups = sa.table(
+        'daily_rollups',
+        sa.column('day', sa.Date),
+        sa.column('metric', sa.String),
+        sa.column('analysis_type', sa.String),
+        sa.column('category', sa.String),
+        sa.column('score_bucket', sa.String),
+        sa.column('count', sa.Integer)
+    )
+    bind = op.get_bind()
+    counts = count_rows(bind, users, [], lambda row: (row.created_at.date(), 'users', '', '', ''))
+    counts += count_rows(bind, resumes, ['target_category'], lambda row: (
+        row.created_at.date(), 'resumes', '', row.target_category or '', ''))
+    counts += count_rows(bind, analyses, ['analysis_type', 'scores'], lambda row: (
+        row.created_at.date(), 'analyses', row.analysis_type or '', '', score_bucket(row.scores)))
+    rows = [
+        dict(zip(('day', 'metric', 'analysis_type', 'category', 'score_bucket'), key), count=count)
+        for key, count in counts.items()
+    ]
+    for start in range(0, len(rows), BATCH_SIZE):
+        bind.execute(rollups.insert(), rows[start:start + BATCH_SIZE])
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('metric', sa.String(length=32), nullable=False),
+    sa.Column('analysis_type', sa.String(length=50), nullable=False),
+    sa.Column('category', sa.String(length=255), nullable=False),
+    sa.Column('score_bucket', sa.String(length=16), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'metric', 'analysis_type', 'category', 'score_bucket')
+    )
+    # ### end Alembic commands ###
+
+    backfill_rollups()
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('daily_rollups')
+    # ### end Alembic commands ###
@@ -0,0 +1,109 @@
+"""user search indexes
+
+Adds users.name_normalized (case-folded name, backfilled in batches) for
+prefix search, plus a substring index: an FTS5 trigram table kept in sync by
+triggers on SQLite, pg_trgm GIN indexes on Postgres.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 02:01:50.727643
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "name_normalized, email, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name_normalized, email) VALUES (new.id, new.name_normalized, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name_normalized, email) VALUES ('delete', old.id, old.name_normalized, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name_normalized, email ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name_normalized, email) VALUES ('delete', old.id, old.name_normalized, old.email); "
+    "INSERT INTO users_fts(rowid, name_normalized, email) VALUES (new.id, new.name_normalized, new.email); END",
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')"
+]
+
+POSTGRES_TRGM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_normalized_trgm ON users USING gin (name_normalized gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_normalized_prefix ON users (name_normalized varchar_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_prefix ON users (email varchar_pattern_ops)"
+]
+
+
+def backfill_normalized_names():
+    users = sa.table(
+        'users',
+        sa.column('id', sa.Integer),
+        sa.column('name', sa.String),
+        sa.column('name_normalized', sa.String)
+    )
+    bind = op.get_bind()
+    update = users.update().where(users.c.id == sa.bindparam('row_id')).values(
+        name_normalized=sa.bindparam('normalized'))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(users.c.id, users.c.name)
+            .where(users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(update, [
+            {'row_id': row_id, 'normalized': ' '.join((name or '').split()).casefold()}
+            for row_id, name in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('name_normalized', sa.String(length=255), nullable=True))
+        batch_op.create_index(batch_op.f('ix_users_name_normalized'), ['name_normalized'], unique=False)
+
+    # ### end Alembic commands ###
+    backfill_normalized_names()
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_TRGM:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('users_fts_ai', 'users_fts_ad', 'users_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS users_fts')
+    elif dialect == 'postgresql':
+        for index in ('ix_users_name_normalized_trgm', 'ix_users_email_trgm',
+                      'ix_users_name_normalized_prefix', 'ix_users_email_prefix'):
+            op.execute(f'DROP INDEX IF EXISTS {index}')
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_name_normalized'))
+        batch_op.drop_column('name_normalized')
+
+    # ### end Alembic commands ###
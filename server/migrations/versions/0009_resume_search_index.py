@@ -0,0 +1,110 @@
+"""resume search index
+
+Adds resume_documents (the convert_resume_to_text rendering of each resume),
+backfilled in batches, and on SQLite an FTS5 index over it kept in sync by
+triggers.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 02:07:38.676860
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS resume_documents_fts USING fts5("
+    "content, content='resume_documents', content_rowid='resume_id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS resume_documents_fts_ai AFTER INSERT ON resume_documents BEGIN "
+    "INSERT INTO resume_documents_fts(rowid, content) VALUES (new.resume_id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS resume_documents_fts_ad AFTER DELETE ON resume_documents BEGIN "
+    "INSERT INTO resume_documents_fts(resume_documents_fts, rowid, content) VALUES ('delete', old.resume_id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS resume_documents_fts_au AFTER UPDATE OF content ON resume_documents BEGIN "
+    "INSERT INTO resume_documents_fts(resume_documents_fts, rowid, content) VALUES ('delete', old.resume_id, old.content); "
+    "INSERT INTO resume_documents_fts(rowid, content) VALUES (new.resume_id, new.content); END"
+]
+
+
+def backfill_documents():
+    # Rendered with the application's own converter so the index matches live writes
+    from utils.file_parser import convert_resume_to_text
+
+    resumes = sa.table(
+        'resumes',
+        sa.column('id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('personal_info', sa.JSON),
+        sa.column('summary', sa.Text),
+        sa.column('experience', sa.JSON),
+        sa.column('education', sa.JSON),
+        sa.column('skills', sa.JSON)
+    )
+    documents = sa.table(
+        'resume_documents',
+        sa.column('resume_id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('content', sa.Text),
+        sa.column('updated_at', sa.DateTime)
+    )
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(resumes).where(resumes.c.id > last_id).order_by(resumes.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(documents.insert(), [
+            {'resume_id': row.id, 'user_id': row.user_id, 'content': convert_resume_to_text(row), 'updated_at': now}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('resume_documents',
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('resume_id')
+    )
+    with op.batch_alter_table('resume_documents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_resume_documents_user_id'), ['user_id'], unique=False)
+
+    # ### end Alembic commands ###
+    # The FTS triggers index each backfilled row as it is inserted
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+    backfill_documents()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('resume_documents_fts_ai', 'resume_documents_fts_ad', 'resume_documents_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS resume_documents_fts')
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('resume_documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_resume_documents_user_id'))
+
+    op.drop_table('resume_documents')
+    # ### end Alembic commands ###
@@ -0,0 +1,128 @@
+"""resume version history
+
+Adds resume_versions (a full snapshot every RESUME_SNAPSHOT_INTERVAL
+versions, JSON deltas in between), resume_sections (snapshot section values,
+shared by content hash) and resumes.version, and records every existing
+resume as version 1.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 02:36:40.874114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def backfill_versions():
+    # Hashed with the application's own helper so later saves reuse these sections
+    from utils.resume_history import snapshot_refs
+
+    resumes = sa.table(
+        'resumes',
+        sa.column('id', sa.Integer),
+        sa.column('version', sa.Integer),
+        sa.column('personal_info', sa.JSON),
+        sa.column('summary', sa.Text),
+        sa.column('target_role', sa.String),
+        sa.column('target_category', sa.String),
+        sa.column('education', sa.JSON),
+        sa.column('experience', sa.JSON),
+        sa.column('projects', sa.JSON),
+        sa.column('skills', sa.JSON),
+        sa.column('template', sa.String)
+    )
+    versions = sa.table(
+        'resume_versions',
+        sa.column('resume_id', sa.Integer),
+        sa.column('version', sa.Integer),
+        sa.column('kind', sa.String),
+        sa.column('changes', sa.JSON),
+        sa.column('created_at', sa.DateTime)
+    )
+    section_table = sa.table(
+        'resume_sections',
+        sa.column('hash', sa.String),
+        sa.column('content', sa.JSON),
+        sa.column('created_at', sa.DateTime)
+    )
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(resumes).where(resumes.c.id > last_id).order_by(resumes.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        sections = {}
+        snapshots = [
+            {'resume_id': row.id, 'version': 1, 'kind': 'snapshot',
+             'changes': snapshot_refs(row, sections), 'created_at': now}
+            for row in rows
+        ]
+        stored = set(bind.execute(
+            sa.select(section_table.c.hash).where(section_table.c.hash.in_(list(sections)))
+        ).scalars())
+        new_sections = [
+            {'hash': key, 'content': value, 'created_at': now}
+            for key, value in sections.items() if key not in stored
+        ]
+        if new_sections:
+            bind.execute(section_table.insert(), new_sections)
+        bind.execute(versions.insert(), snapshots)
+        bind.execute(resumes.update().where(resumes.c.id.between(rows[0].id, rows[-1].id)).values(version=1))
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('resume_sections',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('content', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.create_table('resume_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('changes', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('resume_versions', schema=None) as batch_op:
+        batch_op.create_index('ix_resume_versions_resume_version', ['resume_id', 'version'], unique=True)
+
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+    # ### end Alembic commands ###
+    backfill_versions()
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('resumes', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('resume_versions', schema=None) as batch_op:
+        batch_op.drop_index('ix_resume_versions_resume_version')
+
+    op.drop_table('resume_versions')
+    op.drop_table('resume_sections')
+    # ### end Alembic commands ###
@@ -1,33 +1,184 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, LargeBinary, Index, event, inspect
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from datetime import datetime
+import uuid
+import zlib
 from models import db
 
+def compress_text(text):
+    """zlib-compressed UTF-8 bytes of text (None stays None)"""
+    return None if text is None else zlib.compress(text.encode('utf-8'), 6)
+
+def decompress_text(data):
+    """Inverse of compress_text"""
+    return None if data is None else zlib.decompress(data).decode('utf-8')
+
 class Analysis(db.Model):
     __tablename__ = 'analyses'
     
     id = Column(Integer, primary_key=True)
-    resume_id = Column(Integer, ForeignKey('resumes.id'), nullable=False, index=True)
+    # Client-visible token, assigned before the row is written (see utils/analysis_writer.py)
+    public_id = Column(String(32), unique=True, index=True)  # Assigned in __init__
+    resume_id = Column(Integer, ForeignKey('resumes.id'), nullable=True, index=True)  # None for uploaded files
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
     analysis_type = Column(String(50), nullable=False, index=True)  # 'standard' or 'ai'
     scores = Column(JSON)  # Dictionary of scores
+    # Typed copies of the scores JSON for filtering, sorting and aggregates (kept in sync on write)
+    ats_score = Column(Integer, index=True)
+    overall_score = Column(Integer, index=True)
+    keyword_match_score = Column(Integer)
+    format_score = Column(Integer)
+    section_score = Column(Integer)
     keyword_match = Column(JSON)  # Dictionary of keyword match data
     suggestions = Column(JSON)  # Dictionary of suggestions
-    ai_analysis = Column(JSON)  # AI-specific analysis data
-    job_description = Column(Text)
-    created_at = Column(DateTime, default=func.now())
+    # Large payloads are only loaded when asked for (undefer_group('detail'))
+    ai_analysis = deferred(Column(JSON), group='detail')  # AI-specific analysis data, minus fullResponse
+    # The LLM's full markdown response, compressed; only loaded for a single analysis or an export
+    full_response = deferred(Column(LargeBinary))
+    job_description = deferred(Column(Text), group='detail')
+    # Hash of the analysis inputs; a matching row can be replayed instead of recomputed (replay_result)
+    fingerprint = Column(String(64), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # Microsecond precision keeps keyset cursors exact
+    # Changes on every write after the insert (e.g. retention stripping details); part of the ETag
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Backs the per-user history listing and its (created_at, id) keyset pagination
+        Index('ix_analyses_user_created', 'user_id', 'created_at', 'id'),
+    )
+    
+    FIELDS = (
+        'id', 'public_id', 'resume_id', 'user_id', 'analysis_type', 'scores', 'keyword_match',
+        'suggestions', 'ai_analysis', 'job_description', 'created_at'
+    )
+    
+    # scores JSON key -> typed column
+    SCORE_COLUMNS = {
+        'atsScore': 'ats_score',
+        'overallScore': 'overall_score',
+        'keywordMatchScore': 'keyword_match_score',
+        'formatScore': 'format_score',
+        'sectionScore': 'section_score'
+    }
+    
+    def __init__(self, **kwargs):
+        # The token is needed before the row is written (write-behind), so it is set here
+        # rather than as a column default
+        if not kwargs.get('public_id'):
+            kwargs['public_id'] = uuid.uuid4().hex
+        # ai_analysis.fullResponse is stored compressed in its own column
+        ai_analysis = kwargs.get('ai_analysis')
+        if isinstance(ai_analysis, dict) and 'fullResponse' in ai_analysis:
+            full_response = ai_analysis.get('fullResponse')
+            kwargs['ai_analysis'] = {key: value for key, value in ai_analysis.items() if key != 'fullResponse'}
+            kwargs['full_response'] = compress_text(full_response)
+        super(Analysis, self).__init__(**kwargs)
+    
+    def full_ai_analysis(self):
+        """ai_analysis with fullResponse restored (loads the compressed column if needed)"""
+        if self.ai_analysis is None:
+            return None
+        data = dict(self.ai_analysis)
+        if self.full_response is not None:
+            data['fullResponse'] = decompress_text(self.full_response)
+        return data
+    
+    def can_replay(self):
+        """Whether replay_result can rebuild the analyzer output (retention may have stripped it)"""
+        return self.fingerprint is not None and self.suggestions is not None and self.keyword_match is not None
     
-    def to_dict(self):
-        """Convert analysis to dictionary"""
+    def replay_result(self, basic_info):
+        """The analyzer output this analysis was saved from, rebuilt from its columns
+        
+        ``basic_info`` is extract_basic_info() of the resume text; it isn't stored
+        since re-extracting it from the (fingerprint-identical) text is cheap.
+        """
+        scores = self.scores or {}
+        keyword_match = self.keyword_match
+        suggestions = self.suggestions
+        result = {
+            **basic_info,
+            'ats_score': scores.get('atsScore', 0),
+            'keyword_match': {
+                'score': keyword_match.get('score', 0),
+                'matched_skills': keyword_match.get('matchedSkills', []),
+                'missing_skills': keyword_match.get('missingSkills', [])
+            },
+            'format_score': scores.get('formatScore', 0),
+            'section_score': scores.get('sectionScore', 0),
+            **{f'{section}_suggestions': suggestions.get(section, []) for section in
+               ('contact', 'summary', 'skills', 'experience', 'education', 'format')},
+            'document_type': 'resume'
+        }
+        ai_analysis = self.full_ai_analysis()
+        if ai_analysis is not None:
+            result.update({
+                'analysis': ai_analysis.get('fullResponse', ''),
+                'resume_score': scores.get('overallScore', 0),
+                'strengths': ai_analysis.get('strengths', []),
+                'weaknesses': ai_analysis.get('weaknesses', []),
+                'recommendations': ai_analysis.get('recommendations', []),
+                'model_used': ai_analysis.get('model')
+            })
+        return result
+    
+    # Columns an analysis is recreated from (see to_payload)
+    PAYLOAD_COLUMNS = (
+        'public_id', 'resume_id', 'user_id', 'analysis_type', 'scores', 'keyword_match',
+        'suggestions', 'job_description', 'fingerprint'
+    )
+    
+    def to_payload(self):
+        """JSON-safe constructor arguments that recreate this analysis: Analysis(**to_payload())"""
+        payload = {column: getattr(self, column) for column in self.PAYLOAD_COLUMNS}
+        payload['ai_analysis'] = self.full_ai_analysis()
+        payload['created_at'] = self.created_at.isoformat() if self.created_at else None
+        return payload
+    
+    @classmethod
+    def from_payload(cls, payload):
+        """Inverse of to_payload"""
+        kwargs = dict(payload)
+        if kwargs.get('created_at'):
+            kwargs['created_at'] = datetime.fromisoformat(kwargs['created_at'])
+        return cls(**kwargs)
+    
+    def sync_score_columns(self):
+        """Copy the scores JSON into the typed score columns"""
+        scores = self.scores or {}
+        for key, column in self.SCORE_COLUMNS.items():
+            value = scores.get(key)
+            setattr(self, column, int(round(value)) if isinstance(value, (int, float)) else None)
+    
+    def to_dict(self, fields=None):
+        """Convert analysis to dictionary, optionally restricted to ``fields``"""
+        if fields is not None:
+            data = {}
+            for field in fields:
+                value = getattr(self, field)
+                data[field] = value.isoformat() if field == 'created_at' else value
+            return data
         return {
             'id': self.id,
+            'public_id': self.public_id,
             'resume_id': self.resume_id,
             'user_id': self.user_id,
             'analysis_type': self.analysis_type,
             'scores': self.scores,
             'keyword_match': self.keyword_match,
             'suggestions': self.suggestions,
-            'ai_analysis': self.ai_analysis,
+            # fullResponse only when the compressed column was loaded, never as a lazy load per row
+            'ai_analysis': self.ai_analysis if 'full_response' in inspect(self).unloaded else self.full_ai_analysis(),
             'job_description': self.job_description,
             'created_at': self.created_at.isoformat()
         }
+
+@event.listens_for(Analysis, 'before_insert')
+def _sync_score_columns(mapper, connection, analysis):
+    analysis.sync_score_columns()
+
+@event.listens_for(Analysis, 'before_update')
+def _resync_score_columns(mapper, connection, analysis):
+    if inspect(analysis).attrs.scores.history.has_changes():
+        analysis.sync_score_columns()
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from datetime import datetime
+from models import db
+
+class AnalysisDeadLetter(db.Model):
+    """A write-behind analysis that could not be inserted after every retry
+
+    Kept so nothing a user was told is saved gets lost; ``flask
+    replay-analysis-dead-letters`` inserts them again once the cause is fixed.
+    """
+    __tablename__ = 'analysis_dead_letters'
+
+    id = Column(Integer, primary_key=True)
+    public_id = Column(String(32), nullable=False, unique=True, index=True)
+    payload = Column(JSON, nullable=False)  # Analysis constructor arguments
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert dead letter to dictionary"""
+        return {
+            'id': self.id,
+            'public_id': self.public_id,
+            'payload': self.payload,
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat()
+        }
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Index
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
 from datetime import datetime
 from models import db
@@ -16,15 +17,45 @@ class Resume(db.Model):
     projects = Column(JSON)  # List of project objects
     skills = Column(JSON)  # Skills object
     template = Column(String(255))
+    # personal_info.name extracted in SQL, so listings can show it without decoding personal_info
+    name = column_property(personal_info['name'].as_string(), deferred=True)
+    version = Column(Integer, nullable=False, default=0, server_default='0')  # Latest resume_versions entry
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_resumes_user_created', 'user_id', 'created_at', 'id'),
+    )
+    
+    # Fetch SQL-computed values (the version bump) with RETURNING where the database supports it
+    __mapper_args__ = {'eager_defaults': True}
     
     # Relationships
     analyses = db.relationship('Analysis', backref='resume', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert resume to dictionary"""
+    FIELDS = (
+        'id', 'personal_info', 'summary', 'target_role', 'target_category', 'education',
+        'experience', 'projects', 'skills', 'template', 'user_id', 'created_at', 'updated_at'
+    )
+    
+    # Selectable with ?fields= on resume listings
+    LIST_FIELDS = FIELDS + ('name', 'version')
+    
+    # Named projections for ?view=; 'summary' is what a list view shows, without the JSON columns
+    VIEWS = {
+        'summary': ('id', 'name', 'target_role', 'target_category', 'template', 'version', 'user_id',
+                    'created_at', 'updated_at')
+    }
+    
+    def to_dict(self, fields=None):
+        """Convert resume to dictionary, optionally restricted to ``fields``"""
+        if fields is not None:
+            data = {}
+            for field in fields:
+                value = getattr(self, field)
+                data[field] = value.isoformat() if field in ('created_at', 'updated_at') else value
+            return data
         return {
             'id': self.id,
             'personal_info': self.personal_info,
@@ -36,6 +67,7 @@ class Resume(db.Model):
             'projects': self.projects,
             'skills': self.skills,
             'template': self.template,
+            'version': self.version,
             'user_id': self.user_id,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, DateTime, Text, ForeignKey, DDL, event
+from datetime import datetime
+from models import db
+
+class ResumeDocument(db.Model):
+    """Searchable plain-text rendering of a resume (convert_resume_to_text)"""
+    __tablename__ = 'resume_documents'
+
+    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    content = Column(Text, nullable=False, default='')
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert search document to dictionary"""
+        return {
+            'resume_id': self.resume_id,
+            'user_id': self.user_id,
+            'content': self.content,
+            'updated_at': self.updated_at.isoformat()
+        }
+
+# SQLite: FTS5 index over the document text, kept in sync by triggers.
+# Migration 0005 creates the same objects on existing databases.
+RESUME_DOCUMENTS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS resume_documents_fts USING fts5("
+    "content, content='resume_documents', content_rowid='resume_id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS resume_documents_fts_ai AFTER INSERT ON resume_documents BEGIN "
+    "INSERT INTO resume_documents_fts(rowid, content) VALUES (new.resume_id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS resume_documents_fts_ad AFTER DELETE ON resume_documents BEGIN "
+    "INSERT INTO resume_documents_fts(resume_documents_fts, rowid, content) VALUES ('delete', old.resume_id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS resume_documents_fts_au AFTER UPDATE OF content ON resume_documents BEGIN "
+    "INSERT INTO resume_documents_fts(resume_documents_fts, rowid, content) VALUES ('delete', old.resume_id, old.content); "
+    "INSERT INTO resume_documents_fts(rowid, content) VALUES (new.resume_id, new.content); END"
+]
+
+for statement in RESUME_DOCUMENTS_FTS_DDL:
+    event.listen(ResumeDocument.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(ResumeDocument.__table__, 'before_drop',
+             DDL('DROP TABLE IF EXISTS resume_documents_fts').execute_if(dialect='sqlite'))
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DateTime, JSON
+from datetime import datetime
+from models import db
+
+class ResumeSkills(db.Model):
+    """Skills detected in a resume; source of the in-memory skill index"""
+    __tablename__ = 'resume_skills'
+
+    # No foreign key: a deleted resume leaves an empty row behind so other
+    # processes see the deletion when they refresh their index
+    resume_id = Column(Integer, primary_key=True)
+    skills = Column(JSON, nullable=False, default=list)  # Lower-cased skill keys
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        """Convert skill set to dictionary"""
+        return {
+            'resume_id': self.resume_id,
+            'skills': self.skills,
+            'updated_at': self.updated_at.isoformat()
+        }
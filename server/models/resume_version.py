@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
+from datetime import datetime
+from models import db
+
+class ResumeSection(db.Model):
+    """One resume section value, stored once and shared by every snapshot that contains it"""
+    __tablename__ = 'resume_sections'
+
+    hash = Column(String(64), primary_key=True)  # sha256 of the canonical JSON
+    content = Column(JSON, nullable=False)
+    # Snapshots referring to this section; it is deleted when the count drops to zero
+    refs = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ResumeVersion(db.Model):
+    """One saved version of a resume
+
+    A snapshot maps each versioned field to the hash of its ResumeSection
+    (None for an empty field); a delta maps only the fields that changed to
+    a JSON diff against the previous version.
+    """
+    __tablename__ = 'resume_versions'
+
+    id = Column(Integer, primary_key=True)
+    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False)
+    version = Column(Integer, nullable=False)
+    kind = Column(String(10), nullable=False)  # 'snapshot' or 'delta'
+    changes = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_resume_versions_resume_version', 'resume_id', 'version', unique=True),
+    )
+
+    def to_dict(self):
+        """Convert version metadata to dictionary"""
+        return {
+            'version': self.version,
+            'kind': self.kind,
+            'changed_fields': sorted(self.changes) if self.kind == 'delta' else None,
+            'created_at': self.created_at.isoformat()
+        }
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Date
+from models import db
+
+class DailyRollup(db.Model):
+    __tablename__ = 'daily_rollups'
+
+    # One counter per (day, metric, dimensions); unused dimensions are ''
+    day = Column(Date, primary_key=True)
+    metric = Column(String(32), primary_key=True)  # 'users', 'resumes' or 'analyses'
+    analysis_type = Column(String(50), primary_key=True, default='')
+    category = Column(String(255), primary_key=True, default='')
+    score_bucket = Column(String(16), primary_key=True, default='')
+    count = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            'day': self.day.isoformat(),
+            'metric': self.metric,
+            'analysis_type': self.analysis_type,
+            'category': self.category,
+            'score_bucket': self.score_bucket,
+            'count': self.count
+        }
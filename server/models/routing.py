@@ -0,0 +1,119 @@
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.sql.dml import UpdateBase
+import os
+import threading
+import time
+
+# Bind key of the read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+# After a failed health check the replica is skipped for this long
+REPLICA_RETRY_INTERVAL = float(os.getenv('REPLICA_RETRY_INTERVAL', 30))
+# Reads by a user who just committed stay on the primary for this long (replication lag)
+REPLICA_PIN_SECONDS = float(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+class ReplicaRouter:
+    """Decides whether a read may go to the replica
+
+    Reads are routed only inside views marked with ``read_replica``. The
+    replica is health-checked once per request; a failure sends traffic to
+    the primary for ``retry_interval`` seconds. Users who committed a write
+    are pinned to the primary for ``pin_seconds`` so they read their own
+    writes. Pins are per process, so with several workers the window is
+    best-effort.
+    """
+
+    def __init__(self, retry_interval=REPLICA_RETRY_INTERVAL, pin_seconds=REPLICA_PIN_SECONDS):
+        self.retry_interval = retry_interval
+        self.pin_seconds = pin_seconds
+        self._down_until = 0
+        self._pins = {}  # user id -> monotonic time the pin expires
+        self._lock = threading.Lock()
+
+    def pin_user(self, user_id):
+        """Send this user's reads to the primary for the next pin_seconds"""
+        now = time.monotonic()
+        with self._lock:
+            self._pins[user_id] = now + self.pin_seconds
+            # Drop expired pins now and then so the dict stays small
+            if len(self._pins) > 1000:
+                self._pins = {uid: until for uid, until in self._pins.items() if until > now}
+
+    def is_pinned(self, user_id):
+        with self._lock:
+            until = self._pins.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def mark_down(self):
+        self._down_until = time.monotonic() + self.retry_interval
+
+    def _healthy(self, engine):
+        if time.monotonic() < self._down_until:
+            return False
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            return True
+        except Exception as e:
+            print(f'Replica unavailable, reading from primary: {e}')
+            self.mark_down()
+            return False
+
+    def replica_for_request(self, engines):
+        """Replica engine for the current request's reads, or None for the primary"""
+        engine = engines.get(REPLICA_BIND)
+        if engine is None or not has_app_context() or not g.get('db_read_replica'):
+            return None
+        if g.get('db_pin_primary'):
+            return None
+        user = g.get('user')
+        if user and self.is_pinned(user['id']):
+            return None
+        # Checked once per request; a request keeps the choice it started with
+        if 'db_replica_ok' not in g:
+            g.db_replica_ok = self._healthy(engine)
+        return engine if g.db_replica_ok else None
+
+replica_router = ReplicaRouter()
+
+def pin_primary():
+    """Send the rest of this request's reads to the primary"""
+    g.db_pin_primary = True
+
+# Request state replica_for_request() routes on
+_ROUTING_KEYS = ('db_read_replica', 'db_pin_primary', 'user')
+
+def routing_state():
+    """The current request's routing flags, for work done on its behalf in another context"""
+    if not has_app_context():
+        return {}
+    return {key: g.get(key) for key in _ROUTING_KEYS if key in g}
+
+def apply_routing_state(state):
+    """Route this app context's reads like the request routing_state() was taken from"""
+    for key, value in state.items():
+        setattr(g, key, value)
+
+class RoutingSession(Session):
+    """db.session that sends reads in replica-enabled views to the replica
+
+    Flushes and Core INSERT/UPDATE/DELETE always go to the primary, and once
+    a session has written, the rest of its reads do too.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get('db_wrote'):
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info['db_wrote'] = True
+            else:
+                engine = replica_router.replica_for_request(self._db.engines)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self):
+        # commit() flushes first, so check for writes afterwards
+        super().commit()
+        if self.info.get('db_wrote') and has_app_context() and g.get('user'):
+            replica_router.pin_user(g.user['id'])
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, DDL, event, inspect
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
-import bcrypt
 import jwt
 import os
 from models import db
+from utils.password_hasher import password_hasher
+
+def normalize_search_text(value):
+    """Case-fold and collapse whitespace so lookups can use a plain B-tree range scan"""
+    return ' '.join((value or '').split()).casefold()
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -13,29 +17,42 @@ class User(db.Model):
     email = Column(String(255), unique=True, nullable=False, index=True)
     password = Column(String(255), nullable=False)
     name = Column(String(255), nullable=False)
+    name_normalized = Column(String(255), index=True)  # normalize_search_text(name), for prefix search
     role = Column(String(50), default='user')  # 'user' or 'admin'
     is_active = Column(Boolean, default=True)
-    last_login = Column(DateTime)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    last_login = Column(DateTime, index=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default='0')  # Bumped to revoke issued tokens
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     resumes = db.relationship('Resume', backref='user', lazy=True, cascade='all, delete-orphan')
     analyses = db.relationship('Analysis', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    FIELDS = ('id', 'name', 'email', 'role', 'is_active', 'last_login', 'created_at', 'updated_at')
+    
     def __init__(self, **kwargs):
+        password = kwargs.pop('password', None)
         super(User, self).__init__(**kwargs)
-        if 'password' in kwargs:
-            self.set_password(kwargs['password'])
+        if password is not None:
+            self.set_password(password)
     
     def set_password(self, password):
-        """Hash password before saving"""
-        salt = bcrypt.gensalt()
-        self.password = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash password before saving; replacing an existing password revokes issued tokens"""
+        if self.password:
+            self.token_version = (self.token_version or 0) + 1
+        self.password = password_hasher.hash(password)
     
-    def compare_password(self, candidate_password):
-        """Compare candidate password with stored hash"""
-        return bcrypt.checkpw(candidate_password.encode('utf-8'), self.password.encode('utf-8'))
+    def compare_password(self, candidate_password, admit=False):
+        """Compare candidate password with stored hash (admit=True may raise HasherBusy)"""
+        return password_hasher.verify(candidate_password, self.password, admit=admit)
+    
+    def upgrade_password_hash(self, password):
+        """Re-hash a just-verified password if it was hashed below the configured bcrypt cost"""
+        if password_hasher.needs_rehash(self.password):
+            self.password = password_hasher.hash(password)
+            return True
+        return False
     
     def generate_token(self):
         """Generate JWT token for user"""
@@ -43,6 +60,7 @@ class User(db.Model):
             'id': self.id,
             'email': self.email,
             'role': self.role,
+            'ver': self.token_version or 0,
             'exp': datetime.utcnow() + timedelta(days=7)
         }
         return jwt.encode(payload, os.getenv('JWT_SECRET', 'your-secret-key'), algorithm='HS256')
@@ -59,3 +77,30 @@ class User(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
+
+@event.listens_for(User, 'before_insert')
+def _normalize_name(mapper, connection, user):
+    user.name_normalized = normalize_search_text(user.name)
+
+@event.listens_for(User, 'before_update')
+def _renormalize_name(mapper, connection, user):
+    if inspect(user).attrs.name.history.has_changes():
+        user.name_normalized = normalize_search_text(user.name)
+
+# SQLite: trigram FTS5 index over name_normalized/email for substring search, kept in sync by triggers.
+# Migration 0004 creates the same objects on existing databases.
+USERS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "name_normalized, email, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name_normalized, email) VALUES (new.id, new.name_normalized, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name_normalized, email) VALUES ('delete', old.id, old.name_normalized, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name_normalized, email ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name_normalized, email) VALUES ('delete', old.id, old.name_normalized, old.email); "
+    "INSERT INTO users_fts(rowid, name_normalized, email) VALUES (new.id, new.name_normalized, new.email); END"
+]
+
+for statement in USERS_FTS_DDL:
+    event.listen(User.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(User.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS users_fts').execute_if(dialect='sqlite'))
@@ -1,120 +1,151 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, Response, stream_with_context
+from models import db
 from models.user import User
 from models.resume import Resume
 from models.analysis import Analysis
+from models.rollup import DailyRollup
+from sqlalchemy import func
+from sqlalchemy.orm import undefer_group
 from middleware.auth import authenticate_token, require_admin
+from middleware.replica import read_replica
+from utils.export import generate_csv, generate_ndjson, generate_json
+from utils.rollups import SCORE_BUCKETS
+from utils.response_cache import admin_cache
+from utils.pagination import paginate_listing, page_fields, parse_page_size, parse_projection, project_columns
+from utils.user_search import user_search_filter
+from utils.skill_index import rank_resumes, skills_in_text
+from utils.resume_analyzer import JOB_ROLES
+from utils.password_hasher import password_hasher
+from utils.bulk_delete import delete_users
 from datetime import datetime, timedelta
-import csv
-import io
 
 admin_bp = Blueprint('admin', __name__)
 
+MAX_BULK_DELETE_USERS = 10000
+
+def _dashboard_stats():
+    """Compute the admin dashboard stats
+
+    activeUsers reads users.last_login, which the login buffer writes behind:
+    logins from the last LAST_LOGIN_FLUSH_INTERVAL seconds (plus replica lag)
+    may not be counted yet.
+    """
+    seven_days_ago = datetime.utcnow() - timedelta(days=7)
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    
+    def scalar(query):
+        return query.scalar_subquery()
+    
+    # Counts and average scores in a single round-trip
+    totals = db.session.query(
+        scalar(db.session.query(func.count(User.id))).label('total_users'),
+        scalar(db.session.query(func.count(Resume.id))).label('total_resumes'),
+        scalar(db.session.query(func.count(Analysis.id))).label('total_analyses'),
+        scalar(db.session.query(func.count(User.id)).filter(User.created_at >= seven_days_ago)).label('recent_users'),
+        scalar(db.session.query(func.count(Analysis.id)).filter(Analysis.created_at >= seven_days_ago)).label('recent_analyses'),
+        scalar(db.session.query(func.count(User.id)).filter(User.last_login >= thirty_days_ago)).label('active_users'),
+        scalar(db.session.query(func.avg(Analysis.ats_score))).label('avg_ats_score'),
+        scalar(db.session.query(func.avg(Analysis.overall_score))).label('avg_overall_score')
+    ).one()
+    
+    # Get analysis types distribution
+    analysis_types = dict(
+        db.session.query(Analysis.analysis_type, func.count(Analysis.id))
+        .group_by(Analysis.analysis_type)
+        .all()
+    )
+    
+    # Get top job roles
+    role_count = func.count(Resume.id).label('count')
+    top_job_roles = (
+        db.session.query(Resume.target_role, role_count)
+        .group_by(Resume.target_role)
+        .order_by(role_count.desc())
+        .limit(10)
+        .all()
+    )
+    
+    return {
+        'totalUsers': totals.total_users,
+        'totalResumes': totals.total_resumes,
+        'totalAnalyses': totals.total_analyses,
+        'recentUsers': totals.recent_users,
+        'recentAnalyses': totals.recent_analyses,
+        'activeUsers': totals.active_users,
+        'analysisTypes': analysis_types,
+        'topJobRoles': [{'role': role, 'count': count} for role, count in top_job_roles],
+        'averageScores': {
+            'avgAtsScore': round(totals.avg_ats_score or 0, 2),
+            'avgOverallScore': round(totals.avg_overall_score or 0, 2)
+        }
+    }
+
 @admin_bp.route('/dashboard', methods=['GET'])
 @authenticate_token
 @require_admin
+@read_replica
 def dashboard():
     """Admin dashboard stats"""
     try:
-        # Get total counts
-        total_users = User.objects.count()
-        total_resumes = Resume.objects.count()
-        total_analyses = Analysis.objects.count()
-        
-        # Get recent users (last 7 days)
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        recent_users = User.objects(created_at__gte=seven_days_ago).count()
-        
-        # Get recent analyses (last 7 days)
-        recent_analyses = Analysis.objects(created_at__gte=seven_days_ago).count()
-        
-        # Get analysis types distribution
-        analysis_types = {}
-        for analysis in Analysis.objects:
-            analysis_type = analysis.analysis_type
-            analysis_types[analysis_type] = analysis_types.get(analysis_type, 0) + 1
-        
-        # Get top job roles
-        job_roles = {}
-        for resume in Resume.objects:
-            role = resume.target_role
-            job_roles[role] = job_roles.get(role, 0) + 1
-        
-        top_job_roles = sorted(job_roles.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        # Get average scores
-        total_ats_score = 0
-        total_overall_score = 0
-        analysis_count = 0
-        
-        for analysis in Analysis.objects:
-            if analysis.scores:
-                total_ats_score += analysis.scores.get('atsScore', 0)
-                total_overall_score += analysis.scores.get('overallScore', 0)
-                analysis_count += 1
-        
-        avg_ats_score = total_ats_score / analysis_count if analysis_count > 0 else 0
-        avg_overall_score = total_overall_score / analysis_count if analysis_count > 0 else 0
-        
-        # Get user activity (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        active_users = User.objects(last_login__gte=thirty_days_ago).count()
+        stats, cache_status = admin_cache.get_or_compute(('dashboard',), _dashboard_stats)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'stats': {
-                'totalUsers': total_users,
-                'totalResumes': total_resumes,
-                'totalAnalyses': total_analyses,
-                'recentUsers': recent_users,
-                'recentAnalyses': recent_analyses,
-                'activeUsers': active_users,
-                'analysisTypes': analysis_types,
-                'topJobRoles': [{'role': role, 'count': count} for role, count in top_job_roles],
-                'averageScores': {
-                    'avgAtsScore': round(avg_ats_score, 2),
-                    'avgOverallScore': round(avg_overall_score, 2)
-                }
-            }
+            'stats': stats
         })
+        response.headers['X-Cache'] = cache_status
+        return response
         
     except Exception as e:
         print(f'Dashboard stats error: {e}')
         return jsonify({'error': 'Error fetching dashboard stats'}), 500
 
+def _users_query(search='', role=''):
+    """Filtered user query; rebuilt per call so counts can run in a background thread"""
+    query = User.query
+    if search:
+        condition = user_search_filter(search, db.engine.dialect.name)
+        if condition is not None:
+            query = query.filter(condition)
+    if role:
+        query = query.filter(User.role == role)
+    return query
+
+def _cached_total(key, build_query, cache=True):
+    """Row count for a listing, served from the admin cache (stale-while-revalidate)
+
+    ``cache=False`` counts directly, for free-text filters whose every variant
+    would otherwise take a cache slot.
+    """
+    if request.args.get('includeTotal', 'true').lower() == 'false':
+        return None
+    if not cache:
+        return build_query().order_by(None).count()
+    total, _ = admin_cache.get_or_compute(('count',) + key, lambda: build_query().order_by(None).count())
+    return total
+
 @admin_bp.route('/users', methods=['GET'])
 @authenticate_token
 @require_admin
+@read_replica
 def get_users():
-    """Get all users"""
+    """Get all users (newest first, by cursor or by page)"""
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 10))
+        limit = parse_page_size(request.args.get('limit'), default=10)
         search = request.args.get('search', '')
         role = request.args.get('role', '')
         
-        # Build query
-        query = {}
-        if search:
-            query['$or'] = [
-                {'name__icontains': search},
-                {'email__icontains': search}
-            ]
-        if role:
-            query['role'] = role
-        
-        # Get users with pagination
-        skip = (page - 1) * limit
-        users = User.objects(**query).skip(skip).limit(limit).order_by('-created_at')
-        total = User.objects(**query).count()
+        users, next_cursor, page = paginate_listing(_users_query(search, role), User, request.args, limit)
+        total = _cached_total(('users', role), lambda: _users_query(search, role), cache=not search)
         
         return jsonify({
             'success': True,
             'users': [user.to_dict() for user in users],
-            'totalPages': (total + limit - 1) // limit,
-            'currentPage': page,
-            'total': total
+            **page_fields(next_cursor, page, total, limit)
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f'Get users error: {e}')
         return jsonify({'error': 'Error fetching users'}), 500
@@ -131,7 +162,7 @@ def update_user(user_id):
         role = data.get('role')
         is_active = data.get('isActive')
         
-        user = User.objects(id=user_id).first()
+        user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -144,7 +175,7 @@ def update_user(user_id):
         if is_active is not None:
             user.is_active = is_active
         
-        user.save()
+        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -162,14 +193,12 @@ def update_user(user_id):
 def delete_user(user_id):
     """Delete user"""
     try:
-        user = User.objects(id=user_id).first()
+        user = User.query.get(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Also delete user's resumes and analyses
-        Resume.objects(user_id=user).delete()
-        Analysis.objects(user_id=user).delete()
-        user.delete()
+        # Resumes and analyses are deleted set-based, in batches, without loading them
+        delete_users([user.id])
         
         return jsonify({
             'success': True,
@@ -180,125 +209,249 @@ def delete_user(user_id):
         print(f'Delete user error: {e}')
         return jsonify({'error': 'Error deleting user'}), 500
 
+@admin_bp.route('/users/bulk-delete', methods=['POST'])
+@authenticate_token
+@require_admin
+def bulk_delete_users():
+    """Delete many users and their data at once"""
+    try:
+        data = request.get_json() or {}
+        user_ids = data.get('userIds')
+        
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({'error': 'userIds must be a non-empty list'}), 400
+        
+        if len(user_ids) > MAX_BULK_DELETE_USERS:
+            return jsonify({'error': f'At most {MAX_BULK_DELETE_USERS} users can be deleted per request'}), 400
+        
+        try:
+            user_ids = sorted({int(user_id) for user_id in user_ids})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'userIds must be integers'}), 400
+        
+        counts = delete_users(user_ids)
+        
+        return jsonify({
+            'success': True,
+            'message': f"{counts['users']} users and associated data deleted successfully",
+            'deleted': counts
+        })
+        
+    except Exception as e:
+        print(f'Bulk delete users error: {e}')
+        return jsonify({'error': 'Error deleting users'}), 500
+
+def _analyses_query(analysis_type='', user_id='', score_range=()):
+    """Filtered analysis query; rebuilt per call so counts can run in a background thread"""
+    query = Analysis.query
+    if analysis_type:
+        query = query.filter(Analysis.analysis_type == analysis_type)
+    if user_id:
+        query = query.filter(Analysis.user_id == user_id)
+    
+    # Score range filters run against the indexed integer columns, e.g. ?maxScore=39
+    min_score, max_score, min_ats_score, max_ats_score = score_range or (None,) * 4
+    if min_score is not None:
+        query = query.filter(Analysis.overall_score >= min_score)
+    if max_score is not None:
+        query = query.filter(Analysis.overall_score <= max_score)
+    if min_ats_score is not None:
+        query = query.filter(Analysis.ats_score >= min_ats_score)
+    if max_ats_score is not None:
+        query = query.filter(Analysis.ats_score <= max_ats_score)
+    return query
+
 @admin_bp.route('/analyses', methods=['GET'])
 @authenticate_token
 @require_admin
+@read_replica
 def get_analyses():
-    """Get all analyses"""
+    """Get all analyses (newest first, by cursor or by page)"""
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 10))
+        limit = parse_page_size(request.args.get('limit'), default=10)
         analysis_type = request.args.get('type', '')
         user_id = request.args.get('userId', '')
+        score_range = tuple(
+            request.args.get(param, type=int)
+            for param in ('minScore', 'maxScore', 'minAtsScore', 'maxAtsScore')
+        )
         
-        # Build query
-        query = {}
-        if analysis_type:
-            query['analysis_type'] = analysis_type
-        if user_id:
-            query['user_id'] = user_id
-        
-        # Get analyses with pagination
-        skip = (page - 1) * limit
-        analyses = Analysis.objects(**query).skip(skip).limit(limit).order_by('-created_at')
-        total = Analysis.objects(**query).count()
+        query = _analyses_query(analysis_type, user_id, score_range).options(undefer_group('detail'))
+        analyses, next_cursor, page = paginate_listing(query, Analysis, request.args, limit)
+        total = _cached_total(('analyses', analysis_type, user_id, score_range),
+                              lambda: _analyses_query(analysis_type, user_id, score_range))
         
         return jsonify({
             'success': True,
             'analyses': [analysis.to_dict() for analysis in analyses],
-            'totalPages': (total + limit - 1) // limit,
-            'currentPage': page,
-            'total': total
+            **page_fields(next_cursor, page, total, limit)
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f'Get analyses error: {e}')
         return jsonify({'error': 'Error fetching analyses'}), 500
 
+def _resumes_query(category='', user_id=''):
+    """Filtered resume query; rebuilt per call so counts can run in a background thread"""
+    query = Resume.query
+    if category:
+        query = query.filter(Resume.target_category == category)
+    if user_id:
+        query = query.filter(Resume.user_id == user_id)
+    return query
+
 @admin_bp.route('/resumes', methods=['GET'])
 @authenticate_token
 @require_admin
+@read_replica
 def get_resumes():
-    """Get all resumes"""
+    """Get all resumes (newest first, by cursor or by page)"""
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 10))
+        limit = parse_page_size(request.args.get('limit'), default=10)
+        fields = parse_projection(request.args, Resume.LIST_FIELDS, Resume.VIEWS)
         category = request.args.get('category', '')
         user_id = request.args.get('userId', '')
         
-        # Build query
-        query = {}
-        if category:
-            query['target_category'] = category
-        if user_id:
-            query['user_id'] = user_id
-        
-        # Get resumes with pagination
-        skip = (page - 1) * limit
-        resumes = Resume.objects(**query).skip(skip).limit(limit).order_by('-created_at')
-        total = Resume.objects(**query).count()
+        query = project_columns(_resumes_query(category, user_id), Resume, fields)
+        resumes, next_cursor, page = paginate_listing(query, Resume, request.args, limit)
+        total = _cached_total(('resumes', category, user_id), lambda: _resumes_query(category, user_id))
         
         return jsonify({
             'success': True,
-            'resumes': [resume.to_dict() for resume in resumes],
-            'totalPages': (total + limit - 1) // limit,
-            'currentPage': page,
-            'total': total
+            'resumes': [resume.to_dict(fields) for resume in resumes],
+            **page_fields(next_cursor, page, total, limit)
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f'Get resumes error: {e}')
         return jsonify({'error': 'Error fetching resumes'}), 500
 
+@admin_bp.route('/resumes/rank', methods=['POST'])
+@authenticate_token
+@require_admin
+def rank_resumes_for_job():
+    """Top resumes for a job role and/or description, by keyword-match score"""
+    try:
+        data = request.get_json() or {}
+        job_role = data.get('jobRole')
+        job_category = data.get('jobCategory')
+        job_description = data.get('jobDescription') or ''
+        limit = parse_page_size(data.get('limit'), default=10)
+        
+        # Required skills: the role's list, vocabulary skills named in the description, explicit extras
+        required_skills = []
+        if job_role or job_category:
+            role_info = JOB_ROLES.get(job_category, {}).get(job_role)
+            if not role_info:
+                return jsonify({'error': 'Invalid job role or category'}), 400
+            required_skills.extend(role_info['required_skills'])
+        required_skills.extend(skills_in_text(job_description))
+        extra_skills = data.get('skills') or []
+        if not isinstance(extra_skills, list):
+            return jsonify({'error': 'skills must be a list'}), 400
+        required_skills.extend(extra_skills)
+        
+        if not required_skills:
+            return jsonify({'error': 'A job role, a job description naming known skills, or skills are required'}), 400
+        
+        ranked = rank_resumes(required_skills, limit)
+        resumes = Resume.query.filter(Resume.id.in_([result['resume_id'] for result in ranked])).all()
+        resumes = {resume.id: resume for resume in resumes}
+        
+        return jsonify({
+            'success': True,
+            'requiredSkills': list(dict.fromkeys(required_skills)),
+            'results': [{
+                'resume': resumes[result['resume_id']].to_dict(),
+                'score': result['score'],
+                'matchedSkills': result['matched_skills'],
+                'missingSkills': result['missing_skills']
+            } for result in ranked if result['resume_id'] in resumes]
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f'Rank resumes error: {e}')
+        return jsonify({'error': 'Error ranking resumes'}), 500
+
+@admin_bp.route('/auth/hashing', methods=['GET'])
+@authenticate_token
+@require_admin
+def get_hashing_stats():
+    """Password hashing executor counters (cost, queue depth, rejections, wait/hash times)"""
+    return jsonify({
+        'success': True,
+        'hashing': password_hasher.stats()
+    })
+
+def _analytics(period):
+    """Compute detailed analytics for the last ``period`` days from the daily rollup table"""
+    since = (datetime.utcnow() - timedelta(days=period)).date()
+    total = func.sum(DailyRollup.count)
+    
+    def daily_trend(metric):
+        rows = (
+            db.session.query(DailyRollup.day, total)
+            .filter(DailyRollup.metric == metric, DailyRollup.day >= since)
+            .group_by(DailyRollup.day)
+            .having(total > 0)
+            .order_by(DailyRollup.day)
+            .all()
+        )
+        return {day.isoformat(): count for day, count in rows}
+    
+    # User registration trend
+    user_trend = daily_trend('users')
+    
+    # Analysis trend
+    analysis_trend = daily_trend('analyses')
+    
+    # Score distribution of the analyses in the same period
+    score_distribution = {bucket: 0 for bucket in SCORE_BUCKETS}
+    for bucket, count in (
+        db.session.query(DailyRollup.score_bucket, total)
+        .filter(DailyRollup.metric == 'analyses', DailyRollup.day >= since)
+        .group_by(DailyRollup.score_bucket)
+    ):
+        score_distribution[bucket] = count
+    
+    # Job category distribution
+    job_category_distribution = dict(
+        db.session.query(DailyRollup.category, total)
+        .filter(DailyRollup.metric == 'resumes')
+        .group_by(DailyRollup.category)
+        .having(total > 0)
+        .all()
+    )
+    
+    return {
+        'userTrend': [{'date': date, 'count': count} for date, count in user_trend.items()],
+        'analysisTrend': [{'date': date, 'count': count} for date, count in analysis_trend.items()],
+        'scoreDistribution': [{'range': range_name, 'count': count} for range_name, count in score_distribution.items()],
+        'jobCategoryDistribution': [{'category': category, 'count': count} for category, count in job_category_distribution.items()]
+    }
+
 @admin_bp.route('/analytics', methods=['GET'])
 @authenticate_token
 @require_admin
+@read_replica
 def get_analytics():
     """Get detailed analytics"""
     try:
         period = int(request.args.get('period', 30))
-        days_ago = datetime.utcnow() - timedelta(days=period)
-        
-        # User registration trend
-        user_trend = {}
-        for user in User.objects(created_at__gte=days_ago):
-            date_str = user.created_at.strftime('%Y-%m-%d')
-            user_trend[date_str] = user_trend.get(date_str, 0) + 1
-        
-        # Analysis trend
-        analysis_trend = {}
-        for analysis in Analysis.objects(created_at__gte=days_ago):
-            date_str = analysis.created_at.strftime('%Y-%m-%d')
-            analysis_trend[date_str] = analysis_trend.get(date_str, 0) + 1
-        
-        # Score distribution
-        score_distribution = {'0-39': 0, '40-59': 0, '60-79': 0, '80-100': 0}
-        for analysis in Analysis.objects:
-            score = analysis.scores.get('overallScore', 0) if analysis.scores else 0
-            if score >= 80:
-                score_distribution['80-100'] += 1
-            elif score >= 60:
-                score_distribution['60-79'] += 1
-            elif score >= 40:
-                score_distribution['40-59'] += 1
-            else:
-                score_distribution['0-39'] += 1
-        
-        # Job category distribution
-        job_category_distribution = {}
-        for resume in Resume.objects:
-            category = resume.target_category
-            job_category_distribution[category] = job_category_distribution.get(category, 0) + 1
+        analytics, cache_status = admin_cache.get_or_compute(('analytics', period), lambda: _analytics(period))
         
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'analytics': {
-                'userTrend': [{'date': date, 'count': count} for date, count in user_trend.items()],
-                'analysisTrend': [{'date': date, 'count': count} for date, count in analysis_trend.items()],
-                'scoreDistribution': [{'range': range_name, 'count': count} for range_name, count in score_distribution.items()],
-                'jobCategoryDistribution': [{'category': category, 'count': count} for category, count in job_category_distribution.items()]
-            }
+            'analytics': analytics
         })
+        response.headers['X-Cache'] = cache_status
+        return response
         
     except Exception as e:
         print(f'Analytics error: {e}')
@@ -307,45 +460,34 @@ def get_analytics():
 @admin_bp.route('/export-data', methods=['POST'])
 @authenticate_token
 @require_admin
+@read_replica
 def export_data():
-    """Export data"""
+    """Export data as a streamed CSV, NDJSON or JSON download"""
     try:
         data = request.get_json()
         data_type = data.get('dataType')
         export_format = data.get('format', 'json')
         
-        if data_type == 'users':
-            data_list = [user.to_dict() for user in User.objects]
-        elif data_type == 'resumes':
-            data_list = [resume.to_dict() for resume in Resume.objects]
-        elif data_type == 'analyses':
-            data_list = [analysis.to_dict() for analysis in Analysis.objects]
-        else:
+        models = {'users': User, 'resumes': Resume, 'analyses': Analysis}
+        if data_type not in models:
             return jsonify({'error': 'Invalid data type'}), 400
+        model = models[data_type]
+        
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         
         if export_format == 'csv':
-            # Convert to CSV format
-            if not data_list:
+            if db.session.query(model.id).first() is None:
                 return jsonify({'error': 'No data to export'}), 400
             
-            # Create CSV
-            output = io.StringIO()
-            writer = csv.DictWriter(output, fieldnames=data_list[0].keys())
-            writer.writeheader()
-            writer.writerows(data_list)
-            
-            csv_data = output.getvalue()
-            output.close()
-            
-            return csv_data, 200, {
-                'Content-Type': 'text/csv',
-                'Content-Disposition': f'attachment; filename={data_type}-{datetime.now().strftime("%Y%m%d-%H%M%S")}.csv'
-            }
-        else:
-            return jsonify({
-                'success': True,
-                'data': data_list
+            return Response(stream_with_context(generate_csv(model)), mimetype='text/csv', headers={
+                'Content-Disposition': f'attachment; filename={data_type}-{timestamp}.csv'
+            })
+        elif export_format == 'ndjson':
+            return Response(stream_with_context(generate_ndjson(model)), mimetype='application/x-ndjson', headers={
+                'Content-Disposition': f'attachment; filename={data_type}-{timestamp}.ndjson'
             })
+        else:
+            return Response(stream_with_context(generate_json(model)), mimetype='application/json')
         
     except Exception as e:
         print(f'Export data error: {e}')
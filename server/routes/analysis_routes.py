@@ -1,11 +1,18 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, Response, stream_with_context
 from models.analysis import Analysis
 from models.resume import Resume
-from models.user import User
 from middleware.auth import authenticate_token, optional_auth
-from utils.file_parser import extract_text_from_file
-from utils.resume_analyzer import analyze_resume_standard, analyze_resume_ai
+from utils.file_parser import extract_text_from_file, convert_resume_to_text, ALLOWED_EXTENSIONS
+from utils.resume_analyzer import analyze_resume_standard, analyze_resume_ai, analysis_fingerprint, extract_basic_info, JOB_ROLES
+from models import db
+from utils.bulk_analyzer import analyze_archive
+from utils.pagination import keyset_paginate, parse_list_limit, parse_fields, project_columns
+from utils.http_cache import make_etag, etag_matches, not_modified, with_etag
+from utils.analysis_writer import analysis_writer
+from sqlalchemy.orm import undefer, undefer_group
+import json
 import os
+import zipfile
 from werkzeug.utils import secure_filename
 import uuid
 
@@ -13,82 +20,11 @@ analysis_bp = Blueprint('analysis', __name__)
 
 # File upload configuration
 UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def convert_resume_to_text(resume):
-    """Convert resume data to text for analysis"""
-    text = ''
-    
-    # Personal info
-    if resume.personal_info:
-        text += f"{resume.personal_info.get('name', '')}\n"
-        text += f"{resume.personal_info.get('email', '')}\n"
-        if resume.personal_info.get('phone'):
-            text += f"{resume.personal_info['phone']}\n"
-        if resume.personal_info.get('location'):
-            text += f"{resume.personal_info['location']}\n"
-        if resume.personal_info.get('linkedin'):
-            text += f"{resume.personal_info['linkedin']}\n"
-        if resume.personal_info.get('github'):
-            text += f"{resume.personal_info['github']}\n"
-        if resume.personal_info.get('portfolio'):
-            text += f"{resume.personal_info['portfolio']}\n"
-    
-    text += '\n'
-    
-    # Summary
-    if resume.summary:
-        text += f"SUMMARY\n{resume.summary}\n\n"
-    
-    # Experience
-    if resume.experience:
-        text += 'EXPERIENCE\n'
-        for exp in resume.experience:
-            text += f"{exp.get('position', '')} at {exp.get('company', '')}\n"
-            text += f"{exp.get('startDate', '')} - {exp.get('endDate', '')}\n"
-            if exp.get('description'):
-                text += f"{exp['description']}\n"
-            if exp.get('responsibilities'):
-                for resp in exp['responsibilities']:
-                    text += f"• {resp}\n"
-            if exp.get('achievements'):
-                for ach in exp['achievements']:
-                    text += f"• {ach}\n"
-            text += '\n'
-    
-    # Education
-    if resume.education:
-        text += 'EDUCATION\n'
-        for edu in resume.education:
-            text += f"{edu.get('degree', '')} in {edu.get('field', '')}\n"
-            text += f"{edu.get('school', '')}\n"
-            if edu.get('graduationDate'):
-                text += f"Graduated: {edu['graduationDate']}\n"
-            if edu.get('gpa'):
-                text += f"GPA: {edu['gpa']}\n"
-            if edu.get('achievements'):
-                for ach in edu['achievements']:
-                    text += f"• {ach}\n"
-            text += '\n'
-    
-    # Skills
-    if resume.skills:
-        text += 'SKILLS\n'
-        if resume.skills.get('technical'):
-            text += f"Technical: {', '.join(resume.skills['technical'])}\n"
-        if resume.skills.get('soft'):
-            text += f"Soft Skills: {', '.join(resume.skills['soft'])}\n"
-        if resume.skills.get('languages'):
-            text += f"Languages: {', '.join(resume.skills['languages'])}\n"
-        if resume.skills.get('tools'):
-            text += f"Tools: {', '.join(resume.skills['tools'])}\n"
-    
-    return text
-
 @analysis_bp.route('/standard', methods=['POST'])
 @optional_auth
 def standard_analysis():
@@ -132,9 +68,10 @@ def standard_analysis():
             
             # Save analysis to database if user is authenticated
             analysis_id = None
+            analysis_token = None
             if hasattr(g, 'user'):
                 analysis = Analysis(
-                    user_id=User.objects(id=g.user['id']).first(),
+                    user_id=g.user['id'],
                     analysis_type='standard',
                     scores={
                         'atsScore': analysis_result.get('ats_score', 0),
@@ -160,13 +97,19 @@ def standard_analysis():
                         'format': analysis_result.get('format_suggestions', [])
                     }
                 )
-                analysis.save()
-                analysis_id = str(analysis.id)
+                # Written inline, or queued when write-behind is on; a queued analysis is
+                # addressed by its token, which GET /api/analysis/<id> also accepts
+                if analysis_writer.save(analysis):
+                    analysis_id = str(analysis.id)
+                else:
+                    analysis_id = analysis.public_id
+                analysis_token = analysis.public_id
             
             return jsonify({
                 'success': True,
                 'analysis': analysis_result,
-                'analysisId': analysis_id
+                'analysisId': analysis_id,
+                'analysisToken': analysis_token
             })
             
         finally:
@@ -223,9 +166,10 @@ def ai_analysis():
             
             # Save analysis to database if user is authenticated
             analysis_id = None
+            analysis_token = None
             if hasattr(g, 'user'):
                 analysis = Analysis(
-                    user_id=User.objects(id=g.user['id']).first(),
+                    user_id=g.user['id'],
                     analysis_type='ai',
                     scores={
                         'atsScore': analysis_result.get('ats_score', 0),
@@ -256,13 +200,19 @@ def ai_analysis():
                     },
                     job_description=job_description
                 )
-                analysis.save()
-                analysis_id = str(analysis.id)
+                # Written inline, or queued when write-behind is on; a queued analysis is
+                # addressed by its token, which GET /api/analysis/<id> also accepts
+                if analysis_writer.save(analysis):
+                    analysis_id = str(analysis.id)
+                else:
+                    analysis_id = analysis.public_id
+                analysis_token = analysis.public_id
             
             return jsonify({
                 'success': True,
                 'analysis': analysis_result,
-                'analysisId': analysis_id
+                'analysisId': analysis_id,
+                'analysisToken': analysis_token
             })
             
         finally:
@@ -274,6 +224,47 @@ def ai_analysis():
         print(f'AI analysis error: {e}')
         return jsonify({'error': 'Error performing AI analysis'}), 500
 
+@analysis_bp.route('/bulk', methods=['POST'])
+@optional_auth
+def bulk_analysis():
+    """Standard analysis of every resume in a ZIP archive, streamed as NDJSON"""
+    try:
+        if 'archive' not in request.files:
+            return jsonify({'error': 'No archive uploaded'}), 400
+        
+        archive = request.files['archive']
+        if archive.filename == '':
+            return jsonify({'error': 'No archive selected'}), 400
+        
+        job_role = request.form.get('jobRole')
+        job_category = request.form.get('jobCategory')
+        
+        if not job_role or not job_category:
+            return jsonify({'error': 'Job role and category are required'}), 400
+        
+        if job_role not in JOB_ROLES.get(job_category, {}):
+            return jsonify({'error': 'Invalid job role or category'}), 400
+        
+        if not zipfile.is_zipfile(archive.stream):
+            return jsonify({'error': 'Only ZIP archives are allowed'}), 400
+        archive.stream.seek(0)
+        
+        def generate():
+            # Entries are read straight from the uploaded stream, never unpacked to disk
+            try:
+                for result in analyze_archive(archive.stream, job_role, job_category,
+                                              ALLOWED_EXTENSIONS, MAX_FILE_SIZE):
+                    yield json.dumps(result) + '\n'
+            except Exception as e:
+                print(f'Bulk analysis error: {e}')
+                yield json.dumps({'error': 'Error performing bulk analysis'}) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        print(f'Bulk analysis error: {e}')
+        return jsonify({'error': 'Error performing bulk analysis'}), 500
+
 @analysis_bp.route('/resume/<resume_id>', methods=['POST'])
 @authenticate_token
 def analyze_resume(resume_id):
@@ -283,8 +274,12 @@ def analyze_resume(resume_id):
         analysis_type = data.get('analysisType', 'standard')
         job_description = data.get('jobDescription', '')
         ai_model = data.get('aiModel', 'Google Gemini')
+        force = data.get('force', False)
+        
+        if not isinstance(force, bool):
+            return jsonify({'error': 'force must be true or false'}), 400
         
-        resume = Resume.objects(id=resume_id, user_id=g.user['id']).first()
+        resume = Resume.query.filter_by(id=resume_id, user_id=g.user['id']).first()
         
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
@@ -292,15 +287,37 @@ def analyze_resume(resume_id):
         # Convert resume data to text for analysis
         resume_text = convert_resume_to_text(resume)
         
+        # Replay the last identical analysis unless the caller forces a fresh one
+        fingerprint = analysis_fingerprint(resume_text, resume.target_role, resume.target_category,
+                                           analysis_type, job_description, ai_model)
+        if not force:
+            cached = Analysis.query.filter_by(
+                resume_id=resume.id,
+                user_id=g.user['id'],
+                fingerprint=fingerprint
+            ).order_by(Analysis.created_at.desc(), Analysis.id.desc()).first()
+            if cached and cached.can_replay():
+                return jsonify({
+                    'success': True,
+                    'analysis': cached.replay_result(extract_basic_info(resume_text)),
+                    'analysisId': str(cached.id),
+                    'analysisToken': cached.public_id,
+                    'cached': True
+                })
+        
         if analysis_type == 'ai':
             analysis_result = analyze_resume_ai(resume_text, resume.target_role, resume.target_category, job_description, ai_model)
         else:
             analysis_result = analyze_resume_standard(resume_text, resume.target_role, resume.target_category)
         
+        # A failed AI call silently falls back to the standard analysis; don't memoize that
+        if analysis_type == 'ai' and 'model_used' not in analysis_result:
+            fingerprint = None
+        
         # Save analysis
         analysis = Analysis(
-            resume_id=resume,
-            user_id=User.objects(id=g.user['id']).first(),
+            resume_id=resume.id,
+            user_id=g.user['id'],
             analysis_type=analysis_type,
             scores={
                 'atsScore': analysis_result.get('ats_score', 0),
@@ -329,15 +346,18 @@ def analyze_resume(resume_id):
                 'weaknesses': analysis_result.get('weaknesses', []),
                 'recommendations': analysis_result.get('recommendations', [])
             } or None,
-            job_description=job_description
+            job_description=job_description,
+            fingerprint=fingerprint
         )
         
-        analysis.save()
+        written = analysis_writer.save(analysis)
         
         return jsonify({
             'success': True,
             'analysis': analysis_result,
-            'analysisId': str(analysis.id)
+            'analysisId': str(analysis.id) if written else analysis.public_id,
+            'analysisToken': analysis.public_id,
+            'cached': False
         })
         
     except Exception as e:
@@ -347,33 +367,71 @@ def analyze_resume(resume_id):
 @analysis_bp.route('/', methods=['GET'])
 @authenticate_token
 def get_analyses():
-    """Get user's analysis history"""
+    """Get user's analysis history (newest first; cursor-paginated when ?limit= or ?cursor= is given)"""
     try:
-        analyses = Analysis.objects(user_id=g.user['id']).order_by('-created_at')
+        try:
+            limit = parse_list_limit(request.args)
+            fields = parse_fields(request.args.get('fields'), Analysis.FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = Analysis.query.filter_by(user_id=g.user['id'])
+        if fields is None:
+            query = query.options(undefer_group('detail'))
+        else:
+            query = project_columns(query, Analysis, fields)
+        
+        try:
+            analyses, next_cursor = keyset_paginate(query, Analysis, request.args.get('cursor'), limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'success': True,
-            'analyses': [analysis.to_dict() for analysis in analyses]
+            'analyses': [analysis.to_dict(fields) for analysis in analyses],
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None
         })
         
     except Exception as e:
         print(f'Get analyses error: {e}')
         return jsonify({'error': 'Error fetching analyses'}), 500
 
+def _analysis_key(analysis_id):
+    """Match an analysis by numeric id or by its public token"""
+    if analysis_id.isdigit():
+        return Analysis.id == int(analysis_id)
+    return Analysis.public_id == analysis_id
+
 @analysis_bp.route('/<analysis_id>', methods=['GET'])
 @authenticate_token
 def get_analysis(analysis_id):
     """Get specific analysis"""
     try:
-        analysis = Analysis.objects(id=analysis_id, user_id=g.user['id']).first()
-        
-        if not analysis:
+        # updated_at changes whenever the row is rewritten (e.g. by the retention purge)
+        version = db.session.query(Analysis.id, Analysis.updated_at).filter(
+            _analysis_key(analysis_id), Analysis.user_id == g.user['id']).first()
+        
+        if not version:
+            # Not written yet: serve it from the write-behind queue
+            queued = analysis_writer.pending(analysis_id)
+            if queued and queued['user_id'] == g.user['id']:
+                return jsonify({
+                    'success': True,
+                    'analysis': queued
+                })
             return jsonify({'error': 'Analysis not found'}), 404
         
-        return jsonify({
+        etag = make_etag('analysis', version.id, version.updated_at)
+        if etag_matches(etag):
+            return not_modified(etag)
+        
+        analysis = Analysis.query.options(undefer_group('detail'), undefer(Analysis.full_response)).get(version.id)
+        
+        return with_etag(jsonify({
             'success': True,
             'analysis': analysis.to_dict()
-        })
+        }), etag)
         
     except Exception as e:
         print(f'Get analysis error: {e}')
@@ -384,12 +442,13 @@ def get_analysis(analysis_id):
 def delete_analysis(analysis_id):
     """Delete analysis"""
     try:
-        analysis = Analysis.objects(id=analysis_id, user_id=g.user['id']).first()
+        analysis = Analysis.query.filter(_analysis_key(analysis_id), Analysis.user_id == g.user['id']).first()
         
         if not analysis:
             return jsonify({'error': 'Analysis not found'}), 404
         
-        analysis.delete()
+        db.session.delete(analysis)
+        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -1,10 +1,19 @@
 from flask import Blueprint, request, jsonify, g
 from models.user import User
+from models import db
 from middleware.auth import authenticate_token
+from utils.password_hasher import HasherBusy
+from utils.login_buffer import last_login_buffer
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
+def _hasher_busy_response():
+    """503 asking the client to retry once the password hashing queue has drained"""
+    response = jsonify({'error': 'Too many requests in progress, please retry shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -23,7 +32,7 @@ def register():
             return jsonify({'error': 'Password must be at least 6 characters long'}), 400
         
         # Check if user already exists
-        existing_user = User.objects(email=email.lower()).first()
+        existing_user = User.query.filter_by(email=email.lower()).first()
         if existing_user:
             return jsonify({'error': 'User with this email already exists'}), 400
         
@@ -33,7 +42,8 @@ def register():
             email=email.lower(),
             password=password
         )
-        user.save()
+        db.session.add(user)
+        db.session.commit()
         
         # Generate JWT token
         token = user.generate_token()
@@ -45,6 +55,9 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except HasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
         print(f'Registration error: {e}')
         return jsonify({'error': 'Error registering user'}), 500
@@ -62,7 +75,7 @@ def login():
             return jsonify({'error': 'Email and password are required'}), 400
         
         # Find user
-        user = User.objects(email=email.lower()).first()
+        user = User.query.filter_by(email=email.lower()).first()
         if not user:
             return jsonify({'error': 'Invalid credentials'}), 401
         
@@ -70,24 +83,33 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
-        # Verify password
-        if not user.compare_password(password):
+        # Verify password (turned away while the hashing queue is full)
+        if not user.compare_password(password, admit=True):
             return jsonify({'error': 'Invalid credentials'}), 401
         
-        # Update last login
-        user.last_login = datetime.utcnow()
-        user.save()
+        # Bring the stored hash up to the configured bcrypt cost
+        if user.upgrade_password_hash(password):
+            db.session.commit()
+        
+        # Update last login (written behind in batches, off the request path)
+        logged_in_at = datetime.utcnow()
+        last_login_buffer.record(user.id, logged_in_at)
         
         # Generate JWT token
         token = user.generate_token()
         
+        user_data = user.to_dict()
+        user_data['last_login'] = logged_in_at.isoformat()
+        
         return jsonify({
             'success': True,
             'message': 'Login successful',
             'token': token,
-            'user': user.to_dict()
+            'user': user_data
         })
         
+    except HasherBusy:
+        return _hasher_busy_response()
     except Exception as e:
         print(f'Login error: {e}')
         return jsonify({'error': 'Error during login'}), 500
@@ -97,7 +119,7 @@ def login():
 def get_profile():
     """Get user profile"""
     try:
-        user = User.objects(id=g.user['id']).first()
+        user = User.query.get(g.user['id'])
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -125,18 +147,18 @@ def update_profile():
             return jsonify({'error': 'Name and email are required'}), 400
         
         # Check if email is already taken by another user
-        existing_user = User.objects(email=email.lower(), id__ne=g.user['id']).first()
+        existing_user = User.query.filter(User.email == email.lower(), User.id != g.user['id']).first()
         if existing_user:
             return jsonify({'error': 'Email is already taken'}), 400
         
         # Update user
-        user = User.objects(id=g.user['id']).first()
+        user = User.query.get(g.user['id'])
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         user.name = name
         user.email = email.lower()
-        user.save()
+        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -165,7 +187,7 @@ def change_password():
             return jsonify({'error': 'New password must be at least 6 characters long'}), 400
         
         # Get user
-        user = User.objects(id=g.user['id']).first()
+        user = User.query.get(g.user['id'])
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -173,15 +195,19 @@ def change_password():
         if not user.compare_password(current_password):
             return jsonify({'error': 'Current password is incorrect'}), 400
         
-        # Update password
-        user.password = new_password
-        user.save()
+        # Update password; this bumps token_version, revoking every token issued so far
+        user.set_password(new_password)
+        db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': 'Password changed successfully'
+            'message': 'Password changed successfully',
+            'token': user.generate_token()
         })
         
+    except HasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
         print(f'Change password error: {e}')
         return jsonify({'error': 'Error changing password'}), 500
@@ -191,7 +217,7 @@ def change_password():
 def verify_token():
     """Verify JWT token"""
     try:
-        user = User.objects(id=g.user['id']).first()
+        user = User.query.get(g.user['id'])
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -2,7 +2,14 @@ from flask import Blueprint, request, jsonify, g
 from models.resume import Resume
 from models.user import User
 from middleware.auth import authenticate_token, optional_auth
-from utils.file_parser import extract_text_from_file
+from utils.file_parser import extract_text_from_file, ALLOWED_EXTENSIONS
+from utils.http_cache import make_etag, etag_matches, not_modified, with_etag
+from utils.pagination import keyset_paginate, parse_list_limit, parse_page, parse_page_size, parse_projection, project_columns
+from utils.resume_search import search_resumes
+from utils.bulk_delete import delete_resumes
+from utils.resume_history import list_versions, resume_at_version
+from models import db
+from sqlalchemy import func
 import os
 from werkzeug.utils import secure_filename
 import uuid
@@ -11,7 +18,6 @@ resume_bp = Blueprint('resume', __name__)
 
 # File upload configuration
 UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 def allowed_file(filename):
@@ -66,10 +72,11 @@ def create_resume():
     """Create new resume"""
     try:
         data = request.get_json()
-        data['user_id'] = User.objects(id=g.user['id']).first()
+        data['user_id'] = g.user['id']
         
         resume = Resume(**data)
-        resume.save()
+        db.session.add(resume)
+        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -83,33 +90,107 @@ def create_resume():
 @resume_bp.route('/', methods=['GET'])
 @authenticate_token
 def get_resumes():
-    """Get all resumes for user"""
+    """Get user's resumes (newest first; cursor-paginated when ?limit= or ?cursor= is given)"""
     try:
-        resumes = Resume.objects(user_id=g.user['id']).order_by('-created_at')
+        cursor = request.args.get('cursor')
+        try:
+            limit = parse_list_limit(request.args)
+            fields = parse_projection(request.args, Resume.LIST_FIELDS, Resume.VIEWS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({
+        # Cheap aggregate fingerprint of the list: changes on any create, update or delete
+        count, last_updated, id_sum = db.session.query(
+            func.count(Resume.id), func.max(Resume.updated_at), func.sum(Resume.id)
+        ).filter(Resume.user_id == g.user['id']).one()
+        etag = make_etag('resumes', g.user['id'], count, last_updated, id_sum, cursor, limit, fields)
+        if etag_matches(etag):
+            return not_modified(etag)
+        
+        # Only the requested columns are loaded, so a summary listing decodes no JSON
+        query = project_columns(Resume.query.filter_by(user_id=g.user['id']), Resume, fields)
+        
+        try:
+            resumes, next_cursor = keyset_paginate(query, Resume, cursor, limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return with_etag(jsonify({
             'success': True,
-            'resumes': [resume.to_dict() for resume in resumes]
-        })
+            'resumes': [resume.to_dict(fields) for resume in resumes],
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None
+        }), etag)
         
     except Exception as e:
         print(f'Get resumes error: {e}')
         return jsonify({'error': 'Error fetching resumes'}), 500
 
+@resume_bp.route('/search', methods=['GET'])
+@authenticate_token
+def search_resume_content():
+    """Full-text search over resume content (admins search every user's resumes)"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Search query is required'}), 400
+        
+        page = parse_page(request.args.get('page')) or 1
+        limit = parse_page_size(request.args.get('limit'), default=10)
+        # Results are list rows: the summary projection unless the client asks for other fields
+        fields = parse_projection(request.args, Resume.LIST_FIELDS, Resume.VIEWS) or Resume.VIEWS['summary']
+        
+        # Regular users only ever see their own resumes
+        user_id = g.user['id']
+        if g.user['role'] == 'admin':
+            user_id = request.args.get('userId', type=int)
+        
+        hits, total = search_resumes(query, user_id, limit, (page - 1) * limit)
+        resumes = project_columns(
+            Resume.query.filter(Resume.id.in_([hit['resume_id'] for hit in hits])), Resume, fields
+        ).all()
+        resumes = {resume.id: resume for resume in resumes}
+        
+        return jsonify({
+            'success': True,
+            'results': [{
+                'resume': resumes[hit['resume_id']].to_dict(fields),
+                'score': hit['score'],
+                'snippet': hit['snippet']
+            } for hit in hits if hit['resume_id'] in resumes],
+            'totalPages': (total + limit - 1) // limit,
+            'currentPage': page,
+            'total': total
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f'Search resumes error: {e}')
+        return jsonify({'error': 'Error searching resumes'}), 500
+
 @resume_bp.route('/<resume_id>', methods=['GET'])
 @authenticate_token
 def get_resume(resume_id):
     """Get specific resume"""
     try:
-        resume = Resume.objects(id=resume_id, user_id=g.user['id']).first()
+        # Check the validator before loading and decoding the JSON columns
+        version = db.session.query(Resume.id, Resume.updated_at).filter_by(
+            id=resume_id, user_id=g.user['id']).first()
         
-        if not resume:
+        if not version:
             return jsonify({'error': 'Resume not found'}), 404
         
-        return jsonify({
+        etag = make_etag('resume', version.id, version.updated_at)
+        if etag_matches(etag):
+            return not_modified(etag)
+        
+        resume = Resume.query.get(version.id)
+        
+        return with_etag(jsonify({
             'success': True,
             'resume': resume.to_dict()
-        })
+        }), etag)
         
     except Exception as e:
         print(f'Get resume error: {e}')
@@ -122,16 +203,16 @@ def update_resume(resume_id):
     try:
         data = request.get_json()
         
-        resume = Resume.objects(id=resume_id, user_id=g.user['id']).first()
+        resume = Resume.query.filter_by(id=resume_id, user_id=g.user['id']).first()
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
         
         # Update fields
         for key, value in data.items():
-            if hasattr(resume, key):
+            if key in Resume.FIELDS and key not in ('id', 'user_id', 'created_at', 'updated_at'):
                 setattr(resume, key, value)
         
-        resume.save()
+        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -147,12 +228,13 @@ def update_resume(resume_id):
 def delete_resume(resume_id):
     """Delete resume"""
     try:
-        resume = Resume.objects(id=resume_id, user_id=g.user['id']).first()
+        resume_pk = db.session.query(Resume.id).filter_by(id=resume_id, user_id=g.user['id']).scalar()
         
-        if not resume:
+        if not resume_pk:
             return jsonify({'error': 'Resume not found'}), 404
         
-        resume.delete()
+        # Analyses are deleted set-based rather than loaded through the ORM cascade
+        delete_resumes([resume_pk])
         
         return jsonify({
             'success': True,
@@ -168,7 +250,7 @@ def delete_resume(resume_id):
 def duplicate_resume(resume_id):
     """Duplicate resume"""
     try:
-        original_resume = Resume.objects(id=resume_id, user_id=g.user['id']).first()
+        original_resume = Resume.query.filter_by(id=resume_id, user_id=g.user['id']).first()
         
         if not original_resume:
             return jsonify({'error': 'Resume not found'}), 404
@@ -180,13 +262,16 @@ def duplicate_resume(resume_id):
         del resume_data['updated_at']
         
         # Update name to indicate it's a copy
+        # Copied so the original's loaded value isn't changed in place
         if 'personal_info' in resume_data and 'name' in resume_data['personal_info']:
+            resume_data['personal_info'] = dict(resume_data['personal_info'])
             resume_data['personal_info']['name'] = f"{resume_data['personal_info']['name']} (Copy)"
         
-        resume_data['user_id'] = User.objects(id=g.user['id']).first()
+        resume_data['user_id'] = g.user['id']
         
         new_resume = Resume(**resume_data)
-        new_resume.save()
+        db.session.add(new_resume)
+        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -196,3 +281,83 @@ def duplicate_resume(resume_id):
     except Exception as e:
         print(f'Duplicate resume error: {e}')
         return jsonify({'error': 'Error duplicating resume'}), 500
+
+@resume_bp.route('/<resume_id>/versions', methods=['GET'])
+@authenticate_token
+def get_resume_versions(resume_id):
+    """List saved versions of a resume, newest first"""
+    try:
+        resume_pk = db.session.query(Resume.id).filter_by(id=resume_id, user_id=g.user['id']).scalar()
+        
+        if not resume_pk:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        page = parse_page(request.args.get('page')) or 1
+        limit = parse_page_size(request.args.get('limit'))
+        
+        versions, total = list_versions(resume_pk, limit, (page - 1) * limit)
+        
+        return jsonify({
+            'success': True,
+            'versions': [version.to_dict() for version in versions],
+            'totalPages': (total + limit - 1) // limit,
+            'currentPage': page,
+            'total': total
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f'Get resume versions error: {e}')
+        return jsonify({'error': 'Error fetching resume versions'}), 500
+
+@resume_bp.route('/<resume_id>/versions/<int:version>', methods=['GET'])
+@authenticate_token
+def get_resume_version(resume_id, version):
+    """Reconstruct a resume as it was at a saved version"""
+    try:
+        resume_pk = db.session.query(Resume.id).filter_by(id=resume_id, user_id=g.user['id']).scalar()
+        
+        if not resume_pk:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        content = resume_at_version(resume_pk, version)
+        if content is None:
+            return jsonify({'error': 'Version not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'resume': dict(content, id=resume_pk, version=version)
+        })
+        
+    except Exception as e:
+        print(f'Get resume version error: {e}')
+        return jsonify({'error': 'Error fetching resume version'}), 500
+
+@resume_bp.route('/<resume_id>/versions/<int:version>/restore', methods=['POST'])
+@authenticate_token
+def restore_resume_version(resume_id, version):
+    """Make a saved version current again (recorded as a new version)"""
+    try:
+        resume = Resume.query.filter_by(id=resume_id, user_id=g.user['id']).first()
+        
+        if not resume:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        content = resume_at_version(resume.id, version)
+        if content is None:
+            return jsonify({'error': 'Version not found'}), 404
+        
+        for key, value in content.items():
+            setattr(resume, key, value)
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'resume': resume.to_dict()
+        })
+        
+    except Exception as e:
+        print(f'Restore resume version error: {e}')
+        return jsonify({'error': 'Error restoring resume version'}), 500
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+
+# Configure the app before it is imported: a scratch SQLite file and a cheap bcrypt cost
+_db_dir = tempfile.mkdtemp(prefix='resume-analyzer-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault('JWT_SECRET', 'test-secret-key-long-enough-for-hs256')
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app import app as flask_app
+from models import db
+from models.user import User
+from models.resume import Resume
+from utils.response_cache import admin_cache
+from utils.skill_index import skill_index
+from utils.user_cache import user_cache
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        admin_cache.clear()
+        user_cache.clear()
+        skill_index.reset()
+        yield flask_app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def user(app):
+    user = User(name='Ada', email='ada@example.com', password='secret1')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def auth_headers(user):
+    return {'Authorization': f'Bearer {user.generate_token()}'}
+
+def make_resume(user, **fields):
+    """Commit a resume for user with minimal valid content"""
+    data = {
+        'personal_info': {'name': user.name, 'email': user.email},
+        'summary': 'Python developer',
+        'target_role': 'Backend Developer',
+        'target_category': 'Software Development',
+        'skills': {'technical': ['Python']},
+        'experience': [{'position': 'Engineer', 'company': 'Acme'}]
+    }
+    data.update(fields)
+    resume = Resume(user_id=user.id, **data)
+    db.session.add(resume)
+    db.session.commit()
+    return resume
@@ -0,0 +1,36 @@
+import pytest
+from models import db
+from models.user import User
+
+@pytest.fixture
+def admin_headers(app):
+    admin = User(name='Root', email='root@example.com', password='secret1', role='admin')
+    db.session.add(admin)
+    for i in range(4):
+        db.session.add(User(name=f'User {i}', email=f'user{i}@example.com', password='secret1'))
+    db.session.commit()
+    return {'Authorization': f'Bearer {admin.generate_token()}'}
+
+def test_page_parameters_still_work(client, admin_headers):
+    first = client.get('/api/admin/users?page=1&limit=2', headers=admin_headers).get_json()
+    second = client.get('/api/admin/users?page=2&limit=2', headers=admin_headers).get_json()
+    last = client.get('/api/admin/users?page=3&limit=2', headers=admin_headers).get_json()
+
+    assert (first['currentPage'], first['totalPages'], first['total']) == (1, 3, 5)
+    assert len(first['users']) == 2 and first['hasMore']
+    assert len(last['users']) == 1 and not last['hasMore']
+    ids = [u['id'] for page in (first, second, last) for u in page['users']]
+    assert len(set(ids)) == 5
+
+def test_page_and_cursor_walks_agree(client, admin_headers):
+    paged = client.get('/api/admin/users?page=1&limit=2', headers=admin_headers).get_json()
+    by_cursor = client.get(f"/api/admin/users?cursor={paged['nextCursor']}&limit=2",
+                           headers=admin_headers).get_json()
+    by_page = client.get('/api/admin/users?page=2&limit=2', headers=admin_headers).get_json()
+
+    assert [u['id'] for u in by_cursor['users']] == [u['id'] for u in by_page['users']]
+    assert 'currentPage' not in by_cursor
+
+def test_invalid_page_is_rejected(client, admin_headers):
+    response = client.get('/api/admin/users?page=abc', headers=admin_headers)
+    assert response.status_code == 400
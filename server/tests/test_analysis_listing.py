@@ -0,0 +1,26 @@
+from models import db
+from models.analysis import Analysis
+
+def _add_analyses(user, count):
+    analyses = [Analysis(user_id=user.id, analysis_type='standard', scores={'overallScore': 70}) for _ in range(count)]
+    db.session.add_all(analyses)
+    db.session.commit()
+    return {analysis.id for analysis in analyses}
+
+def test_unpaginated_history_returns_every_analysis(client, user, auth_headers):
+    ids = _add_analyses(user, 25)
+
+    body = client.get('/api/analysis/', headers=auth_headers).get_json()
+
+    assert {analysis['id'] for analysis in body['analyses']} == ids
+    assert body['hasMore'] is False and body['nextCursor'] is None
+
+def test_limit_and_cursor_paginate(client, user, auth_headers):
+    ids = _add_analyses(user, 5)
+
+    first = client.get('/api/analysis/?limit=3', headers=auth_headers).get_json()
+    second = client.get(f"/api/analysis/?cursor={first['nextCursor']}", headers=auth_headers).get_json()
+
+    assert len(first['analyses']) == 3 and first['hasMore']
+    assert not second['hasMore']
+    assert {analysis['id'] for analysis in first['analyses'] + second['analyses']} == ids
@@ -0,0 +1,28 @@
+from tests.conftest import make_resume
+
+def _analyze(client, headers, resume_id, **body):
+    return client.post(f'/api/analysis/resume/{resume_id}', json={'analysisType': 'standard', **body},
+                       headers=headers)
+
+def test_replay_matches_the_fresh_analysis(client, user, auth_headers):
+    resume = make_resume(user)
+
+    fresh = _analyze(client, auth_headers, resume.id).get_json()
+    replayed = _analyze(client, auth_headers, resume.id).get_json()
+
+    assert not fresh['cached'] and replayed['cached']
+    assert replayed['analysisId'] == fresh['analysisId']
+    assert replayed['analysis'] == fresh['analysis']
+
+def test_force_recomputes(client, user, auth_headers):
+    resume = make_resume(user)
+    _analyze(client, auth_headers, resume.id)
+
+    forced = _analyze(client, auth_headers, resume.id, force=True).get_json()
+    assert forced['cached'] is False
+
+def test_force_must_be_a_boolean(client, user, auth_headers):
+    resume = make_resume(user)
+    for value in ('false', '0', 1):
+        response = _analyze(client, auth_headers, resume.id, force=value)
+        assert response.status_code == 400
@@ -0,0 +1,85 @@
+import pytest
+from models import db
+from models.analysis import Analysis
+from models.analysis_dead_letter import AnalysisDeadLetter
+from utils.analysis_writer import AnalysisWriter, replay_dead_letters
+
+@pytest.fixture
+def writer(app):
+    # Large batch and interval so only explicit flush() calls write
+    writer = AnalysisWriter(enabled=True, batch_size=1000, flush_interval=3600, max_attempts=3)
+    writer._app = app
+    return writer
+
+def _analysis(user, **fields):
+    data = {'user_id': user.id, 'analysis_type': 'standard', 'scores': {'overallScore': 70}}
+    data.update(fields)
+    return Analysis(**data)
+
+def _failing_insert(writer, failures):
+    """Make the next ``failures`` batches fail as a whole"""
+    insert = writer._insert
+    calls = {'count': 0}
+
+    def failing(batch):
+        calls['count'] += 1
+        if calls['count'] <= failures:
+            return [(analysis, RuntimeError('database unavailable')) for analysis in batch]
+        return insert(batch)
+    writer._insert = failing
+
+def test_queued_analysis_is_written_on_flush(writer, user):
+    analysis = _analysis(user)
+    assert writer.save(analysis) is False
+    assert writer.pending(analysis.public_id)['scores'] == {'overallScore': 70}
+    assert writer.flush() == 0
+    assert writer.pending(analysis.public_id) is None
+    assert Analysis.query.filter_by(public_id=analysis.public_id).count() == 1
+
+def test_failed_rows_stay_queued_and_are_retried(writer, user):
+    analysis = _analysis(user)
+    writer.save(analysis)
+    _failing_insert(writer, failures=1)
+
+    assert writer.flush() == 1
+    # Still readable while it waits for the retry
+    assert writer.pending(analysis.public_id) is not None
+    assert Analysis.query.count() == 0
+
+    assert writer.flush() == 0
+    assert Analysis.query.filter_by(public_id=analysis.public_id).count() == 1
+    assert AnalysisDeadLetter.query.count() == 0
+
+def test_rows_that_keep_failing_are_dead_lettered_and_replayable(writer, user):
+    analysis = _analysis(user, ai_analysis={'model': 'm', 'fullResponse': '# Feedback'})
+    writer.save(analysis)
+    _failing_insert(writer, failures=3)
+
+    for _ in range(3):
+        writer.flush()
+    assert writer.pending(analysis.public_id) is None
+    letter = AnalysisDeadLetter.query.one()
+    assert letter.public_id == analysis.public_id
+    assert letter.attempts == 3
+    assert 'database unavailable' in letter.error
+
+    assert replay_dead_letters() == (1, 0)
+    replayed = Analysis.query.filter_by(public_id=analysis.public_id).one()
+    assert replayed.full_ai_analysis() == {'model': 'm', 'fullResponse': '# Feedback'}
+    assert AnalysisDeadLetter.query.count() == 0
+
+def test_bad_row_does_not_block_the_batch(writer, user):
+    good = _analysis(user)
+    bad = _analysis(user, analysis_type=None)
+    writer.save(good)
+    writer.save(bad)
+    assert writer.flush() == 1
+    assert Analysis.query.filter_by(public_id=good.public_id).count() == 1
+    for _ in range(2):
+        writer.flush()
+    assert AnalysisDeadLetter.query.one().public_id == bad.public_id
+
+def test_public_id_is_assigned_on_construction(app, user):
+    first, second = _analysis(user), _analysis(user)
+    assert first.public_id and second.public_id and first.public_id != second.public_id
+    assert _analysis(user, public_id='abc').public_id == 'abc'
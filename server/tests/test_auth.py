@@ -0,0 +1,21 @@
+from models import db
+
+def test_token_required(client):
+    assert client.get('/api/resume/').get_json() == {'error': 'Access token required'}
+
+def test_password_change_revokes_issued_tokens(client, user, auth_headers):
+    assert client.get('/api/resume/', headers=auth_headers).status_code == 200
+
+    user.set_password('secret2')
+    db.session.commit()
+
+    response = client.get('/api/resume/', headers=auth_headers)
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Token revoked'}
+    fresh = {'Authorization': f'Bearer {user.generate_token()}'}
+    assert client.get('/api/resume/', headers=fresh).status_code == 200
+
+def test_deleted_user_is_rejected(client, user, auth_headers):
+    db.session.delete(user)
+    db.session.commit()
+    assert client.get('/api/resume/', headers=auth_headers).get_json() == {'error': 'User not found'}
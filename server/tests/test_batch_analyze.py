@@ -0,0 +1,53 @@
+import json
+import pytest
+import batch_analyze
+from tests.test_bulk_analysis import RESUME
+
+ARGS = ['--job-role', 'Backend Developer', '--job-category', 'Software Development', '--workers', '1']
+
+@pytest.fixture
+def resume_dir(tmp_path):
+    directory = tmp_path / 'resumes'
+    (directory / 'b').mkdir(parents=True)
+    for name in ('a.docx', 'b/c.docx', 'b/d.docx'):
+        (directory / name).write_bytes(RESUME)
+    (directory / 'notes.txt').write_text('skipped')
+    return directory
+
+def _results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_finds_supported_files_in_stable_order(resume_dir):
+    assert [path[len(str(resume_dir)) + 1:] for path in batch_analyze.find_resume_files(str(resume_dir))] \
+        == ['a.docx', 'b/c.docx', 'b/d.docx']
+
+def test_rerun_resumes_from_checkpoint(resume_dir, tmp_path):
+    output = tmp_path / 'results.jsonl'
+    done = str(resume_dir / 'a.docx')
+    # An interrupted run that got through one file
+    output.write_text(json.dumps({'file': done, 'success': True}) + '\n')
+    (tmp_path / 'results.jsonl.checkpoint').write_text(done + '\n')
+
+    batch_analyze.main([str(resume_dir), '--output', str(output), *ARGS])
+
+    results = _results(output)
+    assert sorted(result['file'] for result in results) == sorted(batch_analyze.find_resume_files(str(resume_dir)))
+    assert all(result['success'] for result in results)
+    assert batch_analyze.load_checkpoint(str(tmp_path / 'results.jsonl.checkpoint')) == {result['file'] for result in results}
+
+    # Nothing is left to do on the next run
+    batch_analyze.main([str(resume_dir), '--output', str(output), *ARGS])
+    assert len(_results(output)) == 3
+
+def test_restart_ignores_the_checkpoint(resume_dir, tmp_path):
+    output = tmp_path / 'results.jsonl'
+    checkpoint = tmp_path / 'progress.txt'
+    files = list(batch_analyze.find_resume_files(str(resume_dir)))
+    output.write_text('stale\n')
+    checkpoint.write_text('\n'.join(files) + '\n')
+
+    batch_analyze.main([str(resume_dir), '--output', str(output), '--checkpoint', str(checkpoint), '--restart', *ARGS])
+
+    assert sorted(result['file'] for result in _results(output)) == sorted(files)
+    assert batch_analyze.load_checkpoint(str(checkpoint)) == set(files)
+    assert not (tmp_path / 'results.jsonl.checkpoint').exists()
@@ -0,0 +1,70 @@
+import io
+import json
+import zipfile
+from docx import Document
+from utils.bulk_analyzer import analyze_archive
+from utils.file_parser import ALLOWED_EXTENSIONS
+
+FORM = {'jobRole': 'Backend Developer', 'jobCategory': 'Software Development'}
+
+def _docx(text):
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def _zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+RESUME = _docx('Ada Lovelace\nada@example.com\nExperience\nBackend developer: Python, SQL and Node.js APIs\nEducation\nBSc')
+
+def test_bulk_streams_one_result_per_resume(client):
+    archive = _zip({
+        'team/ada.docx': RESUME,
+        'team/notes.txt': b'not a resume',
+        'team/broken.docx': b'not a docx',
+        'team/': b'',
+        '__MACOSX/team/._ada.docx': b'',
+        'team/.DS_Store': b'',
+    })
+
+    response = client.post('/api/analysis/bulk', data={**FORM, 'archive': (archive, 'resumes.zip')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    results = {line['file']: line for line in lines[:-1]}
+    assert set(results) == {'team/ada.docx', 'team/notes.txt', 'team/broken.docx'}
+    assert results['team/ada.docx']['success']
+    assert results['team/ada.docx']['analysis']['email'] == 'ada@example.com'
+    assert results['team/notes.txt'] == {'file': 'team/notes.txt', 'success': False,
+                                         'error': 'Only PDF and DOCX files are allowed'}
+    assert not results['team/broken.docx']['success']
+    assert lines[-1]['summary'] == {'total': 3, 'succeeded': 1, 'failed': 2, 'truncated': False, 'maxFiles': 1000}
+
+def test_bulk_rejects_non_zip_upload(client):
+    response = client.post('/api/analysis/bulk', data={**FORM, 'archive': (io.BytesIO(b'plain text'), 'resumes.zip')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Only ZIP archives are allowed'}
+
+def test_archive_limits_file_count_and_size():
+    archive = _zip({f'{i}.docx': RESUME for i in range(3)})
+    results = list(analyze_archive(archive, FORM['jobRole'], FORM['jobCategory'], ALLOWED_EXTENSIONS,
+                                   max_file_size=len(RESUME), max_files=2))
+    assert [result['file'] for result in results[:-1]] == ['0.docx', '1.docx']
+    assert results[-1]['summary']['truncated'] is True
+
+    archive.seek(0)
+    results = list(analyze_archive(archive, FORM['jobRole'], FORM['jobCategory'], ALLOWED_EXTENSIONS,
+                                   max_file_size=len(RESUME) - 1))
+    assert {result['error'] for result in results[:-1]} == {'File exceeds the maximum size'}
+    assert results[-1]['summary']['failed'] == 3
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports the app with load_dotenv() pointed at a given file, then reports module settings
+PROBE = '''
+import sys
+import dotenv
+load = dotenv.load_dotenv
+dotenv.load_dotenv = lambda *args, **kwargs: load(sys.argv[1])
+import app
+from utils import db_engine, retention
+from utils.response_cache import admin_cache
+print(admin_cache.ttl, db_engine.DB_POOL_SIZE, retention.ANALYSIS_KEEP_PER_USER)
+'''
+
+def test_settings_are_read_from_dotenv(tmp_path):
+    env_file = tmp_path / '.env'
+    env_file.write_text('ADMIN_CACHE_TTL=7\nDB_POOL_SIZE=3\nANALYSIS_KEEP_PER_USER=5\n')
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('ADMIN_CACHE_TTL', 'DB_POOL_SIZE', 'ANALYSIS_KEEP_PER_USER')}
+    env['DATABASE_URL'] = f"sqlite:///{tmp_path / 'probe.db'}"
+
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, str(env_file)], cwd=SERVER_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert output[-3:] == ['7.0', '3', '5']
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from models import db
+from models.user import User
+from utils.login_buffer import LastLoginBuffer
+
+@pytest.fixture
+def buffer(app):
+    # Long interval and no size trigger: only explicit flush() calls write
+    buffer = LastLoginBuffer(flush_interval=3600, max_pending=10 ** 6)
+    buffer._app = app
+    return buffer
+
+@pytest.fixture
+def updates(app):
+    """Every UPDATE of users sent to the database, as (statement, executemany)"""
+    seen = []
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE users'):
+            seen.append((statement, executemany))
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    yield seen
+    event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+def _users(count):
+    users = [User(name=f'User {i}', email=f'user{i}@example.com', password='secret1') for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+def _last_login(user):
+    db.session.expire_all()
+    return db.session.get(User, user.id).last_login
+
+def test_flush_writes_every_pending_login_in_one_batch(buffer, updates):
+    users = _users(5)
+    now = datetime.utcnow()
+    for i, user in enumerate(users):
+        buffer.record(user.id, now + timedelta(seconds=i))
+    # Only the latest login of a user is kept
+    buffer.record(users[0].id, now - timedelta(days=1))
+
+    assert buffer.flush() == 5
+    assert len(updates) == 1 and updates[0][1]
+    assert [_last_login(user) for user in users] == [now + timedelta(seconds=i) for i in range(5)]
+    assert buffer.flush() == 0
+
+def test_flush_never_moves_last_login_backwards(buffer, user):
+    newer = datetime.utcnow()
+    user.last_login = newer
+    db.session.commit()
+
+    buffer.record(user.id, newer - timedelta(minutes=5))
+    buffer.flush()
+    assert _last_login(user) == newer
+
+def test_failed_flush_requeues_the_batch(buffer, user, updates):
+    first = datetime.utcnow()
+    buffer.record(user.id, first)
+    def fail(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE users'):
+            raise RuntimeError('database is locked')
+    event.listen(db.engine, 'before_cursor_execute', fail)
+    try:
+        assert buffer.flush() == 0
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', fail)
+    assert _last_login(user) is None
+
+    # The re-queued login is written on the next flush, and an older one recorded meanwhile doesn't replace it
+    buffer.record(user.id, first - timedelta(seconds=1))
+    assert buffer.flush() == 1
+    assert _last_login(user) == first
@@ -0,0 +1,55 @@
+import bcrypt
+from models import db
+from utils.password_hasher import HasherBusy, PasswordHasher, hash_rounds, password_hasher
+
+def _hash(rounds):
+    return bcrypt.hashpw(b'secret1', bcrypt.gensalt(rounds)).decode('utf-8')
+
+def test_needs_rehash_only_upgrades():
+    hasher = PasswordHasher(rounds=5, max_workers=1)
+    assert hasher.needs_rehash(_hash(4))
+    assert not hasher.needs_rehash(_hash(5))
+    # A stronger hash (e.g. from a process with a higher cost) is kept
+    assert not hasher.needs_rehash(_hash(6))
+
+def test_needs_rehash_unreadable_hash():
+    hasher = PasswordHasher(rounds=5, max_workers=1)
+    assert hash_rounds('not-a-hash') is None
+    assert hasher.needs_rehash('not-a-hash')
+
+def test_hash_uses_configured_rounds():
+    hasher = PasswordHasher(rounds=5, max_workers=1)
+    hashed = hasher.hash('secret1')
+    assert hash_rounds(hashed) == 5
+    assert hasher.verify('secret1', hashed)
+    assert not hasher.needs_rehash(hashed)
+
+def test_login_rehashes_weaker_hash(app, client, user, monkeypatch):
+    user.password = _hash(4)
+    db.session.commit()
+    monkeypatch.setattr(password_hasher, 'rounds', 5)
+
+    response = client.post('/api/auth/login', json={'email': user.email, 'password': 'secret1'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert hash_rounds(user.password) == 5
+
+def _busy(*args, **kwargs):
+    raise HasherBusy('Password hashing queue is full')
+
+def test_register_turned_away_while_hasher_busy(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, 'hash', _busy)
+
+    response = client.post('/api/auth/register', json={'name': 'Grace', 'email': 'grace@example.com', 'password': 'secret1'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_change_password_turned_away_while_hasher_busy(client, user, auth_headers, monkeypatch):
+    monkeypatch.setattr(password_hasher, 'verify', _busy)
+
+    response = client.put('/api/auth/change-password', headers=auth_headers,
+                          json={'currentPassword': 'secret1', 'newPassword': 'secret2'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    # The old token still works: nothing was changed
+    assert client.get('/api/resume/', headers=auth_headers).status_code == 200
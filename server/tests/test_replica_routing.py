@@ -0,0 +1,115 @@
+import shutil
+import sqlite3
+import time
+import pytest
+from flask import Flask, g
+from sqlalchemy import func, text
+from models import db
+from models.routing import REPLICA_BIND, pin_primary, replica_router
+from models.user import User
+from utils.db_engine import engine_options, init_db_engine
+from utils.response_cache import ResponseCache
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """An app whose primary has two users and whose read-only replica copy has one"""
+    primary = tmp_path / 'primary.db'
+    replica = tmp_path / 'replica.db'
+    replica_url = f'sqlite:///file:{replica}?mode=ro&uri=true'
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{primary}'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: dict(engine_options(replica_url), url=replica_url)}
+    db.init_app(app)
+    init_db_engine(app)
+    # init_app registered an (empty) metadata for the bind; the main test app has no such bind
+    db.metadatas.pop(REPLICA_BIND, None)
+    monkeypatch.setattr(replica_router, '_down_until', 0)
+    monkeypatch.setattr(replica_router, '_pins', {})
+
+    with app.app_context():
+        db.metadata.create_all(db.engines[None])
+        db.session.add(User(name='Ada', email='ada@example.com', password='secret1'))
+        db.session.commit()
+        db.session.remove()
+        db.engines[None].dispose()
+    # Snapshot the primary as the replica, in rollback-journal mode so it opens read-only
+    connection = sqlite3.connect(primary)
+    connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    connection.close()
+    shutil.copy(primary, replica)
+    connection = sqlite3.connect(replica)
+    connection.execute('PRAGMA journal_mode = DELETE')
+    connection.close()
+
+    with app.app_context():
+        db.session.add(User(name='Grace', email='grace@example.com', password='secret1'))
+        db.session.commit()
+        db.session.remove()
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def _user_count():
+    return db.session.query(func.count(User.id)).scalar()
+
+def test_reads_use_the_primary_outside_replica_views(replica_app):
+    with replica_app.app_context():
+        assert _user_count() == 2
+
+def test_replica_views_read_the_replica(replica_app):
+    with replica_app.app_context():
+        g.db_read_replica = True
+        assert _user_count() == 1
+
+def test_writes_and_later_reads_go_to_the_primary(replica_app):
+    with replica_app.test_request_context():
+        g.db_read_replica = True
+        g.user = {'id': 1}
+        db.session.execute(User.__table__.update().where(User.id == 1).values(name='Ada L'))
+        assert _user_count() == 2
+        db.session.commit()
+        db.session.remove()
+    # The writer stays pinned to the primary in its next request
+    with replica_app.test_request_context():
+        g.db_read_replica = True
+        g.user = {'id': 1}
+        assert _user_count() == 2
+    with replica_app.test_request_context():
+        g.db_read_replica = True
+        g.user = {'id': 2}
+        assert _user_count() == 1
+
+def test_pin_primary_overrides_the_view(replica_app):
+    with replica_app.app_context():
+        g.db_read_replica = True
+        pin_primary()
+        assert _user_count() == 2
+
+def test_unreachable_replica_falls_back_to_the_primary(replica_app, tmp_path):
+    (tmp_path / 'replica.db').unlink()
+    with replica_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+        g.db_read_replica = True
+        assert _user_count() == 2
+    assert replica_router._down_until > time.monotonic()
+    # Skipped without another health check until the retry interval passes
+    with replica_app.app_context():
+        g.db_read_replica = True
+        assert _user_count() == 2 and g.db_replica_ok is False
+
+def test_background_refresh_reads_where_the_request_would(replica_app):
+    cache = ResponseCache(ttl=30, stale_ttl=300)
+    with replica_app.app_context():
+        g.db_read_replica = True
+        assert cache.get_or_compute('users', _user_count) == (1, 'MISS')
+        cache.invalidate()
+        assert cache.get_or_compute('users', lambda: 'refreshed on the primary' if _user_count() == 2 else 'replica')[1] == 'STALE'
+    for _ in range(100):
+        if not cache._refreshing:
+            break
+        time.sleep(0.02)
+    with replica_app.app_context():
+        assert cache.get_or_compute('users', _user_count) == ('replica', 'HIT')
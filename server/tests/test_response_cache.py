@@ -0,0 +1,62 @@
+import pytest
+from utils import response_cache
+from utils.response_cache import ResponseCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'value': 1000.0}
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now['value'])
+    return now
+
+def test_size_bound_evicts_least_recently_used(app):
+    cache = ResponseCache(ttl=30, stale_ttl=300, max_entries=3)
+    for key in 'abc':
+        cache.get_or_compute(key, lambda key=key: key.upper())
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get_or_compute('a', lambda: 'recomputed') == ('A', 'HIT')
+    cache.get_or_compute('d', lambda: 'D')
+
+    assert len(cache) == 3
+    assert cache.get_or_compute('b', lambda: 'B2') == ('B2', 'MISS')
+    assert cache.get_or_compute('a', lambda: 'recomputed') == ('A', 'HIT')
+
+def test_expired_entries_and_their_locks_are_swept(app, clock):
+    cache = ResponseCache(ttl=30, stale_ttl=60, max_entries=100)
+    for i in range(10):
+        cache.get_or_compute(('count', i), lambda: i)
+    assert len(cache) == 10
+
+    clock['value'] += 100
+    cache.get_or_compute('fresh', lambda: 1)
+    assert len(cache) == 1
+    assert set(cache._key_locks) <= {'fresh'}
+
+def test_failed_computation_leaves_no_lock(app):
+    cache = ResponseCache()
+
+    def fail():
+        raise RuntimeError('boom')
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('broken', fail)
+    assert 'broken' not in cache._key_locks
+    assert len(cache) == 0
+
+def test_clear_drops_entries_and_locks(app):
+    cache = ResponseCache()
+    cache.get_or_compute('a', lambda: 1)
+    cache.clear()
+    assert len(cache) == 0 and not cache._key_locks
+
+def test_user_search_counts_are_not_cached(app, client):
+    from models import db
+    from models.user import User
+    admin = User(name='Root', email='root@example.com', password='secret1', role='admin')
+    db.session.add(admin)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {admin.generate_token()}'}
+    response_cache.admin_cache.clear()
+
+    for term in ('r', 'ro', 'roo', 'root'):
+        response = client.get(f'/api/admin/users?search={term}', headers=headers)
+        assert response.status_code == 200
+    assert not any(key[0] == 'count' for key in response_cache.admin_cache._entries)
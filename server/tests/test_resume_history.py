@@ -0,0 +1,133 @@
+import random
+from sqlalchemy import select
+from models import db
+from models.resume import Resume
+from models.resume_version import ResumeSection, ResumeVersion
+from utils.resume_history import VERSIONED_FIELDS, apply_diff, json_diff, prune_sections, resume_at_version
+from tests.conftest import make_resume
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(6 if depth < 3 else 3)
+    if kind == 0:
+        return rng.randrange(5)
+    if kind == 1:
+        return rng.choice(['a', 'b', True, False, None, 1.0])
+    if kind == 2:
+        return 'x' * rng.randrange(3)
+    if kind == 3:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {rng.choice('abcd'): _random_value(rng, depth + 1) for _ in range(rng.randrange(4))}
+
+def test_apply_diff_inverts_json_diff():
+    rng = random.Random(7)
+    for _ in range(5000):
+        old, new = _random_value(rng), _random_value(rng)
+        delta = json_diff(old, new)
+        result = old if delta is None else apply_diff(old, delta)
+        assert result == new and type(result) is type(new)
+
+def test_json_diff_keeps_types_apart():
+    assert json_diff({'a': 1}, {'a': True}) == {'d': {'a': {'v': True}}}
+    assert json_diff([1.0], [1.0]) is None
+
+def _content(resume):
+    return {field: getattr(resume, field) for field in VERSIONED_FIELDS}
+
+def test_every_version_is_reconstructed(app, user, client, auth_headers):
+    resume = make_resume(user)
+    expected = {1: _content(resume)}
+    for i in range(23):
+        experience = resume.experience + [{'position': f'Role {i}', 'company': 'Acme', 'description': 'Built things ' * 20}]
+        response = client.put(f'/api/resume/{resume.id}', headers=auth_headers,
+                              json={'experience': experience, 'summary': f'Python developer {i}'})
+        assert response.status_code == 200
+        db.session.expire_all()
+        expected[resume.version] = _content(resume)
+
+    assert resume.version == 24
+    kinds = dict(db.session.execute(
+        select(ResumeVersion.version, ResumeVersion.kind).where(ResumeVersion.resume_id == resume.id)
+    ).all())
+    assert [version for version, kind in sorted(kinds.items()) if kind == 'snapshot'] == [1, 11, 21]
+    for version, content in expected.items():
+        assert resume_at_version(resume.id, version) == content
+    assert resume_at_version(resume.id, 25) is None
+
+def test_save_without_changes_records_no_version(app, user, client, auth_headers):
+    resume = make_resume(user)
+    client.put(f'/api/resume/{resume.id}', headers=auth_headers, json={'summary': resume.summary})
+    db.session.expire_all()
+    assert resume.version == 1
+    assert ResumeVersion.query.filter_by(resume_id=resume.id).count() == 1
+
+def test_versions_listing_pages(app, user, client, auth_headers):
+    resume = make_resume(user)
+    for i in range(3):
+        client.put(f'/api/resume/{resume.id}', headers=auth_headers, json={'summary': f'Python developer {i}'})
+
+    body = client.get(f'/api/resume/{resume.id}/versions?page=2&limit=3', headers=auth_headers).get_json()
+    assert body['currentPage'] == 2 and body['totalPages'] == 2
+    assert [version['version'] for version in body['versions']] == [1]
+    response = client.get(f'/api/resume/{resume.id}/versions?page=abc', headers=auth_headers)
+    assert response.status_code == 400 and response.get_json() == {'error': 'Invalid page'}
+
+def test_concurrent_saves_get_distinct_versions(app, user):
+    resume_id = make_resume(user).id
+    first = db.session
+    second = db.session.session_factory()
+    try:
+        # Both sessions load version 1, then save different fields one after the other
+        ours = first.get(Resume, resume_id)
+        theirs = second.get(Resume, resume_id)
+        ours.summary = 'Edited in the first session'
+        first.commit()
+        theirs.target_role = 'Data Engineer'
+        second.commit()
+        assert theirs.version == 3
+    finally:
+        second.close()
+
+    first.expire_all()
+    live = first.get(Resume, resume_id)
+    assert live.summary == 'Edited in the first session' and live.target_role == 'Data Engineer'
+    # The stale second save is recorded as the row as it stands, not as a diff against version 1
+    assert ResumeVersion.query.filter_by(resume_id=resume_id, version=3).one().kind == 'snapshot'
+    assert resume_at_version(resume_id, 3) == _content(live)
+    assert resume_at_version(resume_id, 2)['target_role'] == 'Backend Developer'
+
+def test_duplicates_share_sections(app, user, client, auth_headers):
+    resume = make_resume(user)
+    before = ResumeSection.query.count()
+    response = client.post(f'/api/resume/{resume.id}/duplicate', headers=auth_headers)
+    assert response.status_code == 201
+    # Only personal_info differs (" (Copy)" is appended to the name)
+    assert ResumeSection.query.count() == before + 1
+
+def test_deleting_resumes_deletes_their_sections(app, user, client, auth_headers):
+    resume = make_resume(user, personal_info={'name': 'Bob 2', 'email': 'bob@example.com'})
+    client.post(f'/api/resume/{resume.id}/duplicate', headers=auth_headers)
+    copy_id = db.session.execute(select(Resume.id).where(Resume.id != resume.id)).scalar()
+    client.put(f'/api/resume/{copy_id}', headers=auth_headers, json={'summary': 'Only in the copy'})
+
+    assert client.delete(f'/api/resume/{resume.id}', headers=auth_headers).status_code == 200
+    contents = db.session.execute(select(ResumeSection.content)).scalars().all()
+    assert {'name': 'Bob 2', 'email': 'bob@example.com'} not in contents
+    # Sections the copy still refers to survive
+    assert resume_at_version(copy_id, 1)['target_role'] == 'Backend Developer'
+
+    assert client.delete(f'/api/resume/{copy_id}', headers=auth_headers).status_code == 200
+    assert ResumeSection.query.count() == 0
+    assert ResumeVersion.query.count() == 0
+
+def test_orm_delete_releases_sections(app, user):
+    resume = make_resume(user)
+    db.session.delete(resume)
+    db.session.commit()
+    assert ResumeSection.query.count() == 0
+
+def test_prune_sections_removes_orphans(app, user):
+    resume = make_resume(user)
+    db.session.add(ResumeSection(hash='0' * 64, content={'name': 'Orphan'}, refs=3))
+    db.session.commit()
+    assert prune_sections() == 1
+    assert resume_at_version(resume.id, 1) == _content(resume)
@@ -0,0 +1,19 @@
+from tests.conftest import make_resume
+
+def test_unpaginated_listing_returns_every_resume(client, user, auth_headers):
+    ids = [make_resume(user).id for _ in range(25)]
+
+    body = client.get('/api/resume/', headers=auth_headers).get_json()
+
+    assert sorted(resume['id'] for resume in body['resumes']) == sorted(ids)
+    assert body['hasMore'] is False and body['nextCursor'] is None
+
+def test_limit_and_cursor_paginate(client, user, auth_headers):
+    ids = {make_resume(user).id for _ in range(5)}
+
+    first = client.get('/api/resume/?limit=3', headers=auth_headers).get_json()
+    second = client.get(f"/api/resume/?limit=3&cursor={first['nextCursor']}", headers=auth_headers).get_json()
+
+    assert len(first['resumes']) == 3 and first['hasMore']
+    assert not second['hasMore']
+    assert {resume['id'] for resume in first['resumes'] + second['resumes']} == ids
@@ -0,0 +1,19 @@
+from models.resume import Resume
+from tests.conftest import make_resume
+
+def test_search_returns_summary_rows(client, user, auth_headers):
+    resume = make_resume(user)
+
+    body = client.get('/api/resume/search?q=python', headers=auth_headers).get_json()
+
+    assert body['total'] == 1 and body['currentPage'] == 1
+    hit = body['results'][0]
+    assert set(hit['resume']) == set(Resume.VIEWS['summary'])
+    assert hit['resume']['id'] == resume.id and hit['resume']['name'] == 'Ada'
+    assert '<mark>' in hit['snippet']
+
+def test_search_fields_can_be_chosen(client, user, auth_headers):
+    make_resume(user)
+    body = client.get('/api/resume/search?q=python&fields=id,skills', headers=auth_headers).get_json()
+    assert body['results'][0]['resume'] == {'id': body['results'][0]['resume']['id'],
+                                            'skills': {'technical': ['Python']}}
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from models import db
+from models.analysis import Analysis
+from models.user import User
+from utils.retention import convert_to_incremental_vacuum, purge_analyses
+
+def _add_analysis(user_id, age_days, **fields):
+    analysis = Analysis(
+        user_id=user_id, analysis_type='standard', scores={'overallScore': 70},
+        suggestions={'tips': ['x' * 200]}, keyword_match={'matched': ['python']},
+        created_at=datetime.utcnow() - timedelta(days=age_days), **fields
+    )
+    db.session.add(analysis)
+    return analysis
+
+def test_keeps_only_the_newest_analyses_per_user(user):
+    other = User(name='Grace', email='grace@example.com', password='secret1')
+    db.session.add(other)
+    db.session.commit()
+    for age in range(5):
+        _add_analysis(user.id, age)
+    _add_analysis(other.id, 10)
+    db.session.commit()
+
+    report = purge_analyses(keep_per_user=2, anonymous_days=0, detail_days=0, pause=0, vacuum=False)
+
+    assert report['overQuotaDeleted'] == 3
+    kept = Analysis.query.filter_by(user_id=user.id).order_by(Analysis.created_at.desc()).all()
+    assert len(kept) == 2
+    assert kept[-1].created_at > datetime.utcnow() - timedelta(days=1, hours=1)
+    assert Analysis.query.filter_by(user_id=other.id).count() == 1
+
+def test_old_anonymous_analyses_are_deleted(user):
+    _add_analysis(None, 40)
+    _add_analysis(None, 1)
+    _add_analysis(user.id, 40)
+    db.session.commit()
+
+    report = purge_analyses(keep_per_user=0, anonymous_days=30, detail_days=0, pause=0, vacuum=False)
+
+    assert report['anonymousDeleted'] == 1
+    assert Analysis.query.count() == 2
+
+def test_old_analyses_are_reduced_to_scores(user):
+    old = _add_analysis(user.id, 100, job_description='Backend role')
+    recent = _add_analysis(user.id, 1, job_description='Backend role')
+    db.session.commit()
+    old_id, recent_id = old.id, recent.id
+
+    report = purge_analyses(keep_per_user=0, anonymous_days=0, detail_days=90, batch_size=1, pause=0,
+                            vacuum=False)
+    db.session.expire_all()
+
+    assert report['detailsStripped'] == 1
+    old, recent = db.session.get(Analysis, old_id), db.session.get(Analysis, recent_id)
+    assert old.overall_score == 70 and old.scores == {'overallScore': 70}
+    assert old.suggestions is None and old.keyword_match is None and old.job_description is None
+    assert recent.suggestions is not None and recent.job_description == 'Backend role'
+    # Already stripped rows aren't touched again
+    assert purge_analyses(keep_per_user=0, anonymous_days=0, detail_days=90, pause=0,
+                          vacuum=False)['detailsStripped'] == 0
+
+def test_incremental_vacuum_returns_free_pages(user):
+    for age in range(200):
+        _add_analysis(None, 40 + age, job_description='x' * 2000)
+    db.session.commit()
+    with db.engine.connect() as connection:
+        assert connection.execute(text('PRAGMA auto_vacuum')).scalar() == 2
+        pages_before = connection.execute(text('PRAGMA page_count')).scalar()
+
+    report = purge_analyses(keep_per_user=0, anonymous_days=30, detail_days=0, pause=0)
+
+    assert report['vacuum'] == 'incremental_vacuum'
+    with db.engine.connect() as connection:
+        assert connection.execute(text('PRAGMA freelist_count')).scalar() == 0
+        assert connection.execute(text('PRAGMA page_count')).scalar() < pages_before
+
+def test_no_rebuild_without_incremental_mode(user):
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text('PRAGMA auto_vacuum = NONE'))
+        connection.execute(text('VACUUM'))
+    for age in range(50):
+        _add_analysis(None, 40 + age, job_description='x' * 2000)
+    db.session.commit()
+
+    report = purge_analyses(keep_per_user=0, anonymous_days=30, detail_days=0, pause=0)
+
+    assert report['anonymousDeleted'] == 50 and report['vacuum'] is None
+    with db.engine.connect() as connection:
+        assert connection.execute(text('PRAGMA freelist_count')).scalar() > 0
+
+    # The one-off conversion rebuilds the file and releases the pages
+    assert convert_to_incremental_vacuum()
+    with db.engine.connect() as connection:
+        assert connection.execute(text('PRAGMA freelist_count')).scalar() == 0
+        assert connection.execute(text('PRAGMA auto_vacuum')).scalar() == 2
+
+def test_stripping_details_changes_the_etag(client, user, auth_headers):
+    analysis = _add_analysis(user.id, 100)
+    db.session.commit()
+    url = f'/api/analysis/{analysis.public_id}'
+
+    first = client.get(url, headers=auth_headers)
+    assert first.status_code == 200 and first.get_json()['analysis']['suggestions']
+    etag = first.headers['ETag']
+    assert client.get(url, headers={**auth_headers, 'If-None-Match': etag}).status_code == 304
+
+    purge_analyses(keep_per_user=0, anonymous_days=0, detail_days=90, pause=0, vacuum=False)
+
+    second = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != etag
+    assert second.get_json()['analysis']['suggestions'] is None
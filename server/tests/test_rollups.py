@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+from models import db
+from models.analysis import Analysis
+from models.rollup import DailyRollup
+from models.user import User
+from utils.bulk_delete import delete_analyses_where
+
+def _bucket_counts():
+    rows = DailyRollup.query.filter_by(metric='analyses').all()
+    counts = {}
+    for row in rows:
+        counts[row.score_bucket] = counts.get(row.score_bucket, 0) + row.count
+    return {bucket: count for bucket, count in counts.items() if count}
+
+def test_fractional_scores_leave_through_the_bucket_they_entered(user):
+    analysis = Analysis(user_id=user.id, analysis_type='standard', scores={'overallScore': 79.6})
+    db.session.add(analysis)
+    db.session.commit()
+    assert _bucket_counts() == {'80-100': 1}
+
+    delete_analyses_where(Analysis.id == analysis.id)
+    assert _bucket_counts() == {}
+
+def test_score_distribution_follows_the_period(client, user):
+    admin = User(name='Root', email='root@example.com', password='secret1', role='admin')
+    db.session.add(admin)
+    db.session.add(Analysis(user_id=user.id, analysis_type='standard', scores={'overallScore': 90}))
+    db.session.add(Analysis(user_id=user.id, analysis_type='standard', scores={'overallScore': 10},
+                            created_at=datetime.utcnow() - timedelta(days=60)))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {admin.generate_token()}'}
+
+    def distribution(period):
+        analytics = client.get(f'/api/admin/analytics?period={period}', headers=headers).get_json()['analytics']
+        return {row['range']: row['count'] for row in analytics['scoreDistribution']}
+
+    assert distribution(30) == {'0-39': 0, '40-59': 0, '60-79': 0, '80-100': 1}
+    assert distribution(90) == {'0-39': 1, '40-59': 0, '60-79': 0, '80-100': 1}
@@ -0,0 +1,66 @@
+import random
+from models import db
+from models.user import User
+from tests.conftest import make_resume
+from utils.skill_index import SkillIndex, SKILL_VOCABULARY, skills_in_text
+
+VOCABULARY = sorted(SKILL_VOCABULARY)[:12]
+DECLARED = ['cobol', 'fortran', 'erlang', 'haskell']
+
+def _brute_force(resumes, wanted, k):
+    wanted = set(wanted)
+    scored = [
+        (len(wanted.intersection(skills)), resume_id, sorted(wanted.intersection(skills)))
+        for resume_id, skills in resumes.items()
+    ]
+    ranked = sorted((entry for entry in scored if entry[0]), reverse=True)
+    return [(resume_id, matched) for _, resume_id, matched in ranked[:k]]
+
+def test_top_k_matches_a_brute_force_ranking(app):
+    rng = random.Random(39)
+    index = SkillIndex(refresh_interval=3600)
+    index.ensure_fresh()
+    resumes = {}
+
+    for _ in range(30):
+        changes = {}
+        for _ in range(rng.randint(1, 40)):
+            resume_id = rng.randint(1, 300)
+            skills = sorted(set(rng.sample(VOCABULARY + DECLARED, rng.randint(0, 8))))
+            changes[resume_id] = skills
+        index.apply(changes)
+        for resume_id, skills in changes.items():
+            if skills:
+                resumes[resume_id] = skills
+            else:
+                resumes.pop(resume_id, None)
+
+        wanted = rng.sample(VOCABULARY + DECLARED + ['unknown skill'], rng.randint(1, 10))
+        k = rng.randint(1, 25)
+        result = [(resume_id, sorted(matched)) for resume_id, matched in index.top_k(wanted, k)]
+        assert result == _brute_force(resumes, wanted, k)
+
+def test_ties_go_to_the_newest_resume(app):
+    index = SkillIndex(refresh_interval=3600)
+    index.ensure_fresh()
+    skill = VOCABULARY[0]
+    index.apply({1: [skill], 2: [skill], 3: [skill, 'cobol']})
+
+    assert [resume_id for resume_id, _ in index.top_k([skill, 'cobol'], 2)] == [3, 2]
+
+def test_job_description_skills_match_whole_words():
+    assert skills_in_text('We are hiring a senior JavaScript developer') == ['JavaScript']
+    assert set(skills_in_text('Java, SQL and R; some C# too')) == {'Java', 'SQL', 'R', 'C#'}
+
+def test_ranking_a_javascript_job_requires_only_javascript(client, user):
+    admin = User(name='Root', email='root@example.com', password='secret1', role='admin')
+    db.session.add(admin)
+    db.session.commit()
+    resume = make_resume(user, skills={'technical': ['JavaScript']})
+    headers = {'Authorization': f'Bearer {admin.generate_token()}'}
+
+    body = client.post('/api/admin/resumes/rank', headers=headers,
+                       json={'jobDescription': 'We are hiring a senior javascript developer'}).get_json()
+
+    assert body['requiredSkills'] == ['JavaScript']
+    assert [(result['resume']['id'], result['score']) for result in body['results']] == [(resume.id, 100)]
@@ -0,0 +1,223 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from collections import deque
+from datetime import datetime
+from models import db
+from models.analysis import Analysis
+from models.analysis_dead_letter import AnalysisDeadLetter
+import atexit
+import click
+import json
+import os
+import threading
+
+ANALYSIS_WRITE_BEHIND = os.getenv('ANALYSIS_WRITE_BEHIND', 'false').lower() == 'true'
+ANALYSIS_WRITE_BATCH_SIZE = int(os.getenv('ANALYSIS_WRITE_BATCH_SIZE', 100))
+ANALYSIS_WRITE_INTERVAL = float(os.getenv('ANALYSIS_WRITE_INTERVAL', 1))
+# Beyond this many queued rows, saves fall back to writing synchronously
+ANALYSIS_WRITE_MAX_PENDING = int(os.getenv('ANALYSIS_WRITE_MAX_PENDING', 5000))
+# Failed inserts are retried on later flushes; after this many they go to analysis_dead_letters
+ANALYSIS_WRITE_MAX_ATTEMPTS = int(os.getenv('ANALYSIS_WRITE_MAX_ATTEMPTS', 5))
+
+class AnalysisWriter:
+    """Optional write-behind persister for Analysis rows
+
+    With write-behind enabled, rows are queued and a background thread inserts
+    them in batches of ``batch_size`` (or whatever has queued after
+    ``flush_interval`` seconds) through an ORM session, so the usual flush
+    hooks (score columns, rollups, cache invalidation) still run. Rows that
+    fail to insert stay queued (and readable through ``pending``) and are
+    retried on later flushes; after ``max_attempts`` failures they are stored
+    in analysis_dead_letters instead of being dropped. The queue is drained at
+    interpreter exit; saves fall back to an inline commit, whose errors reach
+    the caller, when write-behind is off, the queue is full, or the writer is
+    shutting down.
+    """
+
+    def __init__(self, enabled=ANALYSIS_WRITE_BEHIND, batch_size=ANALYSIS_WRITE_BATCH_SIZE,
+                 flush_interval=ANALYSIS_WRITE_INTERVAL, max_pending=ANALYSIS_WRITE_MAX_PENDING,
+                 max_attempts=ANALYSIS_WRITE_MAX_ATTEMPTS):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._queue = deque()
+        self._snapshots = {}  # public_id -> to_dict() of a queued analysis
+        self._attempts = {}  # public_id -> failed insert attempts
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+        self._app = None
+
+    def init_app(self, app):
+        self._app = app
+        atexit.register(self.close)
+
+    def save(self, analysis):
+        """Persist an analysis; returns True if it was written before returning"""
+        analysis.created_at = analysis.created_at or datetime.utcnow()
+
+        if self.enabled and self._app is not None:
+            with self._lock:
+                queued = not self._closed and len(self._queue) < self.max_pending
+                if queued:
+                    self._queue.append(analysis)
+                    self._snapshots[analysis.public_id] = analysis.to_dict()
+                    depth = len(self._queue)
+            if queued:
+                self._ensure_thread()
+                if depth >= self.batch_size:
+                    self._wakeup.set()
+                return False
+
+        db.session.add(analysis)
+        db.session.commit()
+        return True
+
+    def pending(self, public_id):
+        """to_dict() of an analysis still waiting in the queue, or None"""
+        with self._lock:
+            return self._snapshots.get(public_id)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='analysis-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _insert(self, batch):
+        """Insert a batch; returns [(analysis, error)] for the rows that failed"""
+        with self._app.app_context():
+            with Session(db.engine, expire_on_commit=False) as session:
+                try:
+                    session.add_all(batch)
+                    session.commit()
+                    return []
+                except Exception as e:
+                    session.rollback()
+                    print(f'Analysis batch insert error: {e}')
+
+                # Retry row by row so one bad row doesn't take the batch down with it
+                failed = []
+                for analysis in batch:
+                    try:
+                        session.add(analysis)
+                        session.commit()
+                        # A later rollback would otherwise expire it, leaving it unreadable once detached
+                        session.expunge(analysis)
+                    except Exception as e:
+                        session.rollback()
+                        print(f'Analysis insert error ({analysis.public_id}): {e}')
+                        failed.append((analysis, e))
+                return failed
+
+    def _dead_letter(self, failed):
+        """Store rows that used up their attempts; returns False if that failed too"""
+        with self._app.app_context():
+            with Session(db.engine) as session:
+                try:
+                    session.add_all([
+                        AnalysisDeadLetter(
+                            public_id=analysis.public_id, payload=analysis.to_payload(),
+                            error=str(error)[:2000], attempts=self._attempts.get(analysis.public_id, 0)
+                        )
+                        for analysis, error in failed
+                    ])
+                    session.commit()
+                    return True
+                except Exception as e:
+                    session.rollback()
+                    print(f'Analysis dead letter error: {e}')
+                    return False
+
+    def flush(self):
+        """Insert everything queued so far, one batch per transaction
+
+        Returns the number of rows still queued for a retry.
+        """
+        with self._flush_lock:
+            retry = []
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                if not batch:
+                    break
+                try:
+                    failed = self._insert(batch)
+                except Exception as e:
+                    print(f'Analysis batch insert error: {e}')
+                    failed = [(analysis, e) for analysis in batch]
+
+                exhausted = []
+                for analysis, error in failed:
+                    attempts = self._attempts.get(analysis.public_id, 0) + 1
+                    self._attempts[analysis.public_id] = attempts
+                    if attempts >= self.max_attempts:
+                        exhausted.append((analysis, error))
+                    else:
+                        retry.append(analysis)
+                if exhausted and not self._dead_letter(exhausted):
+                    retry.extend(analysis for analysis, error in exhausted)
+
+                kept = {analysis.public_id for analysis in retry}
+                with self._lock:
+                    for analysis in batch:
+                        if analysis.public_id not in kept:
+                            self._snapshots.pop(analysis.public_id, None)
+                            self._attempts.pop(analysis.public_id, None)
+
+            # Requeued after the loop so a failing row is retried on the next flush, not in a spin
+            if retry:
+                with self._lock:
+                    self._queue.extend(retry)
+            return len(retry)
+
+    def close(self):
+        """Stop queueing and drain the queue (registered to run at exit)"""
+        with self._lock:
+            self._closed = True
+        for _ in range(self.max_attempts):
+            if not self.flush():
+                return
+        # Neither the table nor the dead letters accept these rows: log them whole
+        with self._lock:
+            remaining = list(self._queue)
+        for analysis in remaining:
+            print(f'Analysis not saved at exit: {json.dumps(analysis.to_payload(), default=str)}')
+
+analysis_writer = AnalysisWriter()
+
+def replay_dead_letters():
+    """Insert dead-lettered analyses again; returns (replayed, still failing)"""
+    replayed = failing = 0
+    for letter in db.session.execute(select(AnalysisDeadLetter).order_by(AnalysisDeadLetter.id)).scalars().all():
+        try:
+            db.session.add(Analysis.from_payload(letter.payload))
+            db.session.delete(letter)
+            db.session.commit()
+            replayed += 1
+        except Exception as e:
+            db.session.rollback()
+            print(f'Analysis replay error ({letter.public_id}): {e}')
+            failing += 1
+    return replayed, failing
+
+def init_analysis_writer(app):
+    """Attach the analysis writer to the app (drained at exit) and register the replay command"""
+    analysis_writer.init_app(app)
+
+    @app.cli.command('replay-analysis-dead-letters')
+    def replay_dead_letters_command():
+        """Insert analyses the write-behind writer could not save"""
+        replayed, failing = replay_dead_letters()
+        click.echo(f'Replayed {replayed} analyses, {failing} still failing')
@@ -0,0 +1,81 @@
+from utils.file_parser import extract_text_from_file
+from utils.resume_analyzer import analyze_resume_standard
+import io
+import os
+import zipfile
+
+BULK_MAX_FILES = int(os.getenv('BULK_ANALYSIS_MAX_FILES', 1000))
+
+def analyze_resume_file(source, file_type, job_role, job_category):
+    """Extract text from a single resume and run the standard analysis on it"""
+    resume_text = extract_text_from_file(source, file_type)
+    if not resume_text.strip():
+        raise Exception('Could not extract text from the file')
+    return analyze_resume_standard(resume_text, job_role, job_category)
+
+def _analyze_entry(name, data, file_type, job_role, job_category):
+    """Analyze one archive entry held in memory, reporting errors inline"""
+    try:
+        analysis = analyze_resume_file(io.BytesIO(data), file_type, job_role, job_category)
+        return {'file': name, 'success': True, 'analysis': analysis}
+    except Exception as e:
+        return {'file': name, 'success': False, 'error': str(e)}
+
+def _iter_archive_files(archive):
+    """Yield archive members that look like user files (skip dirs and OS metadata)"""
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        basename = os.path.basename(info.filename)
+        if not basename or basename.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        yield info
+
+def analyze_archive(archive_file, job_role, job_category, allowed_extensions, max_file_size,
+                    max_files=BULK_MAX_FILES):
+    """Analyze every resume inside a ZIP archive, yielding one result per file
+
+    Entries are decompressed and analyzed one at a time, so only one entry is
+    held in memory no matter how large the archive is. The analysis is
+    CPU-bound Python, so threads wouldn't run it any faster; offline runs
+    across cores go through batch_analyze.py. The last item yielded is a
+    summary dict.
+    """
+    total = 0
+    failed = 0
+    truncated = False
+
+    def track(result):
+        nonlocal failed
+        if not result['success']:
+            failed += 1
+        return result
+
+    with zipfile.ZipFile(archive_file) as archive:
+        for info in _iter_archive_files(archive):
+            if total >= max_files:
+                truncated = True
+                break
+            total += 1
+
+            file_type = info.filename.rsplit('.', 1)[1].lower() if '.' in info.filename else ''
+            if file_type not in allowed_extensions:
+                yield track({'file': info.filename, 'success': False, 'error': 'Only PDF and DOCX files are allowed'})
+                continue
+
+            # Don't trust the header size: read at most one byte past the limit
+            with archive.open(info) as entry:
+                data = entry.read(max_file_size + 1)
+            if len(data) > max_file_size:
+                yield track({'file': info.filename, 'success': False, 'error': 'File exceeds the maximum size'})
+                continue
+
+            yield track(_analyze_entry(info.filename, data, file_type, job_role, job_category))
+
+    yield {'summary': {
+        'total': total,
+        'succeeded': total - failed,
+        'failed': failed,
+        'truncated': truncated,
+        'maxFiles': max_files
+    }}
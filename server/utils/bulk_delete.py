@@ -0,0 +1,106 @@
+from sqlalchemy import select, delete
+from models import db
+from models.user import User
+from models.resume import Resume
+from models.analysis import Analysis
+from utils.rollups import removal_deltas, apply_rollup_deltas
+from utils.response_cache import admin_cache
+from utils.resume_search import get_search_backend
+from utils.skill_index import skill_index, store_skills
+from utils.resume_history import delete_resume_history
+from utils.user_cache import user_cache
+import os
+import time
+
+# Rows deleted per statement; each batch commits on its own so locks are held briefly
+BULK_DELETE_BATCH_SIZE = int(os.getenv('BULK_DELETE_BATCH_SIZE', 500))
+
+def _chunks(ids, size):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+def _delete_rows(model, ids):
+    """Delete rows of model by id, keeping the rollup counters in step"""
+    connection = db.session.connection()
+    apply_rollup_deltas(connection, removal_deltas(connection, model, model.id.in_(ids)))
+    db.session.execute(delete(model).where(model.id.in_(ids)))
+
+def delete_analyses_where(condition, batch_size=BULK_DELETE_BATCH_SIZE, pause=0):
+    """Delete matching analyses in batches without loading them; returns the number deleted
+
+    ``pause`` seconds are slept between batches to leave room for other writers.
+    """
+    deleted = 0
+    while True:
+        ids = db.session.execute(select(Analysis.id).where(condition).limit(batch_size)).scalars().all()
+        if not ids:
+            return deleted
+        _delete_rows(Analysis, ids)
+        db.session.commit()
+        deleted += len(ids)
+        if pause:
+            time.sleep(pause)
+
+def _delete_resume_batch(ids, batch_size):
+    """Delete one batch of resumes with their analyses, versions, search documents and skills"""
+    analyses = delete_analyses_where(Analysis.resume_id.in_(ids), batch_size)
+    connection = db.session.connection()
+    get_search_backend(connection.dialect.name).remove(connection, ids)
+    # Empty skill lists are the tombstones other processes' skill indexes refresh from
+    tombstones = {resume_id: [] for resume_id in ids}
+    store_skills(connection, tombstones)
+    delete_resume_history(connection, ids)
+    _delete_rows(Resume, ids)
+    db.session.commit()
+    skill_index.apply(tombstones)
+    return analyses
+
+def delete_resumes(resume_ids, batch_size=BULK_DELETE_BATCH_SIZE):
+    """Delete resumes and everything derived from them with set-based statements
+
+    Bypasses the ORM cascades and flush hooks, so the rollups, search index,
+    skill index and admin cache are updated here. Returns counts per table.
+    """
+    counts = {'resumes': 0, 'analyses': 0}
+    try:
+        for chunk in _chunks(resume_ids, batch_size):
+            ids = db.session.execute(select(Resume.id).where(Resume.id.in_(chunk))).scalars().all()
+            if ids:
+                counts['analyses'] += _delete_resume_batch(ids, batch_size)
+                counts['resumes'] += len(ids)
+    finally:
+        admin_cache.invalidate()
+    return counts
+
+def delete_users(user_ids, batch_size=BULK_DELETE_BATCH_SIZE):
+    """Delete users with all their resumes and analyses in bounded batches
+
+    Every batch commits on its own, so an interrupted purge leaves users with
+    part of their data deleted; running it again finishes the job. Returns
+    counts per table.
+    """
+    counts = {'users': 0, 'resumes': 0, 'analyses': 0}
+    try:
+        for chunk in _chunks(user_ids, batch_size):
+            ids = db.session.execute(select(User.id).where(User.id.in_(chunk))).scalars().all()
+            if not ids:
+                continue
+
+            counts['analyses'] += delete_analyses_where(Analysis.user_id.in_(ids), batch_size)
+            while True:
+                resume_ids = db.session.execute(
+                    select(Resume.id).where(Resume.user_id.in_(ids)).limit(batch_size)
+                ).scalars().all()
+                if not resume_ids:
+                    break
+                counts['analyses'] += _delete_resume_batch(resume_ids, batch_size)
+                counts['resumes'] += len(resume_ids)
+
+            _delete_rows(User, ids)
+            db.session.commit()
+            user_cache.invalidate(ids)
+            counts['users'] += len(ids)
+    finally:
+        admin_cache.invalidate()
+    return counts
@@ -0,0 +1,99 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from models import db
+import os
+
+def _env_bool(name, default):
+    return os.getenv(name, default).lower() == 'true'
+
+# Server databases (Postgres)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+# Recycle before typical server/proxy idle timeouts cut the connection
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = _env_bool('DB_POOL_PRE_PING', 'true')
+
+# SQLite files
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+# Only takes effect when the file is created (or rebuilt by VACUUM); INCREMENTAL lets the
+# retention purge hand free pages back with a cheap incremental_vacuum
+SQLITE_AUTO_VACUUM = os.getenv('SQLITE_AUTO_VACUUM', 'INCREMENTAL')
+# One connection per concurrently active thread; size it to the server's worker threads
+SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', 16))
+
+def _is_sqlite_file(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for the database at uri"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+
+    if backend == 'sqlite':
+        # In-memory databases keep Flask-SQLAlchemy's single shared connection
+        if not _is_sqlite_file(url):
+            return {}
+        # A thread holds its connection exclusively until it returns it, so connections
+        # are never used concurrently. SingletonThreadPool is avoided on purpose: with
+        # thread-per-request servers it reconnects constantly and, past its size, closes
+        # connections other threads are still using.
+        return {
+            'poolclass': QueuePool,
+            'pool_size': SQLITE_POOL_SIZE,
+            'max_overflow': 0,
+            'pool_timeout': DB_POOL_TIMEOUT,
+            # The busy timeout is also set as a pragma; this covers the connect itself
+            'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False}
+        }
+
+    return {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING
+    }
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS:d}')
+        # journal_mode is persistent in the file, the others are per connection;
+        # a read-only connection can't change it and uses whatever the file has
+        if not read_only:
+            # Only on a new, empty file; on an existing one the setting would sit pending
+            # (and be misreported) until some later VACUUM
+            if cursor.execute('PRAGMA page_count').fetchone()[0] == 0:
+                cursor.execute(f'PRAGMA auto_vacuum = {SQLITE_AUTO_VACUUM}')
+            cursor.execute(f'PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}')
+        cursor.execute(f'PRAGMA synchronous = {SQLITE_SYNCHRONOUS}')
+        cursor.execute(f'PRAGMA mmap_size = {SQLITE_MMAP_SIZE:d}')
+    finally:
+        cursor.close()
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    _apply_sqlite_pragmas(dbapi_connection, read_only=False)
+
+def _set_readonly_sqlite_pragmas(dbapi_connection, connection_record):
+    _apply_sqlite_pragmas(dbapi_connection, read_only=True)
+
+def configure_engine(engine):
+    """Attach per-connection setup (SQLite pragmas) to an engine"""
+    if not _is_sqlite_file(engine.url):
+        return engine
+    # sqlite:///file:path?mode=ro&uri=true opens the file read-only (e.g. a replica stand-in)
+    listener = _set_readonly_sqlite_pragmas if engine.url.query.get('mode') == 'ro' else _set_sqlite_pragmas
+    if not event.contains(engine, 'connect', listener):
+        event.listen(engine, 'connect', listener)
+    return engine
+
+def init_db_engine(app):
+    """Tune the app's engines; call right after db.init_app, before anything connects"""
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine)
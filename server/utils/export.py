@@ -0,0 +1,97 @@
+from sqlalchemy import select
+from sqlalchemy.orm import undefer, undefer_group
+from models import db
+import csv
+import io
+import json
+
+EXPORT_CHUNK_SIZE = 1000
+
+# Nested JSON columns expanded into "<column>.<key>" CSV columns; anything else
+# that isn't a scalar is written as a JSON string
+CSV_NESTED_FIELDS = {
+    'personal_info': ['name', 'email', 'phone', 'location', 'linkedin', 'github', 'portfolio'],
+    'skills': ['technical', 'soft', 'languages', 'tools'],
+    'scores': ['atsScore', 'keywordMatchScore', 'formatScore', 'sectionScore', 'overallScore'],
+    'keyword_match': ['score', 'matchedSkills', 'missingSkills'],
+    'ai_analysis': ['model', 'fullResponse', 'strengths', 'weaknesses', 'recommendations']
+}
+
+def iter_records(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield to_dict() for every row, fetching chunk_size rows per round-trip
+
+    Rows are expunged as soon as they are serialized so the session's identity
+    map doesn't grow with the table.
+    """
+    stmt = select(model).order_by(model.id).execution_options(yield_per=chunk_size)
+    if hasattr(model, 'ai_analysis'):
+        stmt = stmt.options(undefer_group('detail'), undefer(model.full_response))
+    for obj in db.session.execute(stmt).scalars():
+        record = obj.to_dict()
+        db.session.expunge(obj)
+        yield record
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+def csv_fieldnames(model):
+    """CSV header for a model, with known nested JSON columns expanded"""
+    fieldnames = []
+    for column in model.FIELDS:
+        if column in CSV_NESTED_FIELDS:
+            fieldnames.extend(f'{column}.{key}' for key in CSV_NESTED_FIELDS[column])
+        else:
+            fieldnames.append(column)
+    return fieldnames
+
+def flatten_record(record):
+    """Flatten a to_dict() record into a single CSV row"""
+    row = {}
+    for column, value in record.items():
+        if column in CSV_NESTED_FIELDS:
+            value = value or {}
+            for key in CSV_NESTED_FIELDS[column]:
+                row[f'{column}.{key}'] = _csv_value(value.get(key))
+        else:
+            row[column] = _csv_value(value)
+    return row
+
+def _batched(records, chunk_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def generate_csv(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream the table as CSV, one chunk of rows per yielded string"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=csv_fieldnames(model), extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    for batch in _batched(iter_records(model, chunk_size), chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(flatten_record(record) for record in batch)
+        yield buffer.getvalue()
+
+def generate_ndjson(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream the table as newline-delimited JSON"""
+    for batch in _batched(iter_records(model, chunk_size), chunk_size):
+        yield ''.join(json.dumps(record) + '\n' for record in batch)
+
+def generate_json(model, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream the table as {"success": true, "data": [...]} without building the list"""
+    yield '{"success": true, "data": ['
+    first = True
+    for batch in _batched(iter_records(model, chunk_size), chunk_size):
+        chunk = ','.join(json.dumps(record) for record in batch)
+        yield chunk if first else ',' + chunk
+        first = False
+    yield ']}'
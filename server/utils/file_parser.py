@@ -2,21 +2,28 @@ import PyPDF2
 from docx import Document
 import os
 
+# Upload types extract_text_from_file accepts
+ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc'}
+
 def extract_text_from_pdf(file_path):
-    """Extract text from PDF file"""
+    """Extract text from PDF file (path or binary file-like object)"""
     try:
+        if hasattr(file_path, 'read'):
+            return _read_pdf_pages(PyPDF2.PdfReader(file_path))
         with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ''
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            return _read_pdf_pages(PyPDF2.PdfReader(file))
     except Exception as e:
         print(f'PDF parsing error: {e}')
         raise Exception('Failed to parse PDF file')
 
+def _read_pdf_pages(pdf_reader):
+    text = ''
+    for page in pdf_reader.pages:
+        text += page.extract_text()
+    return text
+
 def extract_text_from_docx(file_path):
-    """Extract text from DOCX file"""
+    """Extract text from DOCX file (path or binary file-like object)"""
     try:
         doc = Document(file_path)
         text = ''
@@ -28,7 +35,7 @@ def extract_text_from_docx(file_path):
         raise Exception('Failed to parse DOCX file')
 
 def extract_text_from_file(file_path, file_type):
-    """Extract text from file based on file type"""
+    """Extract text from file (path or file-like object) based on file type"""
     try:
         if file_type.lower() == 'pdf':
             return extract_text_from_pdf(file_path)
@@ -39,3 +46,73 @@ def extract_text_from_file(file_path, file_type):
     except Exception as e:
         print(f'File parsing error: {e}')
         raise e
+
+def convert_resume_to_text(resume):
+    """Convert resume data to text for analysis"""
+    text = ''
+    
+    # Personal info
+    if resume.personal_info:
+        text += f"{resume.personal_info.get('name', '')}\n"
+        text += f"{resume.personal_info.get('email', '')}\n"
+        if resume.personal_info.get('phone'):
+            text += f"{resume.personal_info['phone']}\n"
+        if resume.personal_info.get('location'):
+            text += f"{resume.personal_info['location']}\n"
+        if resume.personal_info.get('linkedin'):
+            text += f"{resume.personal_info['linkedin']}\n"
+        if resume.personal_info.get('github'):
+            text += f"{resume.personal_info['github']}\n"
+        if resume.personal_info.get('portfolio'):
+            text += f"{resume.personal_info['portfolio']}\n"
+    
+    text += '\n'
+    
+    # Summary
+    if resume.summary:
+        text += f"SUMMARY\n{resume.summary}\n\n"
+    
+    # Experience
+    if resume.experience:
+        text += 'EXPERIENCE\n'
+        for exp in resume.experience:
+            text += f"{exp.get('position', '')} at {exp.get('company', '')}\n"
+            text += f"{exp.get('startDate', '')} - {exp.get('endDate', '')}\n"
+            if exp.get('description'):
+                text += f"{exp['description']}\n"
+            if exp.get('responsibilities'):
+                for resp in exp['responsibilities']:
+                    text += f"• {resp}\n"
+            if exp.get('achievements'):
+                for ach in exp['achievements']:
+                    text += f"• {ach}\n"
+            text += '\n'
+    
+    # Education
+    if resume.education:
+        text += 'EDUCATION\n'
+        for edu in resume.education:
+            text += f"{edu.get('degree', '')} in {edu.get('field', '')}\n"
+            text += f"{edu.get('school', '')}\n"
+            if edu.get('graduationDate'):
+                text += f"Graduated: {edu['graduationDate']}\n"
+            if edu.get('gpa'):
+                text += f"GPA: {edu['gpa']}\n"
+            if edu.get('achievements'):
+                for ach in edu['achievements']:
+                    text += f"• {ach}\n"
+            text += '\n'
+    
+    # Skills
+    if resume.skills:
+        text += 'SKILLS\n'
+        if resume.skills.get('technical'):
+            text += f"Technical: {', '.join(resume.skills['technical'])}\n"
+        if resume.skills.get('soft'):
+            text += f"Soft Skills: {', '.join(resume.skills['soft'])}\n"
+        if resume.skills.get('languages'):
+            text += f"Languages: {', '.join(resume.skills['languages'])}\n"
+        if resume.skills.get('tools'):
+            text += f"Tools: {', '.join(resume.skills['tools'])}\n"
+    
+    return text
@@ -0,0 +1,44 @@
+from flask import request, Response
+import hashlib
+
+# Flask-Compress rewrites "<etag>" to "<etag>:<algorithm>" on compressed responses
+_COMPRESSION_SUFFIXES = (':br', ':gzip', ':deflate')
+
+def make_etag(*parts):
+    """Strong ETag value derived from the given version markers (ids, timestamps, counts)"""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def _normalize(tag):
+    tag = tag.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in _COMPRESSION_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+def etag_matches(etag):
+    """True if the request's If-None-Match already covers this ETag"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(_normalize(candidate) == etag for candidate in header.split(','))
+
+def _add_cache_headers(response, etag):
+    response.set_etag(etag)
+    # Clients may keep a copy but must revalidate; responses are per-user
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
+
+def not_modified(etag):
+    """Empty 304 response carrying the current validators"""
+    return _add_cache_headers(Response(status=304), etag)
+
+def with_etag(response, etag):
+    """Attach the ETag and revalidation headers to a full response"""
+    return _add_cache_headers(response, etag)
@@ -0,0 +1,95 @@
+from sqlalchemy import bindparam, or_
+from models import db
+from models.user import User
+import atexit
+import os
+import threading
+
+LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', 5))
+# Flush early once this many users are waiting
+LAST_LOGIN_MAX_PENDING = int(os.getenv('LAST_LOGIN_MAX_PENDING', 1000))
+
+class LastLoginBuffer:
+    """Write-behind buffer for users.last_login
+
+    Logins only record (user id, timestamp) in memory. A background thread
+    writes everything pending in one batched UPDATE every ``flush_interval``
+    seconds, when ``max_pending`` users are waiting, and at interpreter exit.
+    """
+
+    def __init__(self, flush_interval=LAST_LOGIN_FLUSH_INTERVAL, max_pending=LAST_LOGIN_MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}  # user id -> latest login time
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._app = None
+
+    def init_app(self, app):
+        self._app = app
+        atexit.register(self.flush)
+
+    def record(self, user_id, logged_in_at):
+        """Remember a login; it reaches the database on the next flush"""
+        with self._lock:
+            if user_id not in self._pending or self._pending[user_id] < logged_in_at:
+                self._pending[user_id] = logged_in_at
+            pending = len(self._pending)
+        self._ensure_thread()
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='last-login-flush', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every pending login in one UPDATE; returns the number of users written"""
+        if self._app is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                table = User.__table__
+                stmt = (
+                    table.update()
+                    .where(table.c.id == bindparam('user_id'))
+                    # Never move last_login backwards (e.g. a slower flush from another worker)
+                    .where(or_(table.c.last_login.is_(None), table.c.last_login < bindparam('logged_in_at')))
+                    .values(last_login=bindparam('logged_in_at'))
+                )
+                with self._app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(stmt, [
+                            {'user_id': user_id, 'logged_in_at': logged_in_at}
+                            for user_id, logged_in_at in pending.items()
+                        ])
+                return len(pending)
+            except Exception as e:
+                print(f'Last login flush error: {e}')
+                # Put the batch back, keeping any newer login recorded meanwhile
+                with self._lock:
+                    for user_id, logged_in_at in pending.items():
+                        if user_id not in self._pending or self._pending[user_id] < logged_in_at:
+                            self._pending[user_id] = logged_in_at
+                return 0
+
+last_login_buffer = LastLoginBuffer()
+
+def init_login_buffer(app):
+    """Attach the last_login write-behind buffer to the app (flushed at exit)"""
+    last_login_buffer.init_app(app)
@@ -0,0 +1,129 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only
+from datetime import datetime
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing just past the row (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Clamp a user-supplied page size"""
+    try:
+        size = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        raise ValueError('Invalid limit')
+    return max(1, min(size, maximum))
+
+def parse_list_limit(args):
+    """Page size for a user's own listing, or None (everything) without ``?limit=`` and ``?cursor=``
+
+    Callers from before pagination existed keep getting the whole list.
+    """
+    if args.get('limit') is None and args.get('cursor') is None:
+        return None
+    return parse_page_size(args.get('limit'))
+
+def parse_fields(value, allowed):
+    """Parse a comma-separated ``fields`` parameter; None means all fields"""
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def parse_projection(args, allowed, views):
+    """Fields for a listing from ``view`` (a named preset in ``views``) or ``fields``; None means all"""
+    view = args.get('view')
+    if view:
+        if view not in views:
+            raise ValueError(f'Unknown view: {view}')
+        return list(views[view])
+    return parse_fields(args.get('fields'), allowed)
+
+def project_columns(query, model, fields):
+    """Restrict the SELECT to the columns backing ``fields`` (plus the keyset columns)"""
+    if fields is None:
+        return query
+    column_attrs = model.__mapper__.column_attrs
+    columns = {'id', 'created_at'} | {field for field in fields if field in column_attrs}
+    return query.options(load_only(*[getattr(model, column) for column in columns]))
+
+def keyset_paginate(query, model, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Newest-first keyset pagination on (created_at, id)
+
+    Every page is a bounded index range scan, so deep pages cost the same as
+    the first one. Returns (items, next_cursor); next_cursor is None on the
+    last page. A ``limit`` of None returns every remaining row.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if limit is None:
+        return query.all(), None
+    items = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+def parse_page(value):
+    """1-based page number from ``?page=``, or None when the client didn't ask for one"""
+    if value is None:
+        return None
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid page')
+
+def paginate_listing(query, model, args, limit):
+    """Keyset-paginate by ``?cursor=``, or by ``?page=`` for clients of the older offset API
+
+    Returns (items, next_cursor, page); page is None in cursor mode. Offset
+    pages cost more the deeper they go, but keep ``page``/``totalPages``
+    clients working, and their next_cursor lets a client switch to cursors.
+    """
+    page = None if args.get('cursor') else parse_page(args.get('page'))
+    if page is None:
+        items, next_cursor = keyset_paginate(query, model, args.get('cursor'), limit)
+        return items, next_cursor, None
+
+    items = (
+        query.order_by(model.created_at.desc(), model.id.desc())
+        .offset((page - 1) * limit).limit(limit + 1).all()
+    )
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor, page
+
+def page_fields(next_cursor, page, total, limit):
+    """Pagination keys of a listing response; offset-mode requests also get currentPage/totalPages"""
+    fields = {'nextCursor': next_cursor, 'hasMore': next_cursor is not None, 'total': total}
+    if page is not None:
+        fields['currentPage'] = page
+        fields['totalPages'] = (total + limit - 1) // limit if total is not None else None
+    return fields
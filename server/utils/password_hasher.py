@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+import click
+import os
+import threading
+import time
+
+# Cost factor for new hashes. It must be the same in every process of a deployment;
+# `flask calibrate-bcrypt` suggests a value for the hardware
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+# Hash time calibrate-bcrypt aims for
+BCRYPT_TARGET_MS = float(os.getenv('BCRYPT_TARGET_MS', 250))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+# bcrypt releases the GIL, so the pool size is the number of cores hashing may occupy
+HASH_MAX_WORKERS = int(os.getenv('HASH_MAX_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+# Logins are turned away once this many hashes are waiting for a worker
+HASH_MAX_QUEUE = int(os.getenv('HASH_MAX_QUEUE', HASH_MAX_WORKERS * 8))
+# Longest a request waits for its hash before giving up
+HASH_WAIT_TIMEOUT = float(os.getenv('HASH_WAIT_TIMEOUT', 10))
+
+class HasherBusy(Exception):
+    """Raised when a hash is refused or times out because the executor is saturated"""
+
+def hash_rounds(hashed):
+    """Cost factor encoded in a bcrypt hash ("$2b$12$..."), or None if unreadable"""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def calibrate_rounds(target_ms=BCRYPT_TARGET_MS):
+    """Highest cost factor whose hash time stays within target_ms on this machine"""
+    rounds = BCRYPT_MIN_ROUNDS
+    start = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(rounds))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    # Each extra round doubles the work
+    while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+class PasswordHasher:
+    """Bounded bcrypt executor shared by every request thread
+
+    Hashing runs on at most ``max_workers`` threads in FIFO order, so a login
+    burst occupies a fixed number of cores instead of every worker thread.
+    Callers that pass ``admit=True`` are refused with HasherBusy once
+    ``max_queue`` hashes are already waiting.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, max_workers=HASH_MAX_WORKERS, max_queue=HASH_MAX_QUEUE,
+                 wait_timeout=HASH_WAIT_TIMEOUT):
+        self.rounds = int(rounds)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._stats = {
+            'submitted': 0, 'completed': 0, 'rejected': 0, 'timedOut': 0,
+            'waitMsTotal': 0.0, 'hashMsTotal': 0.0
+        }
+
+    def _run(self, fn, submitted_at):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+        try:
+            return fn()
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self._stats['completed'] += 1
+                self._stats['waitMsTotal'] += (started_at - submitted_at) * 1000
+                self._stats['hashMsTotal'] += (finished_at - started_at) * 1000
+
+    def _submit(self, fn, admit):
+        with self._lock:
+            if admit and self._queued >= self.max_queue:
+                self._stats['rejected'] += 1
+                raise HasherBusy('Password hashing queue is full')
+            self._queued += 1
+            self._stats['submitted'] += 1
+        future = self._executor.submit(self._run, fn, time.perf_counter())
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            with self._lock:
+                self._stats['timedOut'] += 1
+            raise HasherBusy('Timed out waiting for password hashing')
+
+    def hash(self, password, admit=False):
+        """bcrypt hash of password at the current cost factor"""
+        salt = bcrypt.gensalt(self.rounds)
+        return self._submit(lambda: bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8'), admit)
+
+    def verify(self, password, hashed, admit=False):
+        """True if password matches the bcrypt hash"""
+        return self._submit(lambda: bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8')), admit)
+
+    def needs_rehash(self, hashed):
+        """True if the hash was made with a lower cost factor than the current one
+
+        Only upgrades: a hash stronger than the configured cost is kept, so a
+        rollout that briefly runs two costs can't rewrite hashes back and forth.
+        """
+        rounds = hash_rounds(hashed)
+        return rounds is None or rounds < self.rounds
+
+    def stats(self):
+        """Counters for tuning HASH_MAX_WORKERS / HASH_MAX_QUEUE"""
+        with self._lock:
+            stats = dict(self._stats)
+            queued = self._queued
+        completed = stats['completed'] or 1
+        return {
+            'rounds': self.rounds,
+            'workers': self.max_workers,
+            'maxQueue': self.max_queue,
+            'queued': queued,
+            'submitted': stats['submitted'],
+            'completed': stats['completed'],
+            'rejected': stats['rejected'],
+            'timedOut': stats['timedOut'],
+            'avgWaitMs': round(stats['waitMsTotal'] / completed, 2),
+            'avgHashMs': round(stats['hashMsTotal'] / completed, 2)
+        }
+
+password_hasher = PasswordHasher()
+
+def init_password_hasher(app):
+    """Register the bcrypt calibration command"""
+    @app.cli.command('calibrate-bcrypt')
+    @click.option('--target-ms', type=float, default=BCRYPT_TARGET_MS, help='Hash time to aim for')
+    def calibrate_bcrypt_command(target_ms):
+        """Suggest a BCRYPT_ROUNDS value for this machine"""
+        rounds = calibrate_rounds(target_ms)
+        click.echo(f'BCRYPT_ROUNDS={rounds}  (about {target_ms:.0f}ms per hash here; '
+                   f'set the same value in every process)')
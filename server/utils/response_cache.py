@@ -0,0 +1,169 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from flask import current_app
+from models.routing import routing_state, apply_routing_state
+from collections import OrderedDict
+import os
+import threading
+import time
+
+class ResponseCache:
+    """In-process TTL cache with stale-while-revalidate and single-flight recomputation
+
+    A fresh entry (younger than ``ttl`` and not invalidated) is served as is.
+    A stale entry (expired or invalidated, but younger than ``ttl + stale_ttl``)
+    is served immediately while one background thread recomputes it. Without a
+    usable entry the caller computes synchronously; concurrent callers for the
+    same key wait for that single computation instead of starting their own.
+
+    At most ``max_entries`` entries are kept, least recently used first out,
+    and entries too old to be served even stale are swept; a key's lock goes
+    with its entry.
+
+    The cache is per process: invalidation only reaches the current worker,
+    other workers converge within ``ttl``.
+    """
+
+    def __init__(self, ttl=30, stale_ttl=300, max_entries=1000):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, computed_at, generation), least recently used first
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._refreshing = set()
+        self._swept_at = time.monotonic()
+
+    def invalidate(self):
+        """Mark every entry stale; they are recomputed on next access"""
+        with self._lock:
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sweep_locks()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _sweep_locks(self):
+        # Called with self._lock held; a lock somebody holds is left for its owner
+        for key in [key for key, lock in self._key_locks.items() if key not in self._entries and not lock.locked()]:
+            del self._key_locks[key]
+
+    def _evict(self, now):
+        # Called with self._lock held
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if now - self._swept_at >= self.ttl:
+            self._swept_at = now
+            expired = [key for key, entry in self._entries.items() if now - entry[1] >= self.ttl + self.stale_ttl]
+            for key in expired:
+                del self._entries[key]
+        self._sweep_locks()
+
+    def _touch(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def _classify(self, entry, now):
+        if entry is None:
+            return 'MISS'
+        value, computed_at, generation = entry
+        age = now - computed_at
+        if age < self.ttl and generation == self._generation:
+            return 'HIT'
+        if age < self.ttl + self.stale_ttl:
+            return 'STALE'
+        return 'MISS'
+
+    def _store(self, key, compute):
+        generation = self._generation
+        value = compute()
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now, generation)
+            self._entries.move_to_end(key)
+            self._evict(now)
+        return value
+
+    def _refresh_in_background(self, key, compute, app):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        # The refresh reads where the request would have (e.g. the replica for @read_replica views)
+        state = routing_state()
+
+        def run():
+            try:
+                with self._key_lock(key), app.app_context():
+                    apply_routing_state(state)
+                    self._store(key, compute)
+            except Exception as e:
+                print(f'Response cache refresh error for {key}: {e}')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get_or_compute(self, key, compute):
+        """Return (value, status) where status is 'HIT', 'STALE' or 'MISS'"""
+        entry = self._entries.get(key)
+        status = self._classify(entry, time.monotonic())
+        if status == 'HIT':
+            self._touch(key)
+            return entry[0], status
+        if status == 'STALE':
+            self._touch(key)
+            self._refresh_in_background(key, compute, current_app._get_current_object())
+            return entry[0], status
+
+        try:
+            with self._key_lock(key):
+                # Another request may have filled the entry while we waited
+                entry = self._entries.get(key)
+                if self._classify(entry, time.monotonic()) == 'HIT':
+                    self._touch(key)
+                    return entry[0], 'HIT'
+                return self._store(key, compute), 'MISS'
+        finally:
+            # Drops this key's lock if the computation failed and left no entry
+            with self._lock:
+                self._sweep_locks()
+
+admin_cache = ResponseCache(
+    ttl=float(os.getenv('ADMIN_CACHE_TTL', 30)),
+    stale_ttl=float(os.getenv('ADMIN_CACHE_STALE_TTL', 300)),
+    max_entries=int(os.getenv('ADMIN_CACHE_MAX_ENTRIES', 1000))
+)
+
+def _after_flush(session, flush_context):
+    from models.user import User
+    from models.resume import Resume
+    from models.analysis import Analysis
+    tracked = (User, Resume, Analysis)
+    if any(isinstance(obj, tracked) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['admin_cache_dirty'] = True
+
+def _after_commit(session):
+    if session.info.pop('admin_cache_dirty', False):
+        admin_cache.invalidate()
+
+def _after_rollback(session):
+    session.info.pop('admin_cache_dirty', None)
+
+def init_response_cache(app):
+    """Invalidate the admin cache whenever a commit touches users, resumes or analyses"""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
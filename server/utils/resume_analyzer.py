@@ -1,4 +1,6 @@
 import google.generativeai as genai
+import hashlib
+import json
 import os
 import re
 
@@ -39,6 +41,22 @@ JOB_ROLES = {
     }
 }
 
+# Bump whenever scoring rules change so memoized analyses are recomputed
+ANALYSIS_VERSION = 1
+
+def analysis_fingerprint(resume_text, job_role, job_category, analysis_type, job_description='', ai_model=None):
+    """Stable hash of everything an analysis result depends on"""
+    payload = json.dumps({
+        'version': ANALYSIS_VERSION,
+        'resume': hashlib.sha256(resume_text.encode('utf-8')).hexdigest(),
+        'job_role': job_role,
+        'job_category': job_category,
+        'analysis_type': analysis_type,
+        'job_description': hashlib.sha256((job_description or '').encode('utf-8')).hexdigest(),
+        'ai_model': ai_model if analysis_type == 'ai' else None
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
 def analyze_resume_standard(resume_text, job_role, job_category):
     """Standard resume analysis"""
     try:
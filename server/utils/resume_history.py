@@ -0,0 +1,345 @@
+from sqlalchemy import event, select, delete, func, inspect, bindparam
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import sqlite, postgresql
+from models import db
+from models.resume import Resume
+from models.resume_version import ResumeSection, ResumeVersion
+from collections import Counter
+from datetime import datetime
+import click
+import hashlib
+import json
+import os
+
+# Resume columns that are versioned; the rest (owner, timestamps) are not content
+VERSIONED_FIELDS = (
+    'personal_info', 'summary', 'target_role', 'target_category', 'education',
+    'experience', 'projects', 'skills', 'template'
+)
+
+# Every Nth version is a full snapshot, which bounds the deltas replayed to reconstruct one
+RESUME_SNAPSHOT_INTERVAL = max(1, int(os.getenv('RESUME_SNAPSHOT_INTERVAL', 10)))
+
+# Hashes per statement when releasing or recounting sections
+SECTION_BATCH_SIZE = 500
+
+def _same(old, new):
+    # 1 == True and 1 == 1.0 in Python, but they are different JSON values
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, dict):
+        return old.keys() == new.keys() and all(_same(value, new[key]) for key, value in old.items())
+    if isinstance(old, list):
+        return len(old) == len(new) and all(_same(before, after) for before, after in zip(old, new))
+    return old == new
+
+def json_diff(old, new):
+    """Delta that turns old into new, or None if they are equal
+
+    Dicts are diffed per key ({'d': changed, 'r': removed}), equal-length lists
+    per index ({'i': {index: delta}}), other lists as one splice between their
+    common prefix and suffix ({'s': [start, end, items]}); anything else is
+    replaced ({'v': new}).
+    """
+    if _same(old, new):
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        delta = {}
+        changed = {}
+        for key, value in new.items():
+            if key not in old:
+                changed[key] = {'v': value}
+            else:
+                diff = json_diff(old[key], value)
+                if diff is not None:
+                    changed[key] = diff
+        removed = [key for key in old if key not in new]
+        if changed:
+            delta['d'] = changed
+        if removed:
+            delta['r'] = removed
+        return delta
+    if isinstance(old, list) and isinstance(new, list):
+        if len(old) == len(new):
+            changed = {}
+            for index, (before, after) in enumerate(zip(old, new)):
+                diff = json_diff(before, after)
+                if diff is not None:
+                    changed[str(index)] = diff
+            return {'i': changed}
+        shortest = min(len(old), len(new))
+        start = 0
+        while start < shortest and _same(old[start], new[start]):
+            start += 1
+        end = 0
+        while end < shortest - start and _same(old[-1 - end], new[-1 - end]):
+            end += 1
+        return {'s': [start, len(old) - end, new[start:len(new) - end]]}
+    return {'v': new}
+
+def apply_diff(value, delta):
+    """Inverse of json_diff: apply_diff(old, json_diff(old, new)) == new"""
+    if 'v' in delta:
+        return delta['v']
+    if 'i' in delta:
+        result = list(value)
+        for index, diff in delta['i'].items():
+            result[int(index)] = apply_diff(result[int(index)], diff)
+        return result
+    if 's' in delta:
+        start, end, items = delta['s']
+        return value[:start] + items + value[end:]
+    result = dict(value)
+    for key in delta.get('r', ()):
+        result.pop(key, None)
+    for key, diff in delta.get('d', {}).items():
+        result[key] = apply_diff(result.get(key), diff)
+    return result
+
+def _encode(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+def section_hash(value):
+    """Content address of a section value"""
+    return hashlib.sha256(_encode(value).encode('utf-8')).hexdigest()
+
+def is_snapshot_version(version):
+    return (version - 1) % RESUME_SNAPSHOT_INTERVAL == 0
+
+def _chunks(items, size=SECTION_BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def store_sections(connection, sections, counts):
+    """Add ``counts[hash]`` references to each section, writing {hash: value} sections not stored yet
+
+    The count is raised in the same statement that inserts a missing section, so
+    a concurrent release can't delete a section between the check and the use.
+    """
+    if not counts:
+        return
+    table = ResumeSection.__table__
+    now = datetime.utcnow()
+    rows = [
+        {'hash': key, 'content': sections[key], 'refs': count, 'created_at': now}
+        for key, count in counts.items()
+    ]
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(table)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['hash'],
+            set_={'refs': table.c.refs + stmt.excluded.refs}
+        ), rows)
+        return
+    existing = set()
+    for chunk in _chunks(counts):
+        existing.update(connection.execute(select(table.c.hash).where(table.c.hash.in_(chunk))).scalars())
+    if existing:
+        connection.execute(
+            table.update().where(table.c.hash == bindparam('key')).values(refs=table.c.refs + bindparam('count')),
+            [{'key': key, 'count': counts[key]} for key in existing]
+        )
+    missing = [row for row in rows if row['hash'] not in existing]
+    if missing:
+        connection.execute(table.insert(), missing)
+
+def _section_counts(snapshots):
+    """References per section hash for an iterable of snapshot ``changes``"""
+    counts = Counter()
+    for refs in snapshots:
+        counts.update({key for key in refs.values() if key})
+    return counts
+
+def release_sections(connection, counts):
+    """Drop ``counts[hash]`` references from each section and delete sections left unreferenced"""
+    if not counts:
+        return 0
+    table = ResumeSection.__table__
+    connection.execute(
+        table.update().where(table.c.hash == bindparam('key')).values(refs=table.c.refs - bindparam('count')),
+        [{'key': key, 'count': count} for key, count in counts.items()]
+    )
+    deleted = 0
+    for chunk in _chunks(counts):
+        deleted += connection.execute(
+            table.delete().where(table.c.hash.in_(chunk), table.c.refs <= 0)
+        ).rowcount
+    return deleted
+
+def delete_resume_history(connection, resume_ids):
+    """Delete resumes' versions and the sections only they referenced; returns sections deleted"""
+    if not resume_ids:
+        return 0
+    snapshots = connection.execute(
+        select(ResumeVersion.changes).where(
+            ResumeVersion.resume_id.in_(resume_ids), ResumeVersion.kind == 'snapshot'
+        )
+    ).scalars()
+    counts = _section_counts(snapshots)
+    connection.execute(delete(ResumeVersion).where(ResumeVersion.resume_id.in_(resume_ids)))
+    return release_sections(connection, counts)
+
+def prune_sections(chunk_size=SECTION_BATCH_SIZE):
+    """Recount every section's references from the snapshots and delete unreferenced sections
+
+    Repairs counts and removes orphans left by deletes that bypassed
+    delete_resume_history. Returns the number of sections deleted.
+    """
+    connection = db.session.connection()
+    table = ResumeSection.__table__
+    snapshots = connection.execution_options(yield_per=chunk_size).execute(
+        select(ResumeVersion.changes).where(ResumeVersion.kind == 'snapshot')
+    ).scalars()
+    counts = _section_counts(snapshots)
+    connection.execute(table.update().values(refs=0))
+    if counts:
+        connection.execute(
+            table.update().where(table.c.hash == bindparam('key')).values(refs=bindparam('count')),
+            [{'key': key, 'count': count} for key, count in counts.items()]
+        )
+    deleted = connection.execute(table.delete().where(table.c.refs <= 0)).rowcount
+    db.session.commit()
+    return deleted
+
+def snapshot_refs(row, sections):
+    """Section hashes for a resume (or any row with the versioned attributes), collecting values into sections"""
+    refs = {}
+    for field in VERSIONED_FIELDS:
+        value = getattr(row, field)
+        if value is None:
+            refs[field] = None
+        else:
+            refs[field] = section_hash(value)
+            sections[refs[field]] = value
+    return refs
+
+def _field_changes(resume):
+    """{field: delta} for a dirty resume; None if a previous value was never loaded"""
+    attrs = inspect(resume).attrs
+    changes = {}
+    for field in VERSIONED_FIELDS:
+        history = attrs[field].history
+        if not history.has_changes():
+            continue
+        if not history.deleted:
+            return None
+        new = history.added[0] if history.added else None
+        diff = json_diff(history.deleted[0], new)
+        if diff is None:
+            continue
+        # A delta is never worth more than the value it describes
+        if new is not None and len(_encode(diff)) > len(_encode(new)) + 8:
+            diff = {'v': new}
+        changes[field] = diff
+    return changes
+
+def _before_flush(session, flush_context, instances):
+    pending = session.info.setdefault('resume_versions', [])
+    for obj in session.new:
+        if isinstance(obj, Resume):
+            obj.version = 1
+            pending.append((obj, None, 1))
+    for obj in session.dirty:
+        if isinstance(obj, Resume) and obj not in session.deleted:
+            changes = _field_changes(obj)
+            if changes is None or changes:
+                # Bumped in SQL so concurrent saves get distinct numbers; the new value
+                # comes back through RETURNING (eager_defaults) or a refresh
+                expected = (obj.version or 0) + 1
+                obj.version = Resume.version + 1
+                pending.append((obj, changes, expected))
+    # Deleted before the rows go, while their snapshots still say which sections they hold
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Resume)]
+    if deleted:
+        delete_resume_history(session.connection(), deleted)
+
+def _after_flush(session, flush_context):
+    pending = session.info.pop('resume_versions', None)
+    if not pending:
+        return
+    connection = session.connection()
+    now = datetime.utcnow()
+    rows = []
+    sections = {}
+    snapshots = []
+    for resume, changes, expected in pending:
+        source = resume
+        if resume.version != expected:
+            # Another transaction saved in between: the diff was taken against a stale
+            # version, so record the row as it now stands instead
+            columns = [getattr(Resume, field) for field in VERSIONED_FIELDS]
+            source = connection.execute(select(*columns).where(Resume.id == resume.id)).one()
+            changes = None
+        # The first version, a lost or stale previous value, or the interval forces a snapshot
+        if changes is None or resume.version == 1 or is_snapshot_version(resume.version):
+            kind, changes = 'snapshot', snapshot_refs(source, sections)
+            snapshots.append(changes)
+        else:
+            kind = 'delta'
+        rows.append({
+            'resume_id': resume.id, 'version': resume.version,
+            'kind': kind, 'changes': changes, 'created_at': now
+        })
+    store_sections(connection, sections, _section_counts(snapshots))
+    connection.execute(ResumeVersion.__table__.insert(), rows)
+
+def _after_rollback(session):
+    session.info.pop('resume_versions', None)
+
+def list_versions(resume_id, limit, offset=0):
+    """Version metadata for a resume, newest first, and the total count"""
+    query = ResumeVersion.query.filter_by(resume_id=resume_id)
+    total = query.count()
+    versions = query.order_by(ResumeVersion.version.desc()).limit(limit).offset(offset).all()
+    return versions, total
+
+def resume_at_version(resume_id, version):
+    """Content of the versioned fields as of ``version``, or None if it doesn't exist
+
+    Reads the nearest snapshot at or before the version, its sections, and the
+    deltas after it: three queries and at most RESUME_SNAPSHOT_INTERVAL rows.
+    """
+    snapshot = db.session.execute(
+        select(func.max(ResumeVersion.version)).where(
+            ResumeVersion.resume_id == resume_id,
+            ResumeVersion.kind == 'snapshot',
+            ResumeVersion.version <= version
+        )
+    ).scalar()
+    if snapshot is None:
+        return None
+    rows = db.session.execute(
+        select(ResumeVersion.version, ResumeVersion.changes).where(
+            ResumeVersion.resume_id == resume_id,
+            ResumeVersion.version.between(snapshot, version)
+        ).order_by(ResumeVersion.version)
+    ).all()
+    if rows[-1].version != version:
+        return None
+
+    refs = rows[0].changes
+    hashes = [key for key in refs.values() if key]
+    sections = dict(db.session.execute(
+        select(ResumeSection.hash, ResumeSection.content).where(ResumeSection.hash.in_(hashes))
+    ).all())
+    content = {field: sections.get(refs.get(field)) for field in VERSIONED_FIELDS}
+    for row in rows[1:]:
+        for field, diff in row.changes.items():
+            content[field] = apply_diff(content[field], diff)
+    return content
+
+def init_resume_history(app):
+    """Record a resume version on every ORM write that changes its content and register the prune command"""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+    @app.cli.command('prune-resume-sections')
+    def prune_resume_sections_command():
+        """Recount resume section references and delete unreferenced sections"""
+        deleted = prune_sections()
+        click.echo(f'Deleted {deleted} unreferenced resume sections')
@@ -0,0 +1,227 @@
+from sqlalchemy import event, select, func, text, inspect, bindparam
+from sqlalchemy.orm import Session
+from models import db
+from models.resume import Resume
+from models.resume_document import ResumeDocument
+from utils.file_parser import convert_resume_to_text
+from datetime import datetime
+import click
+import html
+import re
+
+# Resume columns that feed convert_resume_to_text (plus the owner used for scoping)
+INDEXED_FIELDS = ('personal_info', 'summary', 'experience', 'education', 'skills', 'user_id')
+
+REINDEX_CHUNK_SIZE = 500
+SNIPPET_TOKENS = 16
+
+# Control characters that don't occur in resume text mark highlights until the
+# snippet has been HTML-escaped
+_HIGHLIGHT_START = '\x02'
+_HIGHLIGHT_END = '\x03'
+
+def parse_search_query(query):
+    """Split a search box value into terms; "double quoted" text is kept as one phrase"""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query or ''):
+        term = ' '.join((phrase or word).split())
+        if term:
+            terms.append(term)
+    return terms
+
+def render_snippet(raw):
+    """HTML-escape a snippet and turn the highlight markers into <mark> tags"""
+    escaped = html.escape(raw)
+    return escaped.replace(_HIGHLIGHT_START, '<mark>').replace(_HIGHLIGHT_END, '</mark>')
+
+class TableSearchBackend:
+    """Documents stored in resume_documents and matched with LIKE; works on any database
+
+    Every term must occur in the document. Results are ordered by the number of
+    term occurrences on the current page only, newest first across pages.
+
+    ``index`` and ``remove`` run inside the flush that changed the resumes, on
+    the same connection, so the index commits or rolls back with them.
+    ``search`` returns ``(hits, total)`` where each hit is a dict with
+    ``resume_id``, ``score`` (higher is better) and an HTML-safe ``snippet``.
+    """
+
+    table = ResumeDocument.__table__
+
+    def index(self, connection, documents):
+        """Add or replace documents given as (resume_id, user_id, content) tuples"""
+        documents = {resume_id: (user_id, content) for resume_id, user_id, content in documents}
+        if not documents:
+            return
+        existing = set(connection.execute(
+            select(self.table.c.resume_id).where(self.table.c.resume_id.in_(documents))
+        ).scalars())
+        rows = [
+            {'doc_id': resume_id, 'user_id': user_id, 'content': content}
+            for resume_id, (user_id, content) in documents.items()
+        ]
+        updates = [row for row in rows if row['doc_id'] in existing]
+        inserts = [row for row in rows if row['doc_id'] not in existing]
+        if updates:
+            connection.execute(
+                self.table.update()
+                .where(self.table.c.resume_id == bindparam('doc_id'))
+                .values(user_id=bindparam('user_id'), content=bindparam('content'), updated_at=datetime.utcnow()),
+                updates
+            )
+        if inserts:
+            connection.execute(self.table.insert(), [
+                {'resume_id': row['doc_id'], 'user_id': row['user_id'], 'content': row['content']}
+                for row in inserts
+            ])
+
+    def remove(self, connection, resume_ids):
+        """Drop the documents for these resumes"""
+        resume_ids = list(resume_ids)
+        if resume_ids:
+            connection.execute(self.table.delete().where(self.table.c.resume_id.in_(resume_ids)))
+
+    def clear(self, connection):
+        """Drop every document (before a full reindex)"""
+        connection.execute(self.table.delete())
+
+    def _snippet(self, content, terms):
+        lowered = content.lower()
+        positions = [(lowered.find(term.lower()), term) for term in terms]
+        positions = [(position, term) for position, term in positions if position >= 0]
+        if not positions:
+            return render_snippet(content[:200])
+        position, term = min(positions)
+        start = max(0, position - 80)
+        end = min(len(content), position + len(term) + 80)
+        raw = content[start:position] + _HIGHLIGHT_START + content[position:position + len(term)] \
+            + _HIGHLIGHT_END + content[position + len(term):end]
+        raw = ('…' if start > 0 else '') + ' '.join(raw.split()) + ('…' if end < len(content) else '')
+        return render_snippet(raw)
+
+    def search(self, terms, user_id=None, limit=20, offset=0):
+        query = select(self.table.c.resume_id, self.table.c.content)
+        for term in terms:
+            query = query.where(func.lower(self.table.c.content).contains(term.lower(), autoescape=True))
+        if user_id is not None:
+            query = query.where(self.table.c.user_id == user_id)
+
+        total = db.session.execute(select(func.count()).select_from(query.subquery())).scalar()
+        rows = db.session.execute(
+            query.order_by(self.table.c.updated_at.desc(), self.table.c.resume_id.desc())
+            .limit(limit).offset(offset)
+        ).all()
+
+        hits = [{
+            'resume_id': row.resume_id,
+            'score': sum(row.content.lower().count(term.lower()) for term in terms),
+            'snippet': self._snippet(row.content, terms)
+        } for row in rows]
+        hits.sort(key=lambda hit: -hit['score'])
+        return hits, total
+
+class Fts5SearchBackend(TableSearchBackend):
+    """SQLite FTS5 over resume_documents, ranked by BM25
+
+    Documents are written through TableSearchBackend; the resume_documents_fts
+    triggers keep the FTS index in step.
+    """
+
+    def search(self, terms, user_id=None, limit=20, offset=0):
+        # Each term becomes a quoted FTS5 string, so user input is never parsed as query syntax
+        match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        scope = 'AND d.user_id = :user_id' if user_id is not None else ''
+        params = {'match': match, 'user_id': user_id}
+
+        total = db.session.execute(text(
+            'SELECT count(*) FROM resume_documents_fts f '
+            'JOIN resume_documents d ON d.resume_id = f.rowid '
+            f'WHERE resume_documents_fts MATCH :match {scope}'
+        ), params).scalar()
+        rows = db.session.execute(text(
+            'SELECT f.rowid AS resume_id, bm25(resume_documents_fts) AS rank, '
+            'snippet(resume_documents_fts, 0, :start, :end, \'…\', :tokens) AS snippet '
+            'FROM resume_documents_fts f '
+            'JOIN resume_documents d ON d.resume_id = f.rowid '
+            f'WHERE resume_documents_fts MATCH :match {scope} '
+            'ORDER BY rank, f.rowid DESC LIMIT :limit OFFSET :offset'
+        ), dict(params, start=_HIGHLIGHT_START, end=_HIGHLIGHT_END, tokens=SNIPPET_TOKENS,
+                limit=limit, offset=offset)).all()
+
+        # bm25() is negative with better matches further below zero
+        hits = [{
+            'resume_id': row.resume_id,
+            'score': round(-row.rank, 4),
+            'snippet': render_snippet(' '.join(row.snippet.split()))
+        } for row in rows]
+        return hits, total
+
+_backend_override = None
+_backends = {}
+
+def set_search_backend(backend):
+    """Use this backend for every database (None restores the per-dialect default)"""
+    global _backend_override
+    _backend_override = backend
+
+def get_search_backend(dialect_name):
+    """Configured backend, else FTS5 on SQLite and the LIKE fallback elsewhere"""
+    if _backend_override is not None:
+        return _backend_override
+    if dialect_name not in _backends:
+        _backends[dialect_name] = Fts5SearchBackend() if dialect_name == 'sqlite' else TableSearchBackend()
+    return _backends[dialect_name]
+
+def search_resumes(query, user_id=None, limit=20, offset=0):
+    """Ranked (hits, total) for a search box value"""
+    terms = parse_search_query(query)
+    if not terms:
+        return [], 0
+    return get_search_backend(db.engine.dialect.name).search(terms, user_id, limit, offset)
+
+def _document(resume):
+    return (resume.id, resume.user_id, convert_resume_to_text(resume))
+
+def needs_reindex(resume):
+    """True if a flush changes anything the resume's derived text depends on"""
+    attrs = inspect(resume).attrs
+    return any(attrs[field].history.has_changes() for field in INDEXED_FIELDS)
+
+def _after_flush(session, flush_context):
+    documents = [
+        _document(obj) for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Resume) and (obj in session.new or needs_reindex(obj))
+    ]
+    removed = [obj.id for obj in session.deleted if isinstance(obj, Resume)]
+    if documents or removed:
+        connection = session.connection()
+        backend = get_search_backend(connection.dialect.name)
+        backend.remove(connection, removed)
+        backend.index(connection, documents)
+
+def reindex_resumes(chunk_size=REINDEX_CHUNK_SIZE):
+    """Rebuild the search index from every stored resume"""
+    connection = db.session.connection()
+    backend = get_search_backend(connection.dialect.name)
+    backend.clear(connection)
+    stmt = select(Resume).order_by(Resume.id).execution_options(yield_per=chunk_size)
+    batch = []
+    for resume in db.session.execute(stmt).scalars():
+        batch.append(_document(resume))
+        db.session.expunge(resume)
+        if len(batch) >= chunk_size:
+            backend.index(connection, batch)
+            batch = []
+    backend.index(connection, batch)
+    db.session.commit()
+
+def init_resume_search(app):
+    """Keep the search index in sync with ORM writes and register the reindex command"""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+
+    @app.cli.command('reindex-resumes')
+    def reindex_resumes_command():
+        """Rebuild the resume full-text search index"""
+        reindex_resumes()
+        click.echo('Resume search index rebuilt')
@@ -0,0 +1,154 @@
+from sqlalchemy import select, func, null, or_, text, tuple_
+from models import db
+from models.analysis import Analysis
+from utils.bulk_delete import delete_analyses_where
+from utils.response_cache import admin_cache
+from datetime import datetime, timedelta
+import click
+import os
+import time
+
+# Retention rules; 0 disables a rule
+# Analyses kept per user, newest first; older ones are deleted
+ANALYSIS_KEEP_PER_USER = int(os.getenv('ANALYSIS_KEEP_PER_USER', 0))
+# Analyses without a user are deleted after this many days
+ANONYMOUS_ANALYSIS_DAYS = int(os.getenv('ANONYMOUS_ANALYSIS_DAYS', 0))
+# After this many days only the scores are kept; AI text and suggestions are dropped
+ANALYSIS_DETAIL_DAYS = int(os.getenv('ANALYSIS_DETAIL_DAYS', 0))
+
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', 500))
+# Sleep between batches so the purge never monopolises the write lock
+RETENTION_BATCH_PAUSE = float(os.getenv('RETENTION_BATCH_PAUSE', 0.05))
+
+# Columns emptied when an analysis is reduced to its scores
+DETAIL_COLUMNS = ('keyword_match', 'suggestions', 'ai_analysis', 'full_response', 'job_description')
+
+def _purge_over_quota(keep, batch_size, pause):
+    """Delete each user's analyses beyond the newest ``keep``"""
+    over_quota = db.session.execute(
+        select(Analysis.user_id)
+        .where(Analysis.user_id.isnot(None))
+        .group_by(Analysis.user_id)
+        .having(func.count(Analysis.id) > keep)
+    ).scalars().all()
+
+    deleted = 0
+    for user_id in over_quota:
+        # The oldest row still kept, found on the (user_id, created_at, id) index
+        cutoff = db.session.execute(
+            select(Analysis.created_at, Analysis.id)
+            .where(Analysis.user_id == user_id)
+            .order_by(Analysis.created_at.desc(), Analysis.id.desc())
+            .offset(keep - 1)
+            .limit(1)
+        ).first()
+        if cutoff is None:
+            continue
+        deleted += delete_analyses_where(
+            (Analysis.user_id == user_id) & (tuple_(Analysis.created_at, Analysis.id) < tuple_(*cutoff)),
+            batch_size, pause
+        )
+    return deleted
+
+def _strip_details(before, batch_size, pause):
+    """Reduce analyses created before ``before`` to their scores, in id order"""
+    has_detail = [getattr(Analysis, column).isnot(None) for column in DETAIL_COLUMNS]
+    stripped = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            select(Analysis.id)
+            .where(Analysis.created_at < before, Analysis.id > last_id, or_(*has_detail))
+            .order_by(Analysis.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return stripped
+        last_id = ids[-1]
+        # null() rather than None, which the JSON columns would store as the string 'null'
+        result = db.session.execute(
+            Analysis.__table__.update()
+            .where(Analysis.id.in_(ids))
+            .values({**{column: null() for column in DETAIL_COLUMNS}, 'updated_at': datetime.utcnow()})
+        )
+        db.session.commit()
+        stripped += result.rowcount
+        if pause:
+            time.sleep(pause)
+
+def convert_to_incremental_vacuum():
+    """SQLite: switch an existing file to auto_vacuum=INCREMENTAL; rebuilds it once with VACUUM"""
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return False
+    # VACUUM can't run inside a transaction, and takes the write lock for the whole rebuild
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text('PRAGMA auto_vacuum = INCREMENTAL'))
+        connection.execute(text('VACUUM'))
+    return True
+
+def reclaim_space():
+    """Return space freed by the purge to the filesystem (SQLite) or to the table (Postgres)"""
+    engine = db.engine
+    dialect = engine.dialect.name
+    if dialect == 'sqlite':
+        with engine.connect() as connection:
+            # freelist_count reads the file header, so it also refreshes this pooled
+            # connection's view of auto_vacuum
+            if not connection.execute(text('PRAGMA freelist_count')).scalar():
+                return None
+            if connection.execute(text('PRAGMA auto_vacuum')).scalar() != 2:
+                # Files created before auto_vacuum=INCREMENTAL keep their free pages for reuse;
+                # convert them once with ``flask purge-analyses --convert-vacuum``
+                return None
+            # Releases free pages without rebuilding the file. The pragma frees one page
+            # per step and execute() steps once; executescript() runs it out
+            connection.connection.driver_connection.executescript('PRAGMA incremental_vacuum')
+        return 'incremental_vacuum'
+    if dialect == 'postgresql':
+        # Plain VACUUM marks dead tuples reusable without an exclusive lock; ANALYZE
+        # refreshes planner statistics after the row count drop
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text(f'VACUUM (ANALYZE) {Analysis.__tablename__}'))
+        return 'vacuum analyze'
+    return None
+
+def purge_analyses(keep_per_user=ANALYSIS_KEEP_PER_USER, anonymous_days=ANONYMOUS_ANALYSIS_DAYS,
+                   detail_days=ANALYSIS_DETAIL_DAYS, batch_size=RETENTION_BATCH_SIZE,
+                   pause=RETENTION_BATCH_PAUSE, vacuum=True):
+    """Apply the retention policy to analyses; returns what was done"""
+    now = datetime.utcnow()
+    report = {'anonymousDeleted': 0, 'overQuotaDeleted': 0, 'detailsStripped': 0, 'vacuum': None}
+    try:
+        if anonymous_days:
+            report['anonymousDeleted'] = delete_analyses_where(
+                Analysis.user_id.is_(None) & (Analysis.created_at < now - timedelta(days=anonymous_days)),
+                batch_size, pause
+            )
+        if keep_per_user:
+            report['overQuotaDeleted'] = _purge_over_quota(keep_per_user, batch_size, pause)
+        if detail_days:
+            report['detailsStripped'] = _strip_details(now - timedelta(days=detail_days), batch_size, pause)
+    finally:
+        admin_cache.invalidate()
+
+    if vacuum and (report['anonymousDeleted'] or report['overQuotaDeleted'] or report['detailsStripped']):
+        report['vacuum'] = reclaim_space()
+    return report
+
+def init_retention(app):
+    """Register the purge command
+
+    Retention runs only from this command (e.g. a nightly cron job), never inside
+    the web workers, so exactly one purge runs at a time.
+    """
+    @app.cli.command('purge-analyses')
+    @click.option('--no-vacuum', is_flag=True, help='Skip reclaiming space afterwards')
+    @click.option('--convert-vacuum', is_flag=True,
+                  help='SQLite: switch the file to incremental vacuum first (one full VACUUM)')
+    def purge_analyses_command(no_vacuum, convert_vacuum):
+        """Apply the analysis retention policy"""
+        if convert_vacuum and convert_to_incremental_vacuum():
+            click.echo('Switched the database to auto_vacuum=INCREMENTAL')
+        report = purge_analyses(vacuum=not no_vacuum)
+        click.echo(f'Analysis retention purge: {report}')
@@ -0,0 +1,178 @@
+from sqlalchemy import event, func, select, literal, case, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import sqlite, postgresql
+from models import db
+from models.user import User
+from models.resume import Resume
+from models.analysis import Analysis
+from models.rollup import DailyRollup
+from datetime import date
+import click
+
+SCORE_BUCKETS = ['0-39', '40-59', '60-79', '80-100']
+
+_KEY_COLUMNS = ['day', 'metric', 'analysis_type', 'category', 'score_bucket']
+
+def score_bucket(score):
+    """Histogram bucket for an overall score"""
+    if score >= 80:
+        return '80-100'
+    elif score >= 60:
+        return '60-79'
+    elif score >= 40:
+        return '40-59'
+    return '0-39'
+
+def _overall_score(analysis):
+    # The rounded typed column, as _score_bucket_sql() reads it, so that rows are
+    # removed from the same bucket they were added to
+    return analysis.overall_score or 0
+
+def _rollup_key(obj, category=None):
+    """(day, metric, analysis_type, category, score_bucket) counter an object contributes to"""
+    day = obj.created_at.date()
+    if isinstance(obj, User):
+        return (day, 'users', '', '', '')
+    if isinstance(obj, Resume):
+        return (day, 'resumes', '', category if category is not None else obj.target_category or '', '')
+    if isinstance(obj, Analysis):
+        return (day, 'analyses', obj.analysis_type or '', '', score_bucket(_overall_score(obj)))
+    return None
+
+def _score_bucket_sql():
+    """score_bucket() as a SQL expression over analyses.overall_score"""
+    score = func.coalesce(Analysis.overall_score, 0)
+    return case(
+        (score >= 80, '80-100'),
+        (score >= 60, '60-79'),
+        (score >= 40, '40-59'),
+        else_='0-39'
+    )
+
+def _add_delta(deltas, key, delta):
+    if key is not None:
+        deltas[key] = deltas.get(key, 0) + delta
+
+def apply_rollup_deltas(connection, deltas):
+    """Add each delta to its counter row, creating the row if needed"""
+    table = DailyRollup.__table__
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        values = dict(zip(_KEY_COLUMNS, key), count=delta)
+        dialect = connection.dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = insert(table).values(**values).on_conflict_do_update(
+                index_elements=_KEY_COLUMNS,
+                set_={'count': table.c.count + delta}
+            )
+            connection.execute(stmt)
+        else:
+            where = [table.c[column] == value for column, value in zip(_KEY_COLUMNS, key)]
+            result = connection.execute(table.update().where(*where).values(count=table.c.count + delta))
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(**values))
+
+def removal_deltas(connection, model, condition):
+    """Negative rollup deltas for the rows of model matching condition, grouped in SQL
+
+    For set-based deletes that bypass the ORM flush hooks.
+    """
+    day = func.date(model.created_at)
+    if model is User:
+        metric, analysis_type, category, bucket = 'users', literal(''), literal(''), literal('')
+        group_by = [day]
+    elif model is Resume:
+        metric, analysis_type, bucket = 'resumes', literal(''), literal('')
+        category = func.coalesce(Resume.target_category, '')
+        group_by = [day, category]
+    else:
+        metric, category = 'analyses', literal('')
+        analysis_type = func.coalesce(Analysis.analysis_type, '')
+        bucket = _score_bucket_sql()
+        group_by = [day, analysis_type, bucket]
+
+    stmt = (
+        select(day, analysis_type, category, bucket, func.count())
+        .where(condition, model.created_at.isnot(None))
+        .group_by(*group_by)
+    )
+    deltas = {}
+    for row_day, row_type, row_category, row_bucket, count in connection.execute(stmt):
+        # SQLite's date() returns text
+        if isinstance(row_day, str):
+            row_day = date.fromisoformat(row_day)
+        _add_delta(deltas, (row_day, metric, row_type, row_category, row_bucket), -count)
+    return deltas
+
+def _before_flush(session, flush_context, instances):
+    # Deleted and updated rows are inspected before the flush while their attributes can still load
+    deltas = session.info.setdefault('rollup_deltas', {})
+    for obj in session.deleted:
+        if isinstance(obj, (User, Resume, Analysis)) and obj.created_at is not None:
+            _add_delta(deltas, _rollup_key(obj), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Resume) and obj.created_at is not None:
+            history = inspect(obj).attrs.target_category.history
+            if history.added and history.deleted:
+                _add_delta(deltas, _rollup_key(obj, history.deleted[0] or ''), -1)
+                _add_delta(deltas, _rollup_key(obj, history.added[0] or ''), 1)
+
+def _after_flush(session, flush_context):
+    # New rows are counted after the flush, once created_at defaults have been applied
+    deltas = session.info.pop('rollup_deltas', {})
+    for obj in session.new:
+        if isinstance(obj, (User, Resume, Analysis)):
+            _add_delta(deltas, _rollup_key(obj), 1)
+    if any(deltas.values()):
+        apply_rollup_deltas(session.connection(), deltas)
+
+def _after_rollback(session):
+    session.info.pop('rollup_deltas', None)
+
+def backfill_rollups():
+    """Rebuild every rollup counter from the raw tables"""
+    table = DailyRollup.__table__
+    connection = db.session.connection()
+    connection.execute(table.delete())
+    columns = _KEY_COLUMNS + ['count']
+
+    users = select(
+        func.date(User.created_at), literal('users'), literal(''), literal(''), literal(''), func.count()
+    ).group_by(func.date(User.created_at))
+
+    resume_rows = select(
+        func.date(Resume.created_at).label('day'),
+        func.coalesce(Resume.target_category, '').label('category')
+    ).subquery()
+    resumes = select(
+        resume_rows.c.day, literal('resumes'), literal(''), resume_rows.c.category, literal(''), func.count()
+    ).group_by(resume_rows.c.day, resume_rows.c.category)
+
+    analysis_rows = select(
+        func.date(Analysis.created_at).label('day'),
+        func.coalesce(Analysis.analysis_type, '').label('analysis_type'),
+        _score_bucket_sql().label('score_bucket')
+    ).subquery()
+    analyses = select(
+        analysis_rows.c.day, literal('analyses'), analysis_rows.c.analysis_type, literal(''),
+        analysis_rows.c.score_bucket, func.count()
+    ).group_by(analysis_rows.c.day, analysis_rows.c.analysis_type, analysis_rows.c.score_bucket)
+
+    for query in (users, resumes, analyses):
+        connection.execute(table.insert().from_select(columns, query))
+    db.session.commit()
+
+def init_rollups(app):
+    """Keep rollups in sync with ORM writes and register the backfill command"""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+    @app.cli.command('backfill-rollups')
+    def backfill_rollups_command():
+        """Rebuild the daily analytics rollups from existing data"""
+        backfill_rollups()
+        click.echo('Rollups rebuilt')
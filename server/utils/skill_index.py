@@ -0,0 +1,317 @@
+from sqlalchemy import event, select, bindparam
+from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import chain
+from models import db
+from models.resume import Resume
+from models.resume_skills import ResumeSkills
+from utils.file_parser import convert_resume_to_text
+from utils.resume_analyzer import JOB_ROLES
+from utils.resume_search import needs_reindex
+import click
+import heapq
+import os
+import re
+import threading
+import time
+
+# Every skill a job role asks for, keyed by its lower-cased form
+SKILL_VOCABULARY = {
+    skill.lower(): skill
+    for roles in JOB_ROLES.values()
+    for role in roles.values()
+    for skill in role['required_skills']
+}
+
+# Whole-word patterns for finding vocabulary skills in free text; a plain substring
+# test would find 'r' in almost any text and 'java' in 'javascript'
+_SKILL_PATTERNS = {
+    key: re.compile(r'(?<!\w)' + re.escape(key) + r'(?!\w)')
+    for key in SKILL_VOCABULARY
+}
+
+# Lists in Resume.skills whose entries are indexed as declared skills
+DECLARED_SKILL_GROUPS = ('technical', 'soft', 'languages', 'tools')
+
+SKILL_INDEX_REFRESH_INTERVAL = float(os.getenv('SKILL_INDEX_REFRESH_INTERVAL', 5))
+LOAD_CHUNK_SIZE = 5000
+REINDEX_CHUNK_SIZE = 500
+
+# Re-read rows this far behind the watermark, in case a transaction that started
+# earlier committed after the last refresh
+_WATERMARK_OVERLAP = timedelta(seconds=2)
+
+def normalize_skill(skill):
+    """Index key for a skill name"""
+    return ' '.join(str(skill).split()).lower()
+
+def extract_skills(text, declared=None):
+    """Sorted skill keys for a resume
+
+    Vocabulary skills are detected with the same case-insensitive substring test
+    analyze_skills_match uses, so index hits agree with the keyword-match score.
+    Skills the resume declares are added even when they are outside the vocabulary.
+    """
+    text_lower = text.lower()
+    skills = {key for key in SKILL_VOCABULARY if key in text_lower}
+    for group in DECLARED_SKILL_GROUPS:
+        entries = (declared or {}).get(group)
+        if isinstance(entries, list):
+            skills.update(normalize_skill(entry) for entry in entries if str(entry).strip())
+    return sorted(skills)
+
+def skills_in_text(text):
+    """Vocabulary skills named in free text (e.g. a job description), matched as whole words"""
+    text_lower = text.lower()
+    return [skill for key, skill in SKILL_VOCABULARY.items() if _SKILL_PATTERNS[key].search(text_lower)]
+
+def resume_skills(resume):
+    """Skill keys for a Resume (or any row with the same attributes)"""
+    return extract_skills(convert_resume_to_text(resume), resume.skills)
+
+class SkillIndex:
+    """In-memory inverted index from skill key to resume ids
+
+    Vocabulary skills, which role queries always use and which most resumes
+    share, are kept as bitmaps indexed by resume id; other declared skills are
+    kept as sets. Loaded from resume_skills on first use; commits in this
+    process are applied immediately and writes from other processes are picked
+    up every ``refresh_interval`` seconds by reading rows newer than the last
+    watermark.
+    """
+
+    def __init__(self, refresh_interval=SKILL_INDEX_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next query reloads from the database"""
+        with self._lock:
+            self._bitmaps = {key: bytearray() for key in SKILL_VOCABULARY}  # bit n = resume id n
+            self._postings = {}  # declared skill key -> set of resume ids
+            self._skills = {}  # resume id -> tuple of skill keys
+            self._loaded = False
+            self._watermark = None
+            self._refreshed_at = 0.0
+
+    def _set(self, resume_id, skills):
+        byte, bit = resume_id >> 3, 1 << (resume_id & 7)
+        for skill in self._skills.pop(resume_id, ()):
+            if skill in self._bitmaps:
+                bitmap = self._bitmaps[skill]
+                if byte < len(bitmap):
+                    bitmap[byte] &= ~bit & 0xFF
+            else:
+                posting = self._postings.get(skill)
+                if posting is not None:
+                    posting.discard(resume_id)
+                    if not posting:
+                        del self._postings[skill]
+        if not skills:
+            return
+        self._skills[resume_id] = tuple(skills)
+        for skill in skills:
+            if skill in self._bitmaps:
+                bitmap = self._bitmaps[skill]
+                if byte >= len(bitmap):
+                    # Grow with headroom so sequential inserts don't resize every time
+                    bitmap.extend(bytes(byte + 1 - len(bitmap) + (byte >> 3)))
+                bitmap[byte] |= bit
+            else:
+                self._postings.setdefault(skill, set()).add(resume_id)
+
+    def apply(self, changes):
+        """Apply committed {resume_id: skill keys} changes; an empty list removes the resume"""
+        with self._lock:
+            for resume_id, skills in changes.items():
+                self._set(resume_id, skills)
+
+    def _is_fresh(self):
+        return self._loaded and time.monotonic() - self._refreshed_at < self.refresh_interval
+
+    def ensure_fresh(self):
+        """Load the index on first use, then fold in rows changed since the last refresh"""
+        if self._is_fresh():
+            return
+        with self._lock:
+            if self._is_fresh():
+                return
+            stmt = select(ResumeSkills.resume_id, ResumeSkills.skills, ResumeSkills.updated_at)
+            if self._loaded and self._watermark is not None:
+                stmt = stmt.where(ResumeSkills.updated_at >= self._watermark - _WATERMARK_OVERLAP)
+            watermark = self._watermark
+            for resume_id, skills, updated_at in db.session.execute(stmt.execution_options(yield_per=LOAD_CHUNK_SIZE)):
+                self._set(resume_id, skills)
+                if updated_at is not None and (watermark is None or updated_at > watermark):
+                    watermark = updated_at
+            self._watermark = watermark
+            self._loaded = True
+            self._refreshed_at = time.monotonic()
+
+    def top_k(self, skills, k):
+        """[(resume_id, matched skill keys)] for the k resumes matching most of ``skills``
+
+        Ties go to the newer (higher id) resume. Bitmap skills are summed with
+        bit-sliced counters, so resumes are never visited one by one; only set
+        postings and the k winners are touched individually, through a k-sized heap.
+        """
+        self.ensure_fresh()
+        wanted = list(dict.fromkeys(skills))
+        with self._lock:
+            dense = [self._bitmaps[skill] for skill in wanted if skill in self._bitmaps]
+            sparse = [self._postings.get(skill, ()) for skill in wanted if skill not in self._bitmaps]
+
+            # planes[j] holds bit j of every resume's bitmap match count
+            planes = []
+            for bitmap in dense:
+                carry = int.from_bytes(bitmap, 'little')
+                for j in range(len(planes)):
+                    if not carry:
+                        break
+                    planes[j], carry = planes[j] ^ carry, planes[j] & carry
+                if carry:
+                    planes.append(carry)
+
+            def dense_count(resume_id):
+                byte, bit = resume_id >> 3, 1 << (resume_id & 7)
+                return sum(1 for bitmap in dense if byte < len(bitmap) and bitmap[byte] & bit)
+
+            heap = []
+
+            def offer(score, resume_id):
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, resume_id))
+                    return True
+                if (score, resume_id) > heap[0]:
+                    heapq.heapreplace(heap, (score, resume_id))
+                    return True
+                return False
+
+            # Resumes matching any set-backed skill get their full count directly
+            sparse_counts = Counter(chain.from_iterable(sparse))
+            for resume_id, count in sparse_counts.items():
+                offer(count + dense_count(resume_id), resume_id)
+
+            # Everyone else, best count first and newest first within a count,
+            # stopping as soon as the heap can no longer change
+            full = (1 << max((plane.bit_length() for plane in planes), default=0)) - 1
+            for count in range(len(dense), 0, -1):
+                if len(heap) == k and count < heap[0][0]:
+                    break
+                if count >> len(planes):
+                    continue  # No resume reached this count
+                level = full
+                for j, plane in enumerate(planes):
+                    level &= plane if (count >> j) & 1 else plane ^ full
+                while level:
+                    resume_id = level.bit_length() - 1
+                    level ^= 1 << resume_id
+                    if resume_id in sparse_counts:
+                        continue
+                    if not offer(count, resume_id):
+                        break
+
+            wanted = set(wanted)
+            return [
+                (resume_id, [skill for skill in self._skills.get(resume_id, ()) if skill in wanted])
+                for _, resume_id in sorted(heap, reverse=True)
+            ]
+
+skill_index = SkillIndex()
+
+def rank_resumes(required_skills, k):
+    """Top-k resumes scored like analyze_skills_match: matched / required * 100"""
+    names = {}
+    for skill in required_skills:
+        key = normalize_skill(skill)
+        if key:
+            names.setdefault(key, str(skill).strip())
+    if not names:
+        return []
+
+    results = []
+    for resume_id, matched in skill_index.top_k(list(names), k):
+        matched = set(matched)
+        results.append({
+            'resume_id': resume_id,
+            'score': round((len(matched) / len(names)) * 100),
+            'matched_skills': [name for key, name in names.items() if key in matched],
+            'missing_skills': [name for key, name in names.items() if key not in matched]
+        })
+    return results
+
+def store_skills(connection, changes):
+    """Write {resume_id: skill keys} to resume_skills (an empty list marks a deleted resume)"""
+    if not changes:
+        return
+    table = ResumeSkills.__table__
+    now = datetime.utcnow()
+    existing = set(connection.execute(
+        select(table.c.resume_id).where(table.c.resume_id.in_(changes))
+    ).scalars())
+    updates = [
+        {'row_id': resume_id, 'skills': skills}
+        for resume_id, skills in changes.items() if resume_id in existing
+    ]
+    inserts = [
+        {'resume_id': resume_id, 'skills': skills, 'updated_at': now}
+        for resume_id, skills in changes.items() if resume_id not in existing
+    ]
+    if updates:
+        connection.execute(
+            table.update()
+            .where(table.c.resume_id == bindparam('row_id'))
+            .values(skills=bindparam('skills'), updated_at=now),
+            updates
+        )
+    if inserts:
+        connection.execute(table.insert(), inserts)
+
+def _after_flush(session, flush_context):
+    changes = {
+        obj.id: resume_skills(obj) for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Resume) and (obj in session.new or needs_reindex(obj))
+    }
+    changes.update({obj.id: [] for obj in session.deleted if isinstance(obj, Resume)})
+    if changes:
+        store_skills(session.connection(), changes)
+        session.info.setdefault('skill_index_changes', {}).update(changes)
+
+def _after_commit(session):
+    changes = session.info.pop('skill_index_changes', None)
+    if changes:
+        skill_index.apply(changes)
+
+def _after_rollback(session):
+    session.info.pop('skill_index_changes', None)
+
+def reindex_skills(chunk_size=REINDEX_CHUNK_SIZE):
+    """Recompute resume_skills for every stored resume"""
+    connection = db.session.connection()
+    connection.execute(ResumeSkills.__table__.delete())
+    stmt = select(Resume).order_by(Resume.id).execution_options(yield_per=chunk_size)
+    batch = {}
+    for resume in db.session.execute(stmt).scalars():
+        batch[resume.id] = resume_skills(resume)
+        db.session.expunge(resume)
+        if len(batch) >= chunk_size:
+            store_skills(connection, batch)
+            batch = {}
+    store_skills(connection, batch)
+    db.session.commit()
+    skill_index.reset()
+
+def init_skill_index(app):
+    """Keep resume_skills and the in-memory index in sync with ORM writes"""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+    @app.cli.command('reindex-skills')
+    def reindex_skills_command():
+        """Rebuild the resume skill index"""
+        reindex_skills()
+        click.echo('Resume skill index rebuilt')
@@ -0,0 +1,85 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from models import db
+from models.user import User
+import os
+import threading
+import time
+
+class UserCache:
+    """Short-TTL, per-process cache of the user fields the auth middleware checks
+
+    Entries are plain dicts ({id, email, role, is_active, token_version}) or
+    None for a user that doesn't exist. Commits touching a user invalidate its
+    entry in this process; other processes converge within ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl=30, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user id -> (entry, loaded_at)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _load(self, user_id):
+        row = db.session.query(
+            User.id, User.email, User.role, User.is_active, User.token_version
+        ).filter(User.id == user_id).first()
+        return dict(row._mapping) if row else None
+
+    def get(self, user_id):
+        """Cached auth fields for a user, loading them on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached is not None and now - cached[1] < self.ttl:
+                return cached[0]
+            generation = self._generation
+
+        entry = self._load(user_id)
+        with self._lock:
+            # Don't store a row read before a concurrent invalidation
+            if generation != self._generation:
+                return entry
+            self._entries[user_id] = (entry, now)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+user_cache = UserCache(
+    ttl=float(os.getenv('AUTH_CACHE_TTL', 30)),
+    max_entries=int(os.getenv('AUTH_CACHE_MAX_ENTRIES', 10000))
+)
+
+def _after_flush(session, flush_context):
+    changed = {obj.id for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault('user_cache_changed', set()).update(changed)
+
+def _after_commit(session):
+    changed = session.info.pop('user_cache_changed', None)
+    if changed:
+        user_cache.invalidate(changed)
+
+def _after_rollback(session):
+    session.info.pop('user_cache_changed', None)
+
+def init_user_cache(app):
+    """Drop cached auth data for users changed by a commit"""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
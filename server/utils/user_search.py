@@ -0,0 +1,38 @@
+from sqlalchemy import and_, or_, text, column, Integer
+from models.user import User, normalize_search_text
+
+# Trigram indexes need at least three characters; shorter terms use prefix matching
+MIN_SUBSTRING_LENGTH = 3
+
+def _prefix(column_attr, prefix, dialect):
+    if dialect == 'postgresql':
+        # Served by the varchar_pattern_ops indexes from migration 0004
+        return column_attr.startswith(prefix, autoescape=True)
+    # A half-open range is a plain B-tree range scan on any backend with binary collation
+    return and_(column_attr >= prefix, column_attr < prefix + '\U0010ffff')
+
+def _substring(term, dialect):
+    if dialect == 'sqlite':
+        fts_query = '"' + term.replace('"', '""') + '"'
+        matches = text('SELECT rowid FROM users_fts WHERE users_fts MATCH :fts_query') \
+            .bindparams(fts_query=fts_query) \
+            .columns(column('rowid', Integer))
+        return User.id.in_(matches)
+    # On Postgres these LIKEs are served by the pg_trgm GIN indexes from migration 0004
+    return or_(
+        User.name_normalized.contains(term, autoescape=True),
+        User.email.contains(term, autoescape=True)
+    )
+
+def user_search_filter(search, dialect):
+    """WHERE clause for the admin user search box
+
+    Terms shorter than MIN_SUBSTRING_LENGTH match name/email prefixes;
+    longer terms match anywhere in either field via the trigram index.
+    """
+    term = normalize_search_text(search)
+    if not term:
+        return None
+    if len(term) < MIN_SUBSTRING_LENGTH:
+        return or_(_prefix(User.name_normalized, term, dialect), _prefix(User.email, term, dialect))
+    return _substring(term, dialect)